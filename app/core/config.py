@@ -7,11 +7,32 @@ import os
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "sqlite:///./email_campaign.db"
+    # Request handlers run on a thread pool; keep the connection pool at least as large
+    REQUEST_THREADPOOL_SIZE: int = 40
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # server databases only
+    DB_POOL_PRE_PING: bool = True
+    DB_ECHO: bool = False  # log every SQL statement
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # safe with WAL; FULL fsyncs every commit
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 268435456  # 256 MB
     
     # JWT
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    EMPLOYEE_CACHE_SIZE: int = 1024  # 0 disables the authenticated employee cache
+    EMPLOYEE_CACHE_TTL_SECONDS: float = 30.0
+    TOKEN_CACHE_SIZE: int = 10000  # 0 disables the access token cache of the async auth stack
+    TOKEN_CACHE_TTL_SECONDS: float = 60.0
+    
+    # Password hashing
+    BCRYPT_ROUNDS: int = 12  # existing hashes are upgraded on the next successful login
+    PASSWORD_HASH_WORKERS: int = 2  # concurrent bcrypt operations per process
+    PASSWORD_HASH_MAX_QUEUED: int = 16  # waiting for a worker; beyond this, sign-ins get 503 + Retry-After
+    PASSWORD_HASH_THREAD_NICENESS: int = 10  # lower priority than request threads (Linux), 0 to disable
     
     # CORS
     ALLOWED_HOSTS: List[str] = ["*"]
@@ -21,9 +42,40 @@ class Settings(BaseSettings):
     SMTP_PORT: int = 587
     SMTP_USER: str = ""
     SMTP_PASSWORD: str = ""
+    SMTP_POOL_SIZE: int = 4
+    SMTP_POOL_HEALTH_CHECK_SECONDS: int = 30
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = 100
+    EMAIL_SEND_WORKERS: int = 4
+    EMAIL_RATE_LIMIT_PER_SECOND: float = 5.0  # per sender account and SMTP provider
+    EMAIL_RATE_LIMIT_BURST: int = 10
+    SMTP_CONFIG_CACHE_TTL_SECONDS: int = 300
+    SMTP_FAILOVER_BACKOFF_SECONDS: int = 30
+    SMTP_FAILOVER_MAX_BACKOFF_SECONDS: int = 900
     
+    # Campaign dispatch workers
+    CAMPAIGN_WORKER_ENABLED: bool = True  # run workers inside the API process
+    CAMPAIGN_WORKER_CONCURRENCY: int = 1
+    CAMPAIGN_WORKER_POLL_SECONDS: float = 2.0
+    CAMPAIGN_SEND_BATCH_SIZE: int = 100
+    CAMPAIGN_CHECKPOINT_SIZE: int = 20  # sends per progress commit within a batch
+    CAMPAIGN_CLAIM_TIMEOUT_SECONDS: int = 600  # then a silent worker's claims are retried
+    CAMPAIGN_CLAIM_SWEEP_POLLS: int = 15  # job polls between sweeps for stale claims
+    CAMPAIGN_SCHEDULER_ENABLED: bool = True
+    CAMPAIGN_SCHEDULER_MAX_SLEEP_SECONDS: float = 30.0
+
+    # Open tracking
+    TRACKING_BUFFER_MAX_EVENTS: int = 10000  # pixel hits beyond this are dropped
+    TRACKING_FLUSH_INTERVAL_MS: int = 500
+    TRACKING_FLUSH_BATCH_SIZE: int = 1000
+
     # Logging
     LOG_LEVEL: str = "INFO"
+    LOG_DB_QUEUE_SIZE: int = 10000  # entries beyond this are dropped from the DB log
+    LOG_DB_BATCH_SIZE: int = 200
+    LOG_DB_FLUSH_SECONDS: float = 1.0
+    LOG_RETENTION_DAYS: int = 90  # older log rows are moved to compressed archive files; 0 keeps everything
+    LOG_ARCHIVE_DIR: str = "./log_archive"
+    LOG_ARCHIVE_INTERVAL_HOURS: float = 24.0
     
     class Config:
         env_file = ".env"
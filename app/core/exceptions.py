@@ -14,6 +14,18 @@ class EmailSendError(HTTPException):
     def __init__(self, detail: str = "Email sending failed"):
         super().__init__(status_code=500, detail=detail)
 
+class ServiceBusyError(HTTPException):
+    def __init__(self, detail: str = "Service busy", retry_after: int = 1):
+        super().__init__(status_code=503, detail=detail, headers={"Retry-After": str(retry_after)})
+
 class PermissionError(HTTPException):
     def __init__(self, detail: str = "Permission denied"):
         super().__init__(status_code=403, detail=detail)
+
+class NotFoundError(HTTPException):
+    def __init__(self, detail: str = "Not found"):
+        super().__init__(status_code=404, detail=detail)
+
+class SMTPUnavailableError(EmailSendError):
+    def __init__(self, detail: str = "No working SMTP configuration found"):
+        super().__init__(detail=detail)
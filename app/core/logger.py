@@ -1,30 +1,120 @@
 ### core/logger.py
-import logging
 import sys
+import queue
+import atexit
+import logging
+import threading
+from logging.handlers import QueueHandler
 from datetime import datetime
-from sqlalchemy.orm import Session
-from database.connection import get_db
+from sqlalchemy import insert
+from core.config import settings
+from database.connection import SessionLocal
 from database.models import Log
 
-class DatabaseHandler(logging.Handler):
-    def __init__(self):
-        super().__init__()
-        
-    def emit(self, record):
+class DatabaseHandler(QueueHandler):
+    """
+    Hands log records to the DatabaseLogWriter thread instead of writing them
+    inline; never blocks the caller. Records that don't fit in the bounded
+    queue are dropped and counted.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Only what the logs table stores, so queued entries stay small
+        return {
+            "timestamp": datetime.utcnow(),
+            "employee_id": getattr(record, 'employee_id', None),
+            "action": getattr(record, 'action', 'system'),
+            "details": record.getMessage()
+        }
+
+    def enqueue(self, entry):
+        try:
+            self.queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+
+class DatabaseLogWriter:
+    """Background thread that inserts queued log entries into the logs table in batches"""
+
+    def __init__(self, log_queue: queue.Queue, batch_size: int, flush_interval: float, session_factory=SessionLocal):
+        self.queue = log_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.session_factory = session_factory
+        self.written = 0
+        self.failed = 0
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="db-log-writer", daemon=True)
+        self._thread.start()
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Wait until everything queued before this call has been written. A marker
+        goes through the queue behind those entries and the thread signals once
+        it gets there; returns False on timeout or if the thread isn't running.
+        """
+        if self._thread is None:
+            return False
+        flushed = threading.Event()
         try:
-            db = next(get_db())
-            log_entry = Log(
-                timestamp=datetime.utcnow(),
-                employee_id=getattr(record, 'employee_id', None),
-                action=getattr(record, 'action', 'system'),
-                details=record.getMessage()
-            )
-            db.add(log_entry)
+            self.queue.put(flushed, timeout=timeout)
+        except queue.Full:
+            return False
+        return flushed.wait(timeout)
+
+    def stop(self):
+        """Write everything still queued, then stop the thread for good"""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        while not (self._stopping.is_set() and self.queue.empty()):
+            try:
+                batch = [self.queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            # flush() markers are signalled once the entries ahead of them are written
+            flushed = [entry for entry in batch if isinstance(entry, threading.Event)]
+            entries = [entry for entry in batch if not isinstance(entry, threading.Event)]
+            if entries:
+                self._write(entries)
+            for event in flushed:
+                event.set()
+
+    def _write(self, batch):
+        db = self.session_factory()
+        try:
+            db.execute(insert(Log.__table__), batch)
             db.commit()
-            db.close()
+            self.written += len(batch)
         except Exception:
             # Fallback to console if DB logging fails
-            pass
+            db.rollback()
+            self.failed += len(batch)
+        finally:
+            db.close()
+
+_log_queue = queue.Queue(maxsize=settings.LOG_DB_QUEUE_SIZE)
+database_handler = DatabaseHandler(_log_queue)
+database_log_writer = DatabaseLogWriter(_log_queue, settings.LOG_DB_BATCH_SIZE, settings.LOG_DB_FLUSH_SECONDS)
+database_log_writer.start()
+atexit.register(database_log_writer.stop)
 
 # Configure logger
 logging.basicConfig(
@@ -32,13 +122,21 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     handlers=[
         logging.StreamHandler(sys.stdout),
-        DatabaseHandler()
+        database_handler
     ]
 )
 
 logger = logging.getLogger("email_campaign")
 
+def get_logger(name: str) -> logging.Logger:
+    """Per-module child of the application logger"""
+    return logger.getChild(name)
+
 def log_action(employee_id: int, action: str, details: str):
     """Helper function to log user actions"""
     extra = {'employee_id': employee_id, 'action': action}
     logger.info(details, extra=extra)
+
+def flush_logs(timeout: float = None) -> bool:
+    """Write all queued log entries to the database now (call on shutdown)"""
+    return database_log_writer.flush(timeout)
@@ -2,6 +2,7 @@ from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 import os
 from dotenv import load_dotenv
+from app.core.config import settings
 
 # Load environment variables from .env file
 load_dotenv()
@@ -9,7 +10,7 @@ load_dotenv()
 # Create async engine
 engine = create_async_engine(
     url=os.getenv("DATABASE_URL"),
-    echo=True  # Set False in production
+    echo=settings.DB_ECHO
 )
 
 # Create async session factory
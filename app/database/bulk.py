@@ -0,0 +1,52 @@
+### database/bulk.py
+from typing import List
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+def _dialect_insert(db: Session):
+    """The dialect's INSERT construct if it supports ON CONFLICT, else None"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        return None
+    return dialect_insert
+
+def insert_ignore(db: Session, model):
+    """
+    INSERT statement that silently skips rows violating a unique constraint
+    (ON CONFLICT DO NOTHING) on SQLite and PostgreSQL; a plain INSERT elsewhere.
+    """
+    dialect_insert = _dialect_insert(db)
+    if dialect_insert is None:
+        return insert(model)
+    return dialect_insert(model).on_conflict_do_nothing()
+
+def upsert_increment(db: Session, model, rows: List[dict], key_columns: List[str], counter: str):
+    """
+    Insert rows keyed by key_columns; where a row already exists, add the new
+    `counter` value to it instead (INSERT ... ON CONFLICT DO UPDATE).
+    """
+    if not rows:
+        return
+    table = model.__table__
+    dialect_insert = _dialect_insert(db)
+    if dialect_insert is not None:
+        stmt = dialect_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=key_columns,
+            set_={counter: table.c[counter] + stmt.excluded[counter]}
+        )
+        db.execute(stmt, rows)
+        return
+
+    for row in rows:
+        updated = db.execute(
+            update(table).where(
+                *(table.c[column] == row[column] for column in key_columns)
+            ).values({counter: table.c[counter] + row[counter]})
+        ).rowcount
+        if not updated:
+            db.execute(insert(table).values(**row))
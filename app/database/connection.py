@@ -1,11 +1,50 @@
-
 ### database/connection.py
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from core.config import settings
 
-engine = create_engine(settings.DATABASE_URL, connect_args={"check_same_thread": False})
+def create_db_engine(database_url: str = None):
+    """Engine for DATABASE_URL with the pool and SQLite pragmas from settings"""
+    url = make_url(database_url or settings.DATABASE_URL)
+
+    if url.get_backend_name() != "sqlite":
+        return create_engine(
+            url,
+            echo=settings.DB_ECHO,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+            pool_pre_ping=settings.DB_POOL_PRE_PING
+        )
+
+    in_memory = url.database in (None, "", ":memory:")
+    pool_options = {} if in_memory else {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW
+    }
+    engine = create_engine(
+        url,
+        echo=settings.DB_ECHO,
+        connect_args={"check_same_thread": False, "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000},
+        **pool_options
+    )
+
+    @event.listens_for(engine, "connect")
+    def apply_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        # WAL lets readers run alongside the single writer; it needs a file
+        if not in_memory:
+            cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        cursor.close()
+
+    return engine
+
+engine = create_db_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -17,5 +56,9 @@ def get_db():
         db.close()
 
 def create_tables():
-    from database.models import Company, Employee, Customer, Segment, Campaign, CampaignRecipient, Log
+    from database.models import Company, Employee, Customer, Segment, Campaign, CampaignRecipient, CampaignJob, CampaignCounter, CampaignEvent, CampaignEventRollup, Log
+    from database.search import ensure_customer_search_index
     Base.metadata.create_all(bind=engine)
+    # Databases created before the search index existed
+    with engine.begin() as connection:
+        ensure_customer_search_index(connection)
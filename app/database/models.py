@@ -222,10 +222,11 @@
 
 
 # models.py
-from sqlalchemy import Column, String, DateTime, Text, JSON, ForeignKey, Boolean
+from sqlalchemy import Column, String, DateTime, Text, JSON, ForeignKey, Boolean, Integer, SmallInteger, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database.connection import Base
+from database.search import register_customer_search_index
 import uuid
 
 class Company(Base):
@@ -260,6 +261,11 @@ class Company(Base):
     employees = relationship("Employee", back_populates="company")
     customers = relationship("Customer", back_populates="company")
     campaigns = relationship("Campaign", back_populates="company")
+    
+    __table_args__ = (
+        # Keyset pagination of the company list
+        Index("ix_companies_created_at_id", "created_at", "id"),
+    )
 
 class Employee(Base):
     __tablename__ = "employees"
@@ -276,6 +282,11 @@ class Employee(Base):
     
     company = relationship("Company", back_populates="employees")
     created_campaigns = relationship("Campaign", back_populates="created_by")
+    
+    __table_args__ = (
+        # Per-company listings, keyset paginated on (created_at, id)
+        Index("ix_employees_company_id_created_at_id", "company_id", "created_at", "id"),
+    )
 
 class Customer(Base):
     __tablename__ = "customers"
@@ -292,13 +303,23 @@ class Customer(Base):
     
     company = relationship("Company", back_populates="customers")
     campaign_recipients = relationship("CampaignRecipient", back_populates="customer")
+    
+    __table_args__ = (
+        # Company listings and the per-company duplicate email check
+        Index("ix_customers_company_id_email", "company_id", "email"),
+        # Keyset pagination of a company's customers on (created_at, id)
+        Index("ix_customers_company_id_created_at_id", "company_id", "created_at", "id"),
+    )
+
+# Full-text search over name/email/location (see database/search.py)
+register_customer_search_index(Customer.__table__)
 
 class Segment(Base):
     __tablename__ = "segments"
     
     # UUID as primary key
     id = Column(String(8), primary_key=True, default=lambda: str(uuid.uuid4())[:8], index=True)
-    company_id = Column(String(36), ForeignKey("companies.id"), nullable=False)
+    company_id = Column(String(36), ForeignKey("companies.id"), nullable=False, index=True)
     name = Column(String(255), nullable=False)
     filters = Column(JSON, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -322,6 +343,13 @@ class Campaign(Base):
     company = relationship("Company", back_populates="campaigns")
     created_by = relationship("Employee", back_populates="created_campaigns")
     recipients = relationship("CampaignRecipient", back_populates="campaign")
+    
+    __table_args__ = (
+        # Lets the scheduler find due campaigns without scanning the table
+        Index("ix_campaigns_status_scheduled_at", "status", "scheduled_at"),
+        # Per-company campaign listings, keyset paginated on (created_at, id)
+        Index("ix_campaigns_company_id_created_at_id", "company_id", "created_at", "id"),
+    )
 
 class CampaignRecipient(Base):
     __tablename__ = "campaign_recipients"
@@ -329,14 +357,90 @@ class CampaignRecipient(Base):
     # UUID as primary key
     id = Column(String(8), primary_key=True, default=lambda: str(uuid.uuid4())[:8], index=True)
     campaign_id = Column(String(36), ForeignKey("campaigns.id"), nullable=False)
-    customer_id = Column(String(36), ForeignKey("customers.id"), nullable=False)
-    status = Column(String(50), default="pending")  # pending, sent, opened, clicked, bounced
+    customer_id = Column(String(36), ForeignKey("customers.id"), nullable=False, index=True)
+    status = Column(String(50), default="pending")  # pending, sending, sent, failed, opened, clicked, bounced
     sent_at = Column(DateTime(timezone=True))
     opened_at = Column(DateTime(timezone=True))
     clicked_at = Column(DateTime(timezone=True))
     
+    # Set when a dispatch worker claims the recipient (status "sending")
+    claimed_by = Column(String(64))
+    claimed_at = Column(DateTime(timezone=True))
+    
     campaign = relationship("Campaign", back_populates="recipients")
     customer = relationship("Customer", back_populates="campaign_recipients")
+    
+    __table_args__ = (
+        UniqueConstraint("campaign_id", "customer_id", name="uq_campaign_recipients_campaign_customer"),
+        # Lets dispatch claims and pending counts walk only a campaign's rows in one status, in ID order
+        Index("ix_campaign_recipients_campaign_status_id", "campaign_id", "status", "id"),
+        # Lets the stale-claim sweep find old "sending" rows without scanning the table
+        Index("ix_campaign_recipients_status_claimed_at", "status", "claimed_at"),
+    )
+
+class CampaignJob(Base):
+    __tablename__ = "campaign_jobs"
+    
+    # UUID as primary key
+    id = Column(String(8), primary_key=True, default=lambda: str(uuid.uuid4())[:8], index=True)
+    campaign_id = Column(String(36), ForeignKey("campaigns.id"), nullable=False, index=True)
+    created_by_employee_id = Column(String(36), ForeignKey("employees.id"), nullable=False)
+    status = Column(String(50), default="queued")  # queued, running, completed, failed
+    total_count = Column(Integer, default=0)
+    sent_count = Column(Integer, default=0)
+    failed_count = Column(Integer, default=0)
+    error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+    
+    __table_args__ = (
+        Index("ix_campaign_jobs_status_created_at", "status", "created_at"),
+    )
+
+# Per-campaign recipient counts, kept current by the recipient, send and tracking paths
+class CampaignCounter(Base):
+    __tablename__ = "campaign_counters"
+    
+    campaign_id = Column(String(36), ForeignKey("campaigns.id"), primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+    sent = Column(Integer, nullable=False, default=0)  # handed to SMTP, including later bounces
+    failed = Column(Integer, nullable=False, default=0)
+    opened = Column(Integer, nullable=False, default=0)
+    clicked = Column(Integer, nullable=False, default=0)
+    bounced = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+# CampaignEvent.event_type values
+EVENT_OPEN = 1
+EVENT_CLICK = 2
+
+# Append-only log of every open and click, including repeats
+class CampaignEvent(Base):
+    __tablename__ = "campaign_events"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    campaign_id = Column(String(36), nullable=False)
+    recipient_id = Column(String(8), nullable=False)
+    event_type = Column(SmallInteger, nullable=False)  # EVENT_OPEN, EVENT_CLICK
+    occurred_at = Column(DateTime(timezone=True), nullable=False)
+    user_agent = Column(String(512))
+    ip_address = Column(String(45))
+    url = Column(Text)  # clicks only
+    
+    __table_args__ = (
+        Index("ix_campaign_events_campaign_occurred_at", "campaign_id", "occurred_at"),
+    )
+
+# Event counts per campaign, event type and minute/hour bucket, kept up to date as events are written
+class CampaignEventRollup(Base):
+    __tablename__ = "campaign_event_rollups"
+    
+    campaign_id = Column(String(36), primary_key=True)
+    granularity = Column(String(8), primary_key=True)  # minute, hour
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    event_type = Column(SmallInteger, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
 
 class Log(Base):
     __tablename__ = "logs"
@@ -346,4 +450,11 @@ class Log(Base):
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
     employee_id = Column(String(36), ForeignKey("employees.id"))
     action = Column(String(255), nullable=False)
-    details = Column(Text)
\ No newline at end of file
+    details = Column(Text)
+    
+    __table_args__ = (
+        # Audit queries filter by employee or action and a time range; archival scans by age
+        Index("ix_logs_timestamp", "timestamp"),
+        Index("ix_logs_employee_id_timestamp", "employee_id", "timestamp"),
+        Index("ix_logs_action_timestamp", "action", "timestamp"),
+    )
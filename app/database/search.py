@@ -0,0 +1,113 @@
+### database/search.py
+import weakref
+from sqlalchemy import event, inspect, text
+
+# Columns of `customers` covered by the search index, most important first
+CUSTOMER_SEARCH_COLUMNS = ["name", "email", "location"]
+CUSTOMER_SEARCH_WEIGHTS = [10.0, 5.0, 1.0]  # bm25 weights, same order
+CUSTOMER_SEARCH_TABLE = "customers_fts"
+CUSTOMER_SEARCH_KEYS_TABLE = "customer_search_keys"
+# The trigram tokenizer matches substrings of at least three characters
+MIN_INDEXED_QUERY_LENGTH = 3
+
+# Engine -> whether its database has the FTS5 table
+_search_index_by_engine = weakref.WeakKeyDictionary()
+
+def _sqlite_ddl():
+    columns = ", ".join(CUSTOMER_SEARCH_COLUMNS)
+    new_values = ", ".join(f"new.{column}" for column in CUSTOMER_SEARCH_COLUMNS)
+    key_of_old = f"(SELECT rowid FROM {CUSTOMER_SEARCH_KEYS_TABLE} WHERE customer_id = old.id)"
+    key_of_new = f"(SELECT rowid FROM {CUSTOMER_SEARCH_KEYS_TABLE} WHERE customer_id = new.id)"
+    delete_old = (
+        f"DELETE FROM {CUSTOMER_SEARCH_TABLE} WHERE rowid = {key_of_old}; "
+        f"DELETE FROM {CUSTOMER_SEARCH_KEYS_TABLE} WHERE customer_id = old.id;"
+    )
+    insert_new = (
+        f"INSERT INTO {CUSTOMER_SEARCH_KEYS_TABLE}(customer_id) VALUES (new.id); "
+        f"INSERT INTO {CUSTOMER_SEARCH_TABLE}(rowid, customer_id, {columns}) VALUES ({key_of_new}, new.id, {new_values});"
+    )
+    return [
+        # Standalone FTS5 table joined to `customers` on customer_id, so it
+        # doesn't depend on the implicit rowid of `customers` (VACUUM may renumber it)
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {CUSTOMER_SEARCH_TABLE} USING fts5("
+        f"customer_id UNINDEXED, {columns}, tokenize='trigram')",
+        # customer_id -> FTS rowid, so the triggers find a customer's entry
+        # without scanning the unindexed column
+        f"CREATE TABLE IF NOT EXISTS {CUSTOMER_SEARCH_KEYS_TABLE} ("
+        f"rowid INTEGER PRIMARY KEY, customer_id VARCHAR(36) NOT NULL UNIQUE)",
+        f"CREATE TRIGGER IF NOT EXISTS customers_fts_insert AFTER INSERT ON customers BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS customers_fts_delete AFTER DELETE ON customers BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS customers_fts_update AFTER UPDATE OF id, {columns} ON customers BEGIN {delete_old} {insert_new} END",
+    ]
+
+def _drop_sqlite_index(connection):
+    for trigger in ("customers_fts_insert", "customers_fts_delete", "customers_fts_update"):
+        connection.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+    connection.execute(text(f"DROP TABLE IF EXISTS {CUSTOMER_SEARCH_TABLE}"))
+    connection.execute(text(f"DROP TABLE IF EXISTS {CUSTOMER_SEARCH_KEYS_TABLE}"))
+    _search_index_by_engine.pop(connection.engine, None)
+
+def _postgresql_ddl():
+    return ["CREATE EXTENSION IF NOT EXISTS pg_trgm"] + [
+        f"CREATE INDEX IF NOT EXISTS ix_customers_{column}_trgm ON customers USING gin ({column} gin_trgm_ops)"
+        for column in CUSTOMER_SEARCH_COLUMNS
+    ]
+
+def ensure_customer_search_index(connection):
+    """
+    Create the customer search index if it is missing and fill it from the
+    existing rows. SQLite gets an FTS5 trigram table kept in sync by triggers,
+    PostgreSQL gets pg_trgm GIN indexes; other databases fall back to LIKE.
+    """
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        inspector = inspect(connection)
+        existed = inspector.has_table(CUSTOMER_SEARCH_KEYS_TABLE)
+        if not existed and inspector.has_table(CUSTOMER_SEARCH_TABLE):
+            # Earlier external-content layout keyed on customers.rowid
+            _drop_sqlite_index(connection)
+        for statement in _sqlite_ddl():
+            connection.execute(text(statement))
+        if not existed:
+            rebuild_customer_search_index(connection)
+        _search_index_by_engine.pop(connection.engine, None)
+    elif dialect == "postgresql":
+        for statement in _postgresql_ddl():
+            connection.execute(text(statement))
+
+def drop_customer_search_index(connection):
+    """Remove what ensure_customer_search_index created"""
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        _drop_sqlite_index(connection)
+    elif dialect == "postgresql":
+        for column in CUSTOMER_SEARCH_COLUMNS:
+            connection.execute(text(f"DROP INDEX IF EXISTS ix_customers_{column}_trgm"))
+
+def rebuild_customer_search_index(connection):
+    """Re-read every customer into the FTS5 table"""
+    columns = ", ".join(CUSTOMER_SEARCH_COLUMNS)
+    values = ", ".join(f"customers.{column}" for column in CUSTOMER_SEARCH_COLUMNS)
+    connection.execute(text(f"DELETE FROM {CUSTOMER_SEARCH_TABLE}"))
+    connection.execute(text(f"DELETE FROM {CUSTOMER_SEARCH_KEYS_TABLE}"))
+    connection.execute(text(f"INSERT INTO {CUSTOMER_SEARCH_KEYS_TABLE}(customer_id) SELECT id FROM customers"))
+    connection.execute(text(
+        f"INSERT INTO {CUSTOMER_SEARCH_TABLE}(rowid, customer_id, {columns}) "
+        f"SELECT keys.rowid, customers.id, {values} FROM customers "
+        f"JOIN {CUSTOMER_SEARCH_KEYS_TABLE} keys ON keys.customer_id = customers.id"
+    ))
+
+def has_customer_search_index(db) -> bool:
+    """True if search can use the FTS5 table (SQLite only); looked up once per engine"""
+    engine = db.get_bind().engine
+    if engine not in _search_index_by_engine:
+        _search_index_by_engine[engine] = engine.dialect.name == "sqlite" and inspect(engine).has_table(CUSTOMER_SEARCH_KEYS_TABLE)
+    return _search_index_by_engine[engine]
+
+def fts_phrase(query: str) -> str:
+    """Quote user input as a single FTS5 phrase, i.e. a literal substring match"""
+    return '"' + query.replace('"', '""') + '"'
+
+def register_customer_search_index(customers_table):
+    """Build the index whenever `customers` itself is created (create_all)"""
+    event.listen(customers_table, "after_create", lambda target, connection, **kw: ensure_customer_search_index(connection))
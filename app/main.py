@@ -2,17 +2,24 @@ from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import uvicorn
+import anyio
 
 from core.config import settings
 from core.exceptions import AuthError, ValidationError, EmailSendError
-from core.logger import logger
+from core.logger import logger, flush_logs
 from database.connection import create_tables
 from modules.auth.controllers import auth_router
 from modules.companies.compaines_controllers import companies_router
 from modules.employees.employees_controllers import employees_router
 from modules.customers.customers_controllers import customers_router
 from modules.campaigns.campaigns_controllers import campaigns_router
+from modules.campaigns.campaigns_worker import start_campaign_workers, stop_campaign_workers
+from modules.campaigns.campaigns_scheduler import CampaignScheduler
 from modules.tracking.controllers import tracking_router
+from modules.tracking.buffer import tracking_buffer
+from modules.logs.logs_controllers import logs_router
+from modules.logs.logs_archiver import LogArchiver
+from utils.email_service import email_service
 
 app = FastAPI(
     title="Email Campaign Management System",
@@ -61,12 +68,34 @@ app.include_router(employees_router, prefix="/api/employees", tags=["Employees"]
 app.include_router(customers_router, prefix="/api/customers", tags=["Customers"])
 app.include_router(campaigns_router, prefix="/api/campaigns", tags=["Campaigns"])
 app.include_router(tracking_router, prefix="/api/tracking", tags=["Tracking"])
+app.include_router(logs_router, prefix="/api/logs", tags=["Audit Logs"])
 
 @app.on_event("startup")
 async def startup_event():
+    # DB-bound handlers are plain `def` and run in this pool, off the event loop
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.REQUEST_THREADPOOL_SIZE
     create_tables()
+    tracking_buffer.start()
+    app.state.log_archiver = LogArchiver()
+    app.state.log_archiver.start()
+    # Set CAMPAIGN_WORKER_ENABLED=false when workers run as separate processes (scripts/run_worker.py)
+    app.state.campaign_workers = start_campaign_workers() if settings.CAMPAIGN_WORKER_ENABLED else []
+    app.state.campaign_scheduler = CampaignScheduler() if settings.CAMPAIGN_SCHEDULER_ENABLED else None
+    if app.state.campaign_scheduler:
+        app.state.campaign_scheduler.start()
     logger.info("Application started successfully")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    if app.state.campaign_scheduler:
+        await app.state.campaign_scheduler.stop()
+    await stop_campaign_workers(app.state.campaign_workers)
+    await tracking_buffer.stop()
+    await app.state.log_archiver.stop()
+    email_service.close()
+    logger.info("Application stopped")
+    flush_logs()
+
 @app.get("/")
 async def root():
     return {
@@ -79,7 +108,8 @@ async def root():
             "employees": "/api/employees",
             "customers": "/api/customers",
             "campaigns": "/api/campaigns",
-            "tracking": "/api/tracking"
+            "tracking": "/api/tracking",
+            "logs": "/api/logs"
         }
     }
 
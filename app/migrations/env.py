@@ -0,0 +1,31 @@
+### migrations/env.py
+from logging.config import fileConfig
+from alembic import context
+from database.connection import Base, create_db_engine
+import database.models  # registers every table on Base.metadata
+
+if context.config.config_file_name is not None:
+    fileConfig(context.config.config_file_name)
+
+target_metadata = Base.metadata
+
+def run_migrations_offline():
+    from core.config import settings
+    context.configure(url=settings.DATABASE_URL, target_metadata=target_metadata, literal_binds=True, render_as_batch=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online():
+    # sqlalchemy.url is unset in alembic.ini; tests point it at a scratch database
+    engine = create_db_engine(context.config.get_main_option("sqlalchemy.url"))
+    with engine.connect() as connection:
+        # Batch mode lets SQLite alter tables by copying them
+        context.configure(connection=connection, target_metadata=target_metadata, render_as_batch=True)
+        with context.begin_transaction():
+            context.run_migrations()
+    engine.dispose()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
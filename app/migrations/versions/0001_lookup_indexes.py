@@ -0,0 +1,38 @@
+"""Indexes on the foreign-key and lookup columns every service filters on
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16
+
+create_tables() only creates missing tables, so databases created before
+these indexes were declared in database/models.py need this revision.
+Each index is skipped if it already exists.
+"""
+from alembic import op
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_customers_company_id_email", "customers", ["company_id", "email"]),
+    ("ix_employees_company_id", "employees", ["company_id"]),
+    ("ix_segments_company_id", "segments", ["company_id"]),
+    ("ix_campaigns_company_id_created_at", "campaigns", ["company_id", "created_at"]),
+    ("ix_campaigns_status_scheduled_at", "campaigns", ["status", "scheduled_at"]),
+    ("ix_campaign_recipients_customer_id", "campaign_recipients", ["customer_id"]),
+    ("ix_campaign_recipients_campaign_status_id", "campaign_recipients", ["campaign_id", "status", "id"]),
+    ("ix_campaign_recipients_stats", "campaign_recipients", ["campaign_id", "status", "opened_at", "clicked_at"]),
+    ("ix_logs_timestamp", "logs", ["timestamp"]),
+    ("ix_logs_employee_id_timestamp", "logs", ["employee_id", "timestamp"]),
+    ("ix_logs_action_timestamp", "logs", ["action", "timestamp"]),
+]
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
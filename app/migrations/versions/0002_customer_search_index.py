@@ -0,0 +1,22 @@
+"""Full-text search index on customers
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16
+
+SQLite: FTS5 trigram table over name/email/location kept in sync by
+triggers, filled from the existing rows. PostgreSQL: pg_trgm GIN indexes.
+"""
+from alembic import op
+from database.search import ensure_customer_search_index, drop_customer_search_index
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    ensure_customer_search_index(op.get_bind())
+
+def downgrade():
+    drop_customer_search_index(op.get_bind())
@@ -0,0 +1,38 @@
+"""(created_at, id) indexes for keyset pagination of the list endpoints
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16
+
+The per-company (company_id, created_at, id) indexes also serve plain
+company_id lookups, so they replace the narrower employee and campaign ones.
+"""
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_companies_created_at_id", "companies", ["created_at", "id"]),
+    ("ix_employees_company_id_created_at_id", "employees", ["company_id", "created_at", "id"]),
+    ("ix_customers_company_id_created_at_id", "customers", ["company_id", "created_at", "id"]),
+    ("ix_campaigns_company_id_created_at_id", "campaigns", ["company_id", "created_at", "id"]),
+]
+SUPERSEDED = [
+    ("ix_employees_company_id", "employees", ["company_id"]),
+    ("ix_campaigns_company_id_created_at", "campaigns", ["company_id", "created_at"]),
+]
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+    for name, table, _ in SUPERSEDED:
+        op.drop_index(name, table_name=table, if_exists=True)
+
+def downgrade():
+    for name, table, columns in SUPERSEDED:
+        op.create_index(name, table, columns, if_not_exists=True)
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
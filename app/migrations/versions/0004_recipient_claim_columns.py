@@ -0,0 +1,39 @@
+"""Claim columns on campaign_recipients for the dispatch workers
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16
+
+create_tables() cannot add columns to an existing table, so databases
+created before claimed_by/claimed_at were declared need this revision.
+Columns that already exist (fresh create_all databases) are skipped.
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+COLUMNS = [
+    ("claimed_by", sa.String(64)),
+    ("claimed_at", sa.DateTime(timezone=True)),
+]
+
+def _existing_columns():
+    return {column["name"] for column in sa.inspect(op.get_bind()).get_columns("campaign_recipients")}
+
+def upgrade():
+    existing = _existing_columns()
+    with op.batch_alter_table("campaign_recipients") as batch_op:
+        for name, type_ in COLUMNS:
+            if name not in existing:
+                batch_op.add_column(sa.Column(name, type_))
+
+def downgrade():
+    existing = _existing_columns()
+    with op.batch_alter_table("campaign_recipients") as batch_op:
+        for name, _ in reversed(COLUMNS):
+            if name in existing:
+                batch_op.drop_column(name)
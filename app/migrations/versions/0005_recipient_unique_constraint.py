@@ -0,0 +1,47 @@
+"""One recipient row per (campaign, customer)
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-16
+
+Recipient inserts rely on uq_campaign_recipients_campaign_customer to skip
+customers already on a campaign (INSERT ... ON CONFLICT DO NOTHING), but
+create_tables() cannot add a constraint to an existing table. Duplicate
+rows left by the old per-row inserts are removed first, keeping the one
+that got furthest through sending.
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+CONSTRAINT = "uq_campaign_recipients_campaign_customer"
+
+def _has_constraint():
+    inspector = sa.inspect(op.get_bind())
+    return any(constraint["name"] == CONSTRAINT for constraint in inspector.get_unique_constraints("campaign_recipients"))
+
+def upgrade():
+    if _has_constraint():
+        return
+    op.execute(
+        "DELETE FROM campaign_recipients WHERE id IN ("
+        " SELECT id FROM ("
+        "  SELECT id, ROW_NUMBER() OVER ("
+        "   PARTITION BY campaign_id, customer_id"
+        "   ORDER BY CASE WHEN status = 'pending' THEN 1 ELSE 0 END, id"
+        "  ) AS position FROM campaign_recipients"
+        " ) ranked WHERE position > 1"
+        ")"
+    )
+    with op.batch_alter_table("campaign_recipients") as batch_op:
+        batch_op.create_unique_constraint(CONSTRAINT, ["campaign_id", "customer_id"])
+
+def downgrade():
+    if not _has_constraint():
+        return
+    with op.batch_alter_table("campaign_recipients") as batch_op:
+        batch_op.drop_constraint(CONSTRAINT, type_="unique")
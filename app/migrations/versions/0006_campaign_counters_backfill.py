@@ -0,0 +1,49 @@
+"""Counters row for every existing campaign
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-16
+
+create_campaign adds a zero campaign_counters row and bump_counters keeps it
+current, but campaigns created before the table existed have none. get_counters
+no longer writes on read, so their rows are computed from the recipients here,
+once, instead of lazily racing concurrent sends.
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    if "campaign_counters" not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table(
+            "campaign_counters",
+            sa.Column("campaign_id", sa.String(36), sa.ForeignKey("campaigns.id"), primary_key=True),
+            sa.Column("total", sa.Integer, nullable=False, server_default="0"),
+            sa.Column("sent", sa.Integer, nullable=False, server_default="0"),
+            sa.Column("failed", sa.Integer, nullable=False, server_default="0"),
+            sa.Column("opened", sa.Integer, nullable=False, server_default="0"),
+            sa.Column("clicked", sa.Integer, nullable=False, server_default="0"),
+            sa.Column("bounced", sa.Integer, nullable=False, server_default="0"),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+    op.execute(
+        "INSERT INTO campaign_counters (campaign_id, total, sent, failed, opened, clicked, bounced)"
+        " SELECT c.id,"
+        "  COUNT(r.id),"
+        "  COUNT(CASE WHEN r.status IN ('sent', 'opened', 'clicked', 'bounced') THEN 1 END),"
+        "  COUNT(CASE WHEN r.status = 'failed' THEN 1 END),"
+        "  COUNT(r.opened_at),"
+        "  COUNT(r.clicked_at),"
+        "  COUNT(CASE WHEN r.status = 'bounced' THEN 1 END)"
+        " FROM campaigns c LEFT JOIN campaign_recipients r ON r.campaign_id = c.id"
+        " WHERE c.id NOT IN (SELECT campaign_id FROM campaign_counters)"
+        " GROUP BY c.id"
+    )
+
+def downgrade():
+    # Rows are maintained incrementally after the backfill; nothing to undo
+    pass
@@ -0,0 +1,28 @@
+"""Index for the dispatch workers' stale-claim sweep
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-16
+
+The sweep looks for "sending" recipients whose claimed_at is older than the
+claim timeout across every campaign; without (status, claimed_at) that is a
+full scan of campaign_recipients under the write lock.
+"""
+from alembic import op
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_campaign_recipients_status_claimed_at", "campaign_recipients", ["status", "claimed_at"]),
+]
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
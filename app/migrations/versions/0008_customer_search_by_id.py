@@ -0,0 +1,26 @@
+"""Customer search index keyed on customers.id
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-16
+
+The FTS5 table from 0002 used customers' implicit rowid as its key, which
+VACUUM may renumber; search then returned the wrong customers. It is
+replaced by a standalone FTS5 table carrying customer_id, refilled from
+the existing rows.
+"""
+from alembic import op
+from database.search import ensure_customer_search_index
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Drops the rowid-keyed table and triggers if present, then rebuilds
+    ensure_customer_search_index(op.get_bind())
+
+def downgrade():
+    # The id-keyed index is harmless at 0007; 0002's downgrade removes it
+    pass
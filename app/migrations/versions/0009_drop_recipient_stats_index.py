@@ -0,0 +1,30 @@
+"""Drop the covering index for the campaign stats aggregate
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-16
+
+Campaign stats read campaign_counters now; the recipients are only counted
+for a campaign without a counters row, which 0006 backfilled, and that
+fallback is served by ix_campaign_recipients_campaign_status_id. Keeping
+ix_campaign_recipients_stats cost an index write on every status, open and
+click update of campaign_recipients.
+"""
+from alembic import op
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+SUPERSEDED = [
+    ("ix_campaign_recipients_stats", "campaign_recipients", ["campaign_id", "status", "opened_at", "clicked_at"]),
+]
+
+def upgrade():
+    for name, table, _ in SUPERSEDED:
+        op.drop_index(name, table_name=table, if_exists=True)
+
+def downgrade():
+    for name, table, columns in SUPERSEDED:
+        op.create_index(name, table, columns, if_not_exists=True)
@@ -158,7 +158,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.modules.auth.auth_service import (
     create_user,
     authenticate_user,
-    get_user_by_token,
+    resolve_token,
+    logout_user,
+    invalidate_user_tokens,
     create_company,
     get_user_company,
     update_company
@@ -172,6 +174,7 @@ from app.modules.auth.auth_schemas import (
     CompanyUpdateRequest,
     CompanyResponse
 )
+from app.modules.auth.auth_token_sweeper import TokenSweeper
 from app.database.session import get_session
 from app.core.logger import get_logger
 
@@ -182,17 +185,33 @@ router = APIRouter(
     tags=["Auth"]
 )
 
-def get_current_user(authorization: str = Header(...)):
+# Deletes expired and revoked tokens for as long as the app that mounts this router runs
+token_sweeper = TokenSweeper()
+
+@router.on_event("startup")
+async def start_token_sweeper():
+    token_sweeper.start()
+
+@router.on_event("shutdown")
+async def stop_token_sweeper():
+    await token_sweeper.stop()
+
+def get_bearer_token(authorization: str = Header(...)) -> str:
     """
-    Dependency to extract token from header and verify.
+    Dependency to extract token from header.
     Header format: Authorization: Bearer <token>
     """
     if not authorization.startswith("Bearer "):
         logger.warning("Authorization header missing or invalid")
         raise HTTPException(status_code=401, detail="Invalid authorization header")
-    
-    token = authorization.split(" ")[1]
-    user_info = get_user_by_token(token)
+    return authorization.split(" ")[1]
+
+async def get_current_user(token: str = Depends(get_bearer_token), session: AsyncSession = Depends(get_session)):
+    """
+    Dependency to verify the token; returns {"id", "uid", "email", "company_id"}.
+    Served from the token cache after the first call.
+    """
+    user_info = await resolve_token(token, session)
     if not user_info:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
     return user_info
@@ -231,6 +250,15 @@ async def login_user(
     except ValueError as e:
         raise HTTPException(status_code=401, detail=str(e))
 
+@router.post("/logout")
+async def logout(
+    token: str = Depends(get_bearer_token),
+    session: AsyncSession = Depends(get_session)
+):
+    """Deactivate the current access token"""
+    await logout_user(token, session)
+    return {"message": "Logged out successfully"}
+
 @router.get("/profile", response_model=UserResponse)
 async def get_user_profile(
     user=Depends(get_current_user),
@@ -311,6 +339,7 @@ async def delete_user_company(
         # Delete company
         await session.execute(delete(Company).where(Company.user_id == user_id))
         await session.commit()
+        invalidate_user_tokens(user_id)
         
         logger.info(f"Deleted company for user {user_id}")
         return {"message": "Company deleted successfully"}
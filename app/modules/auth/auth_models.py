@@ -59,7 +59,7 @@
 
 
 # auth_models.py
-from sqlalchemy import Column, String, DateTime, Text, Boolean
+from sqlalchemy import Column, String, DateTime, Text, Boolean, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
 import uuid
@@ -105,6 +105,14 @@ class UserToken(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
     
+    __table_args__ = (
+        # Token rotation deactivates a user's active tokens in one indexed UPDATE
+        Index("ix_user_tokens_user_id_is_active", "user_id", "is_active"),
+        # Let the sweeper find expired and revoked tokens without a full scan
+        Index("ix_user_tokens_expires_at", "expires_at"),
+        Index("ix_user_tokens_is_active", "is_active"),
+    )
+    
     def __repr__(self):
         return f"<UserToken(id='{self.id}', user_id='{self.user_id}')>"
 
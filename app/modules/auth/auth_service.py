@@ -137,13 +137,16 @@
 
 
 # auth_service.py
+import time
 import secrets
 import hashlib
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.sql import func
+from app.core.config import settings
 from app.core.logger import get_logger
 from app.modules.auth.auth_models import User, UserToken, Company
 from app.modules.auth.auth_schemas import UserCreateRequest, UserLoginRequest, CompanyCreateRequest, CompanyUpdateRequest
@@ -155,6 +158,9 @@ logger = get_logger("AuthService")
 TOKEN_EXPIRE_HOURS = 24 * 7  # 7 days
 TOKEN_LENGTH = 32
 
+# Resolved tokens, so authenticated calls skip the database in the steady state
+_token_cache = OrderedDict()  # sha256(token) -> (identity, cached until), least recently used first
+
 def hash_password(password: str) -> str:
     """Hash password using SHA-256 with salt"""
     salt = secrets.token_hex(16)
@@ -232,13 +238,13 @@ async def authenticate_user(credentials: UserLoginRequest, session: AsyncSession
         access_token = generate_token()
         expires_at = datetime.utcnow() + timedelta(hours=TOKEN_EXPIRE_HOURS)
         
-        # Deactivate old tokens for this user
+        # Deactivate old tokens for this user in one UPDATE on (user_id, is_active)
         await session.execute(
-            select(UserToken).where(UserToken.user_id == user.id).where(UserToken.is_active == True)
+            update(UserToken)
+            .where(UserToken.user_id == user.id)
+            .where(UserToken.is_active == True)
+            .values(is_active=False)
         )
-        old_tokens = await session.execute(select(UserToken).where(UserToken.user_id == user.id))
-        for token in old_tokens.scalars():
-            token.is_active = False
         
         # Create new token
         user_token = UserToken(
@@ -252,6 +258,7 @@ async def authenticate_user(credentials: UserLoginRequest, session: AsyncSession
         user.last_login = func.now()
         
         await session.commit()
+        invalidate_user_tokens(user.id)
         
         logger.info(f"User authenticated: {user.email}")
         return user, access_token
@@ -263,15 +270,72 @@ async def authenticate_user(credentials: UserLoginRequest, session: AsyncSession
         logger.error(f"Error authenticating user: {e}")
         raise HTTPException(status_code=500, detail="Database error")
 
-def get_user_by_token(token: str) -> Optional[dict]:
+def _token_key(token: str) -> str:
+    """Cache key; raw tokens are never kept in memory longer than the request"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def invalidate_token(token: str):
+    _token_cache.pop(_token_key(token), None)
+
+def invalidate_user_tokens(user_id: str):
+    """Drop every cached token of a user (token rotation, company changes)"""
+    for key in [key for key, (identity, _) in _token_cache.items() if identity["id"] == user_id]:
+        del _token_cache[key]
+
+async def resolve_token(token: str, session: AsyncSession) -> Optional[dict]:
     """
-    Verify token and return user info.
-    This is a synchronous function for the dependency.
+    Resolve an access token to its active user and company in one query.
+    Returns {"id", "uid", "email", "company_id"} or None; results are cached
+    by token hash for settings.TOKEN_CACHE_TTL_SECONDS, never past the token's expiry.
     """
-    # In a real application, you'd want to make this async and check the database
-    # For now, we'll return a simple implementation
-    # You should implement proper async token verification
-    return {"id": "user-id-from-token", "email": "user@example.com"}
+    key = _token_key(token)
+    entry = _token_cache.get(key)
+    now = time.monotonic()
+    if entry is not None:
+        if entry[1] > now:
+            _token_cache.move_to_end(key)
+            return entry[0]
+        del _token_cache[key]
+    
+    try:
+        result = await session.execute(
+            select(UserToken.expires_at, User.id, User.email, Company.id)
+            .join(User, User.id == UserToken.user_id)
+            .outerjoin(Company, Company.user_id == User.id)
+            .where(UserToken.access_token == token)
+            .where(UserToken.is_active == True)
+            .where(UserToken.expires_at > datetime.utcnow())
+            .where(User.is_active == True)
+        )
+        row = result.first()
+    except Exception as e:
+        logger.error(f"Error resolving token: {e}")
+        return None
+    
+    if not row:
+        return None
+    
+    expires_at, user_id, email, company_id = row
+    identity = {"id": user_id, "uid": user_id, "email": email, "company_id": company_id}
+    if settings.TOKEN_CACHE_SIZE > 0:
+        ttl = min(settings.TOKEN_CACHE_TTL_SECONDS, (expires_at.replace(tzinfo=None) - datetime.utcnow()).total_seconds())
+        _token_cache[key] = (identity, now + ttl)
+        _token_cache.move_to_end(key)
+        while len(_token_cache) > settings.TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
+    return identity
+
+async def logout_user(token: str, session: AsyncSession):
+    """Deactivate an access token"""
+    try:
+        await session.execute(update(UserToken).where(UserToken.access_token == token).values(is_active=False))
+        await session.commit()
+    except Exception as e:
+        await session.rollback()
+        logger.error(f"Error logging out: {e}")
+        raise HTTPException(status_code=500, detail="Database error")
+    finally:
+        invalidate_token(token)
 
 async def get_user_by_id(user_id: str, session: AsyncSession) -> Optional[User]:
     """Get user by ID"""
@@ -285,25 +349,15 @@ async def get_user_by_id(user_id: str, session: AsyncSession) -> Optional[User]:
 async def verify_token(token: str, session: AsyncSession) -> Optional[User]:
     """Verify access token and return user"""
     try:
-        # Get token from database
+        # Token and user in one round-trip
         result = await session.execute(
-            select(UserToken).where(UserToken.access_token == token)
+            select(User).join(UserToken, UserToken.user_id == User.id)
+            .where(UserToken.access_token == token)
             .where(UserToken.is_active == True)
             .where(UserToken.expires_at > datetime.utcnow())
+            .where(User.is_active == True)
         )
-        user_token = result.scalar_one_or_none()
-        
-        if not user_token:
-            return None
-        
-        # Get user
-        user_result = await session.execute(select(User).where(User.id == user_token.user_id))
-        user = user_result.scalar_one_or_none()
-        
-        if not user or not user.is_active:
-            return None
-        
-        return user
+        return result.scalar_one_or_none()
         
     except Exception as e:
         logger.error(f"Error verifying token: {e}")
@@ -325,6 +379,7 @@ async def create_company(user_id: str, company_data: CompanyCreateRequest, sessi
         session.add(new_company)
         await session.commit()
         await session.refresh(new_company)
+        invalidate_user_tokens(user_id)
         
         logger.info(f"Created company for user {user_id}: {new_company.company_name}")
         return new_company
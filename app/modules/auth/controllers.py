@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from database.connection import get_db
-from utils.security import get_current_employee
+from utils.security import get_current_employee, require_role, password_hasher
 from database.models import Employee
 from .services import AuthService
 from .schemas import LoginRequest, LoginResponse, EmployeeResponse
@@ -9,15 +9,20 @@ from .schemas import LoginRequest, LoginResponse, EmployeeResponse
 auth_router = APIRouter()
 
 @auth_router.post("/login", response_model=LoginResponse)
-async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
+def login(login_data: LoginRequest, db: Session = Depends(get_db)):
     auth_service = AuthService(db)
     return auth_service.authenticate_employee(login_data)
 
 @auth_router.get("/me", response_model=EmployeeResponse)
-async def get_current_user(current_employee: Employee = Depends(get_current_employee)):
+def get_current_user(current_employee: Employee = Depends(get_current_employee)):
     return current_employee
 
+@auth_router.get("/password-hashing/stats")
+def get_password_hashing_stats(current_employee: Employee = Depends(require_role(["admin"]))):
+    """Queue depth, wait times and rejections of the password hashing pool"""
+    return password_hasher.stats()
+
 @auth_router.post("/logout")
-async def logout(current_employee: Employee = Depends(get_current_employee)):
+def logout(current_employee: Employee = Depends(get_current_employee)):
     # In a real implementation, you might want to blacklist the token
     return {"message": "Logged out successfully"}
@@ -4,7 +4,7 @@ from core.config import settings
 from core.exceptions import AuthError
 from core.logger import log_action
 from database.models import Employee
-from utils.security import verify_password, create_access_token
+from utils.security import verify_password, get_password_hash, create_access_token, password_hasher, employee_cache
 from .schemas import LoginRequest, LoginResponse
 
 class AuthService:
@@ -27,6 +27,12 @@ class AuthService:
             log_action(employee.id, "login_failed", f"Invalid password for {login_data.email}")
             raise AuthError("Invalid credentials")
         
+        # Re-hash with the current cost factor now that the plain password is known
+        if password_hasher.needs_rehash(employee.password_hash):
+            employee.password_hash = get_password_hash(login_data.password)
+            self.db.commit()
+            employee_cache.invalidate(employee.id)
+        
         # Create access token
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
@@ -1,10 +1,12 @@
-from typing import List
-from fastapi import APIRouter, Depends, Query, Response
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query, Request, Response
 from fastapi.responses import Response as FastAPIResponse
 from sqlalchemy.orm import Session
 from database.connection import get_db
 from database.models import Employee
 from utils.security import get_current_employee, require_role
+from utils.pagination import set_page_headers
+from modules.tracking.buffer import tracking_buffer
 from .campaigns_services import CampaignService
 from .campaigns_schemas import (
     CampaignCreate,
@@ -13,13 +15,14 @@ from .campaigns_schemas import (
     CampaignSend,
     CampaignAddRecipients,
     CampaignStats,
-    CampaignRecipientStatus
+    CampaignRecipientStatus,
+    CampaignJobResponse
 )
 
 campaigns_router = APIRouter()
 
 @campaigns_router.post("/", response_model=CampaignResponse)
-async def create_campaign(
+def create_campaign(
     campaign_data: CampaignCreate,
     db: Session = Depends(get_db),
     current_employee: Employee = Depends(require_role(["admin", "marketing"]))
@@ -29,18 +32,23 @@ async def create_campaign(
     return service.create_campaign(campaign_data, current_employee)
 
 @campaigns_router.get("/", response_model=List[CampaignResponse])
-async def get_campaigns(
-    skip: int = Query(0, ge=0),
+def get_campaigns(
+    response: Response,
+    skip: int = Query(0, ge=0, description="Offset paging; prefer cursor"),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    include_total: bool = Query(False, description="Also return X-Total-Count (costs a COUNT)"),
     db: Session = Depends(get_db),
     current_employee: Employee = Depends(get_current_employee)
 ):
     """Get all campaigns with recipient counts"""
     service = CampaignService(db)
-    return service.get_campaigns(current_employee, skip, limit)
+    page = service.get_campaigns(current_employee, skip, limit, cursor, include_total)
+    set_page_headers(response, page)
+    return page.items
 
 @campaigns_router.get("/{campaign_id}", response_model=CampaignResponse)
-async def get_campaign(
+def get_campaign(
     campaign_id: str,  # Changed from int to str for UUID
     db: Session = Depends(get_db),
     current_employee: Employee = Depends(get_current_employee)
@@ -50,7 +58,7 @@ async def get_campaign(
     return service.get_campaign(campaign_id, current_employee)
 
 @campaigns_router.put("/{campaign_id}", response_model=CampaignResponse)
-async def update_campaign(
+def update_campaign(
     campaign_id: str,  # Changed from int to str for UUID
     campaign_data: CampaignUpdate,
     db: Session = Depends(get_db),
@@ -61,7 +69,7 @@ async def update_campaign(
     return service.update_campaign(campaign_id, campaign_data, current_employee)
 
 @campaigns_router.delete("/{campaign_id}")
-async def delete_campaign(
+def delete_campaign(
     campaign_id: str,  # Changed from int to str for UUID
     db: Session = Depends(get_db),
     current_employee: Employee = Depends(require_role(["admin", "marketing"]))
@@ -72,7 +80,7 @@ async def delete_campaign(
     return {"message": "Campaign deleted successfully"}
 
 @campaigns_router.post("/{campaign_id}/recipients")
-async def add_recipients(
+def add_recipients(
     campaign_id: str,  # Changed from int to str for UUID
     recipients_data: CampaignAddRecipients,
     db: Session = Depends(get_db),
@@ -83,7 +91,7 @@ async def add_recipients(
     return service.add_recipients(campaign_id, recipients_data, current_employee)
 
 @campaigns_router.post("/{campaign_id}/send")
-async def send_campaign(
+def send_campaign(
     campaign_id: str,  # Changed from int to str for UUID
     send_data: CampaignSend = CampaignSend(),  # Default empty body
     db: Session = Depends(get_db),
@@ -93,14 +101,37 @@ async def send_campaign(
     Send campaign:
     - If recipient_ids provided: send to those specific customers
     - If recipient_ids empty/null: send to all customers in company
-    - If schedule_at provided: schedule for later, otherwise send immediately
+    - If schedule_at provided: schedule for later, otherwise queue for immediate sending
+    
+    Sending happens in the background; poll the returned job_id for progress.
     """
     service = CampaignService(db)
-    result = await service.send_campaign(campaign_id, send_data, current_employee)
+    result = service.send_campaign(campaign_id, send_data, current_employee)
     return result
 
+@campaigns_router.post("/{campaign_id}/resume")
+def resume_campaign(
+    campaign_id: str,
+    db: Session = Depends(get_db),
+    current_employee: Employee = Depends(require_role(["admin", "marketing"]))
+):
+    """Resume a failed campaign send from where it stopped"""
+    service = CampaignService(db)
+    return service.resume_send(campaign_id, current_employee)
+
+@campaigns_router.get("/{campaign_id}/jobs/{job_id}", response_model=CampaignJobResponse)
+def get_send_job(
+    campaign_id: str,
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_employee: Employee = Depends(get_current_employee)
+):
+    """Get sent/failed progress of a background campaign send"""
+    service = CampaignService(db)
+    return service.get_send_job(campaign_id, job_id, current_employee)
+
 @campaigns_router.get("/{campaign_id}/stats", response_model=CampaignStats)
-async def get_campaign_stats(
+def get_campaign_stats(
     campaign_id: str,  # Changed from int to str for UUID
     db: Session = Depends(get_db),
     current_employee: Employee = Depends(get_current_employee)
@@ -110,7 +141,7 @@ async def get_campaign_stats(
     return service.get_campaign_stats(campaign_id, current_employee)
 
 @campaigns_router.get("/{campaign_id}/recipients", response_model=List[CampaignRecipientStatus])
-async def get_campaign_recipients(
+def get_campaign_recipients(
     campaign_id: str,  # Changed from int to str for UUID
     db: Session = Depends(get_db),
     current_employee: Employee = Depends(get_current_employee)
@@ -124,11 +155,17 @@ async def get_campaign_recipients(
 async def track_email_open(
     campaign_id: str,  # Changed from int to str for UUID
     recipient_id: str,  # Changed from int to str for UUID
-    db: Session = Depends(get_db)
+    request: Request
 ):
     """Track email open - returns 1x1 transparent pixel"""
-    service = CampaignService(db)
-    service.track_email_open(campaign_id, recipient_id)
+    # Validate 8-character ID formats; valid hits are queued and written in batches
+    if len(campaign_id) == 8 and len(recipient_id) == 8:
+        tracking_buffer.record_open(
+            campaign_id,
+            recipient_id,
+            user_agent=request.headers.get("user-agent", ""),
+            ip_address=request.client.host if request.client else None
+        )
     
     # Return 1x1 transparent pixel
     pixel_data = bytes.fromhex('47494638396101000100800000000000ffffff21f90401000000002c00000000010001000002024401003b')
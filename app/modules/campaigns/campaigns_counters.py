@@ -0,0 +1,87 @@
+### modules/campaigns/campaigns_counters.py
+from typing import Dict, List
+from sqlalchemy import func, case, update, bindparam
+from sqlalchemy.orm import Session
+from database.models import CampaignCounter, CampaignRecipient
+
+COUNTER_FIELDS = ("total", "sent", "failed", "opened", "clicked", "bounced")
+
+def bump_counters(db: Session, campaign_id: str, **deltas: int):
+    """
+    Add deltas (e.g. sent=3, failed=1) to a campaign's counters in the caller's
+    transaction. Every campaign gets its counters row when it is created (older
+    ones from migration 0006); campaigns without one are skipped and get_counters
+    counts their recipients instead.
+    """
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    columns = CampaignCounter.__table__.c
+    db.execute(
+        update(CampaignCounter.__table__).where(
+            columns.campaign_id == campaign_id
+        ).values({field: columns[field] + delta for field, delta in deltas.items()})
+    )
+
+def count_recipients(db: Session, campaign_ids: List[str]) -> Dict[str, dict]:
+    """Counter values computed from the recipients, without storing them"""
+    rows = db.query(
+        CampaignRecipient.campaign_id,
+        func.count(),
+        func.count(case((CampaignRecipient.status.in_(["sent", "opened", "clicked", "bounced"]), 1))),
+        func.count(case((CampaignRecipient.status == "failed", 1))),
+        func.count(CampaignRecipient.opened_at),
+        func.count(CampaignRecipient.clicked_at),
+        func.count(case((CampaignRecipient.status == "bounced", 1)))
+    ).filter(
+        CampaignRecipient.campaign_id.in_(campaign_ids)
+    ).group_by(CampaignRecipient.campaign_id).all()
+
+    counters = {campaign_id: dict.fromkeys(COUNTER_FIELDS, 0) for campaign_id in campaign_ids}
+    for campaign_id, *counts in rows:
+        counters[campaign_id] = dict(zip(COUNTER_FIELDS, counts))
+    return counters
+
+def rebuild_counters(db: Session, campaign_ids: List[str]) -> Dict[str, dict]:
+    """
+    Recount campaigns from their recipients and store the result in their
+    existing counters rows; the caller commits. The rows are written before
+    counting, so they stay locked (row locks on PostgreSQL, the write lock on
+    SQLite) until the commit: a concurrent bump_counters waits and adds its
+    delta on top of the recount instead of being overwritten by it.
+    """
+    if not campaign_ids:
+        return {}
+    columns = CampaignCounter.__table__.c
+    db.execute(
+        update(CampaignCounter.__table__).where(
+            columns.campaign_id.in_(campaign_ids)
+        ).values(total=columns.total)
+    )
+
+    counters = count_recipients(db, campaign_ids)
+    db.execute(
+        update(CampaignCounter.__table__).where(
+            columns.campaign_id == bindparam("cid")
+        ).values({field: bindparam(f"new_{field}") for field in COUNTER_FIELDS}),
+        [
+            {"cid": campaign_id, **{f"new_{field}": value for field, value in values.items()}}
+            for campaign_id, values in counters.items()
+        ]
+    )
+    return counters
+
+def get_counters(db: Session, campaign_ids: List[str]) -> Dict[str, dict]:
+    """Counters for the given campaigns; read-only, campaigns without a row are counted"""
+    columns = [getattr(CampaignCounter, field) for field in COUNTER_FIELDS]
+    counters = {
+        campaign_id: dict(zip(COUNTER_FIELDS, values))
+        for campaign_id, *values in db.query(CampaignCounter.campaign_id, *columns).filter(
+            CampaignCounter.campaign_id.in_(campaign_ids)
+        )
+    }
+
+    missing = [campaign_id for campaign_id in campaign_ids if campaign_id not in counters]
+    if missing:
+        counters.update(count_recipients(db, missing))
+    return counters
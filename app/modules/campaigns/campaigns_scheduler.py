@@ -0,0 +1,110 @@
+import asyncio
+from datetime import datetime
+from sqlalchemy import func
+from core.config import settings
+from core.logger import logger, log_action
+from database.connection import SessionLocal
+from database.models import Campaign, CampaignRecipient
+from .campaigns_services import CampaignService
+
+class CampaignScheduler:
+    """
+    Hands campaigns with status "scheduled" to the dispatch queue once their
+    scheduled_at has passed.
+
+    Several replicas can run at once: a campaign is only fired by the
+    replica whose conditional UPDATE moves it out of "scheduled".
+    """
+
+    def __init__(self, session_factory=SessionLocal, batch_size: int = 100):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.task = None
+        self._stopping = asyncio.Event()
+
+    def start(self) -> asyncio.Task:
+        """Run the scheduler as a task on the current event loop"""
+        self.task = asyncio.create_task(self.run())
+        return self.task
+
+    async def run(self):
+        logger.info("Campaign scheduler started")
+        while not self._stopping.is_set():
+            try:
+                delay = await asyncio.to_thread(self.fire_due_campaigns)
+            except Exception as e:
+                logger.error(f"Campaign scheduler error: {str(e)}")
+                delay = settings.CAMPAIGN_SCHEDULER_MAX_SLEEP_SECONDS
+
+            # Sleep until the next campaign is due, but wake up on stop()
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+        logger.info("Campaign scheduler stopped")
+
+    async def stop(self):
+        self._stopping.set()
+        if self.task:
+            await self.task
+
+    def fire_due_campaigns(self) -> float:
+        """Enqueue every due campaign; return seconds until the next one is due"""
+        db = self.session_factory()
+        try:
+            now = datetime.utcnow()
+            due_ids = [
+                campaign_id for (campaign_id,) in db.query(Campaign.id).filter(
+                    Campaign.status == "scheduled",
+                    Campaign.scheduled_at <= now
+                ).order_by(Campaign.scheduled_at).limit(self.batch_size)
+            ]
+
+            for campaign_id in due_ids:
+                self._fire(db, campaign_id)
+
+            if len(due_ids) == self.batch_size:
+                # More campaigns may be due right now
+                return 0
+
+            next_due = db.query(func.min(Campaign.scheduled_at)).filter(
+                Campaign.status == "scheduled"
+            ).scalar()
+        finally:
+            db.close()
+
+        max_sleep = settings.CAMPAIGN_SCHEDULER_MAX_SLEEP_SECONDS
+        if next_due is None:
+            return max_sleep
+        next_due = next_due.replace(tzinfo=None)
+        return min(max((next_due - datetime.utcnow()).total_seconds(), 0), max_sleep)
+
+    def _fire(self, db, campaign_id: str):
+        # Atomic claim: a replica that loses the race updates no row and moves on
+        claimed = db.query(Campaign).filter(
+            Campaign.id == campaign_id,
+            Campaign.status == "scheduled"
+        ).update({"status": "sending"}, synchronize_session=False)
+        if not claimed:
+            db.rollback()
+            return
+
+        campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+        pending_count = db.query(CampaignRecipient).filter(
+            CampaignRecipient.campaign_id == campaign_id,
+            CampaignRecipient.status == "pending"
+        ).count()
+
+        if not pending_count:
+            campaign.status = "failed"
+            db.commit()
+            log_action(campaign.created_by_employee_id, "campaign_failed", f"Scheduled campaign {campaign.title} has no pending recipients")
+            return
+
+        # The claim and the job insert commit together
+        job = CampaignService(db).enqueue_send(campaign, campaign.created_by_employee_id, pending_count)
+        log_action(
+            campaign.created_by_employee_id,
+            "campaign_queued",
+            f"Scheduled campaign {campaign.title} queued for {pending_count} recipients (job {job.id})"
+        )
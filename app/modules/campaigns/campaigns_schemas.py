@@ -49,6 +49,20 @@ class CampaignStats(BaseModel):
     open_rate: float
     click_rate: float
 
+class CampaignJobResponse(BaseModel):
+    """Progress of a background campaign send"""
+    job_id: str
+    campaign_id: str
+    status: str  # queued, running, completed, failed
+    total_count: int
+    sent_count: int
+    failed_count: int
+    pending_count: int
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
 class CampaignRecipientStatus(BaseModel):
     """Schema for campaign recipient with status"""
     recipient_id: str  # Changed from int to str for UUID
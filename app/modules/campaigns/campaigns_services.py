@@ -1,12 +1,14 @@
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timezone
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import select, exists
 import uuid
-from core.exceptions import ValidationError, EmailSendError
+from core.exceptions import ValidationError
 from core.logger import log_action
-from database.models import Campaign, CampaignRecipient, Customer, Employee
-from utils.email_service import email_service
+from database.bulk import insert_ignore
+from utils.pagination import Page, keyset_paginate
+from database.models import Campaign, CampaignRecipient, CampaignJob, CampaignCounter, Customer, Employee
+from .campaigns_counters import COUNTER_FIELDS, bump_counters, get_counters
 from .campaigns_schemas import (
     CampaignCreate, 
     CampaignUpdate, 
@@ -14,9 +16,13 @@ from .campaigns_schemas import (
     CampaignSend,
     CampaignAddRecipients,
     CampaignStats,
-    CampaignRecipientStatus
+    CampaignRecipientStatus,
+    CampaignJobResponse
 )
 
+# Customers handled per INSERT when materializing recipients
+RECIPIENT_CHUNK_SIZE = 500
+
 class CampaignService:
     def __init__(self, db: Session):
         self.db = db
@@ -32,6 +38,8 @@ class CampaignService:
         )
         
         self.db.add(campaign)
+        self.db.flush()
+        self.db.add(CampaignCounter(campaign_id=campaign.id, **dict.fromkeys(COUNTER_FIELDS, 0)))
         self.db.commit()
         self.db.refresh(campaign)
         
@@ -42,24 +50,31 @@ class CampaignService:
         response_data.recipient_count = 0
         return response_data
     
-    def get_campaigns(self, employee: Employee, skip: int = 0, limit: int = 100) -> List[CampaignResponse]:
-        """Get all campaigns with recipient counts"""
-        campaigns_query = self.db.query(
-            Campaign,
-            func.count(CampaignRecipient.id).label('recipient_count')
-        ).outerjoin(
-            CampaignRecipient, Campaign.id == CampaignRecipient.campaign_id
-        ).filter(
-            Campaign.company_id == employee.company_id
-        ).group_by(Campaign.id).offset(skip).limit(limit).all()
+    def get_campaigns(
+        self,
+        employee: Employee,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        include_total: bool = False
+    ) -> Page:
+        """Get campaigns with recipient counts, newest first, keyset paginated"""
+        page = keyset_paginate(
+            self.db.query(Campaign).filter(Campaign.company_id == employee.company_id),
+            Campaign.created_at, Campaign.id, cursor, limit, skip, include_total
+        )
+        campaigns = page.items
+        
+        # Read from campaign_counters instead of counting every recipient
+        counters = get_counters(self.db, [campaign.id for campaign in campaigns])
         
         result = []
-        for campaign, recipient_count in campaigns_query:
+        for campaign in campaigns:
             campaign_response = CampaignResponse.from_orm(campaign)
-            campaign_response.recipient_count = recipient_count or 0
+            campaign_response.recipient_count = counters[campaign.id]["total"]
             result.append(campaign_response)
         
-        return result
+        return page._replace(items=result)
     
     def get_campaign(self, campaign_id: str, employee: Employee) -> CampaignResponse:
         """Get single campaign with recipient count"""
@@ -76,9 +91,7 @@ class CampaignService:
             raise ValidationError("Campaign not found")
         
         # Get recipient count
-        recipient_count = self.db.query(CampaignRecipient).filter(
-            CampaignRecipient.campaign_id == campaign_id
-        ).count()
+        recipient_count = get_counters(self.db, [campaign_id])[campaign_id]["total"]
         
         response_data = CampaignResponse.from_orm(campaign)
         response_data.recipient_count = recipient_count
@@ -117,9 +130,7 @@ class CampaignService:
         log_action(employee.id, "campaign_updated", f"Updated campaign: {campaign.title}")
         
         # Get recipient count
-        recipient_count = self.db.query(CampaignRecipient).filter(
-            CampaignRecipient.campaign_id == campaign_id
-        ).count()
+        recipient_count = get_counters(self.db, [campaign_id])[campaign_id]["total"]
         
         response_data = CampaignResponse.from_orm(campaign)
         response_data.recipient_count = recipient_count
@@ -145,10 +156,11 @@ class CampaignService:
         # Store title for logging before deletion
         campaign_title = campaign.title
         
-        # Delete recipients first (cascade delete)
-        self.db.query(CampaignRecipient).filter(
-            CampaignRecipient.campaign_id == campaign_id
-        ).delete()
+        # Delete recipients, send jobs and counters first (cascade delete)
+        for model in (CampaignRecipient, CampaignJob, CampaignCounter):
+            self.db.query(model).filter(
+                model.campaign_id == campaign_id
+            ).delete()
         
         self.db.delete(campaign)
         self.db.commit()
@@ -178,37 +190,9 @@ class CampaignService:
         if campaign.status != "draft":
             raise ValidationError("Can only add recipients to draft campaigns")
         
-        added_count = 0
-        for customer_id in recipients_data.recipient_ids:
-            # Validate customer 8-character ID format
-            if not customer_id or len(customer_id) != 8:
-                continue  # Skip invalid IDs
-            
-            # Check if customer exists and belongs to company
-            customer = self.db.query(Customer).filter(
-                Customer.id == customer_id,
-                Customer.company_id == employee.company_id
-            ).first()
-            
-            if not customer:
-                continue
-            
-            # Check if already added
-            existing = self.db.query(CampaignRecipient).filter(
-                CampaignRecipient.campaign_id == campaign_id,
-                CampaignRecipient.customer_id == customer_id
-            ).first()
-            
-            if not existing:
-                recipient = CampaignRecipient(
-                    id=str(uuid.uuid4())[:8],  # Generate UUID for recipient
-                    campaign_id=campaign_id,
-                    customer_id=customer_id,
-                    status="pending"
-                )
-                self.db.add(recipient)
-                added_count += 1
-        
+        added_count = self._materialize_recipients(
+            campaign_id, employee.company_id, recipients_data.recipient_ids
+        )
         self.db.commit()
         
         log_action(
@@ -219,7 +203,7 @@ class CampaignService:
         
         return {"message": f"Added {added_count} recipients to campaign"}
     
-    async def send_campaign(
+    def send_campaign(
         self, 
         campaign_id: str, 
         send_data: CampaignSend, 
@@ -244,30 +228,13 @@ class CampaignService:
         # If specific recipients provided, add them
         if send_data.recipient_ids:
             # Clear existing recipients and add new ones
-            self.db.query(CampaignRecipient).filter(
+            removed = self.db.query(CampaignRecipient).filter(
                 CampaignRecipient.campaign_id == campaign_id
             ).delete()
+            # Draft recipients are all pending, so only the total changes
+            bump_counters(self.db, campaign_id, total=-removed)
             
-            for customer_id in send_data.recipient_ids:
-                # Validate customer 8-character ID format
-                if not customer_id or len(customer_id) != 8:
-                    continue  # Skip invalid IDs
-                
-                # Verify customer belongs to company
-                customer = self.db.query(Customer).filter(
-                    Customer.id == customer_id,
-                    Customer.company_id == employee.company_id
-                ).first()
-                
-                if customer:
-                    recipient = CampaignRecipient(
-                        id=str(uuid.uuid4())[:8],  # Generate UUID for recipient
-                        campaign_id=campaign_id,
-                        customer_id=customer_id,
-                        status="pending"
-                    )
-                    self.db.add(recipient)
-            
+            self._materialize_recipients(campaign_id, employee.company_id, send_data.recipient_ids)
             self.db.commit()
         
         # If no recipients specified and no existing recipients, add all customers
@@ -277,36 +244,26 @@ class CampaignService:
         
         if recipient_count == 0:
             # Add all customers as recipients
-            all_customers = self.db.query(Customer).filter(
-                Customer.company_id == employee.company_id
-            ).all()
-            
-            for customer in all_customers:
-                recipient = CampaignRecipient(
-                    id=str(uuid.uuid4())[:8],  # Generate UUID for recipient
-                    campaign_id=campaign_id,
-                    customer_id=customer.id,
-                    status="pending"
-                )
-                self.db.add(recipient)
-            
+            self._materialize_recipients(campaign_id, employee.company_id)
             self.db.commit()
         
-        # Get recipients with customer details
-        recipients = self.db.query(CampaignRecipient, Customer).join(
-            Customer, CampaignRecipient.customer_id == Customer.id
-        ).filter(
+        # Count recipients waiting to be sent
+        pending_count = self.db.query(CampaignRecipient).filter(
             CampaignRecipient.campaign_id == campaign_id,
             CampaignRecipient.status == "pending"
-        ).all()
+        ).count()
         
-        if not recipients:
+        if not pending_count:
             raise ValidationError("No recipients found for campaign")
         
         # Update campaign status
         if send_data.schedule_at:
             campaign.status = "scheduled"
-            campaign.scheduled_at = send_data.schedule_at
+            # Stored as naive UTC, like every other timestamp the scheduler compares against
+            schedule_at = send_data.schedule_at
+            if schedule_at.tzinfo is not None:
+                schedule_at = schedule_at.astimezone(timezone.utc).replace(tzinfo=None)
+            campaign.scheduled_at = schedule_at
             self.db.commit()
             
             log_action(
@@ -316,68 +273,193 @@ class CampaignService:
             )
             return {"message": "Campaign scheduled successfully"}
         else:
-            campaign.status = "sending"
-            self.db.commit()
-            
-            # Send emails immediately
-            return await self._send_emails(campaign, recipients, employee)
-    
-    async def _send_emails(self, campaign: Campaign, recipients: List, employee: Employee) -> dict:
-        """Send emails to all recipients"""
-        try:
-            recipient_list = []
-            for recipient, customer in recipients:
-                recipient_list.append({
-                    "email": customer.email,
-                    "recipient_id": recipient.id
-                })
-            
-            # Send bulk emails
-            results = await email_service.send_bulk_emails(
-                recipients=recipient_list,
-                subject=campaign.subject,
-                body=campaign.body,  # This should be HTML content
-                sender_email=campaign.sender_email,
-                campaign_id=campaign.id
-            )
-            
-            # Update campaign status
-            if results["failed"] == 0:
-                campaign.status = "sent"
-            else:
-                campaign.status = "partial"
-            
-            campaign.sent_at = datetime.utcnow()
-            
-            # Update recipient statuses
-            failed_emails = [error.split(":")[0] for error in results["errors"]]
-            for recipient, customer in recipients:
-                if customer.email not in failed_emails:
-                    recipient.status = "sent"
-                    recipient.sent_at = datetime.utcnow()
-                else:
-                    recipient.status = "failed"
-            
-            self.db.commit()
+            # Hand the campaign to the dispatch workers instead of sending inside the request
+            job = self.enqueue_send(campaign, employee.id, pending_count)
             
             log_action(
                 employee.id, 
-                "campaign_sent", 
-                f"Campaign {campaign.title} sent to {results['sent']} recipients, {results['failed']} failed"
+                "campaign_queued", 
+                f"Queued campaign {campaign.title} for {pending_count} recipients (job {job.id})"
             )
-            
             return {
-                "message": "Campaign sent successfully",
-                "sent_count": results["sent"],
-                "failed_count": results["failed"],
-                "errors": results["errors"]
+                "message": "Campaign queued for sending",
+                "job_id": job.id,
+                "status": job.status,
+                "total_recipients": pending_count
             }
-            
-        except Exception as e:
-            campaign.status = "failed"
-            self.db.commit()
-            log_action(employee.id, "campaign_failed", f"Campaign {campaign.title} failed: {str(e)}")
-            raise EmailSendError(f"Failed to send campaign: {str(e)}")
+    
+    def _materialize_recipients(
+        self,
+        campaign_id: str,
+        company_id: str,
+        customer_ids: Optional[List[str]] = None
+    ) -> int:
+        """
+        Add company customers as pending recipients, skipping ones already on
+        the campaign. Works in chunks of RECIPIENT_CHUNK_SIZE: one SELECT picks
+        the eligible customer IDs, one multi-row INSERT adds them. With
+        customer_ids=None every customer of the company is added.
+        Returns the number of recipients added; the caller commits.
+        """
+        not_on_campaign = ~exists().where(
+            CampaignRecipient.campaign_id == campaign_id,
+            CampaignRecipient.customer_id == Customer.id
+        )
+        eligible = select(Customer.id).where(
+            Customer.company_id == company_id,
+            not_on_campaign
+        )
+        
+        added_count = 0
+        if customer_ids is not None:
+            # Validate customer 8-character ID format and drop duplicates, keeping order
+            customer_ids = [cid for cid in dict.fromkeys(customer_ids) if cid and len(cid) == 8]
+            for start in range(0, len(customer_ids), RECIPIENT_CHUNK_SIZE):
+                chunk = customer_ids[start:start + RECIPIENT_CHUNK_SIZE]
+                found = self.db.execute(eligible.where(Customer.id.in_(chunk))).scalars().all()
+                added_count += self._insert_recipients(campaign_id, found)
+        else:
+            # Walk the company's customers in ID order (keyset pagination)
+            last_id = ""
+            while True:
+                found = self.db.execute(
+                    eligible.where(Customer.id > last_id).order_by(Customer.id).limit(RECIPIENT_CHUNK_SIZE)
+                ).scalars().all()
+                if not found:
+                    break
+                added_count += self._insert_recipients(campaign_id, found)
+                last_id = found[-1]
+        
+        bump_counters(self.db, campaign_id, total=added_count)
+        return added_count
+    
+    def _insert_recipients(self, campaign_id: str, customer_ids: List[str]) -> int:
+        """
+        Insert pending recipients in one statement, retrying any short-ID collisions.
+        Returns how many rows were added; customers already on the campaign are skipped.
+        """
+        def present(ids: List[str]) -> set:
+            return set(self.db.execute(
+                select(CampaignRecipient.customer_id).where(
+                    CampaignRecipient.campaign_id == campaign_id,
+                    CampaignRecipient.customer_id.in_(ids)
+                )
+            ).scalars())
+        
+        # Count from the driver's rowcount where executemany reports it, else count before and after
+        use_rowcount = self.db.get_bind().dialect.supports_sane_multi_rowcount
+        present_before = 0 if use_rowcount else len(present(customer_ids))
+        
+        added = 0
+        remaining = list(customer_ids)
+        for _ in range(3):
+            if not remaining:
+                break
+            # Core table insert, so the result carries the rowcount
+            result = self.db.execute(insert_ignore(self.db, CampaignRecipient.__table__), [
+                {
+                    "id": str(uuid.uuid4())[:8],  # Generate UUID for recipient
+                    "campaign_id": campaign_id,
+                    "customer_id": customer_id,
+                    "status": "pending"
+                }
+                for customer_id in remaining
+            ])
+            added += result.rowcount
+            # Rows whose generated ID clashed with an existing one were skipped
+            inserted = present(remaining)
+            remaining = [customer_id for customer_id in remaining if customer_id not in inserted]
+        
+        if remaining:
+            raise ValidationError("Failed to generate unique recipient IDs")
+        if not use_rowcount:
+            added = len(present(customer_ids)) - present_before
+        return added
+    
+    def enqueue_send(self, campaign: Campaign, employee_id: str, total_count: int) -> CampaignJob:
+        """Mark the campaign as sending and create the job the dispatch workers pick up"""
+        campaign.status = "sending"
+        job = CampaignJob(
+            id=str(uuid.uuid4())[:8],  # Generate UUID for job
+            campaign_id=campaign.id,
+            created_by_employee_id=employee_id,
+            status="queued",
+            total_count=total_count
+        )
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+    
+    def resume_send(self, campaign_id: str, employee: Employee) -> dict:
+        """Re-queue the last failed send job; workers continue from its last checkpoint"""
+        # Validate 8-character ID format
+        if not campaign_id or len(campaign_id) != 8:
+            raise ValidationError("Invalid campaign ID format")
+        
+        campaign = self.db.query(Campaign).filter(
+            Campaign.id == campaign_id,
+            Campaign.company_id == employee.company_id
+        ).first()
+        
+        if not campaign:
+            raise ValidationError("Campaign not found")
+        
+        job = self.db.query(CampaignJob).filter(
+            CampaignJob.campaign_id == campaign_id
+        ).order_by(CampaignJob.created_at.desc()).first()
+        
+        if campaign.status != "failed" or not job or job.status != "failed":
+            raise ValidationError("Only campaigns with a failed send can be resumed")
+        
+        # Recipients already sent or failed stay settled; pending ones are picked up again
+        job.status = "queued"
+        job.error = None
+        job.finished_at = None
+        campaign.status = "sending"
+        self.db.commit()
+        
+        log_action(employee.id, "campaign_resumed", f"Resumed campaign {campaign.title} (job {job.id})")
+        return {
+            "message": "Campaign send resumed",
+            "job_id": job.id,
+            "status": job.status,
+            "sent_count": job.sent_count or 0,
+            "failed_count": job.failed_count or 0
+        }
+    
+    def get_send_job(self, campaign_id: str, job_id: str, employee: Employee) -> CampaignJobResponse:
+        """Get progress of a campaign send job"""
+        # Validate 8-character ID formats
+        if not campaign_id or len(campaign_id) != 8:
+            raise ValidationError("Invalid campaign ID format")
+        if not job_id or len(job_id) != 8:
+            raise ValidationError("Invalid job ID format")
+        
+        job = self.db.query(CampaignJob).join(
+            Campaign, CampaignJob.campaign_id == Campaign.id
+        ).filter(
+            CampaignJob.id == job_id,
+            CampaignJob.campaign_id == campaign_id,
+            Campaign.company_id == employee.company_id
+        ).first()
+        
+        if not job:
+            raise ValidationError("Job not found")
+        
+        return CampaignJobResponse(
+            job_id=job.id,
+            campaign_id=job.campaign_id,
+            status=job.status,
+            total_count=job.total_count or 0,
+            sent_count=job.sent_count or 0,
+            failed_count=job.failed_count or 0,
+            pending_count=max((job.total_count or 0) - (job.sent_count or 0) - (job.failed_count or 0), 0),
+            error=job.error,
+            created_at=job.created_at,
+            started_at=job.started_at,
+            finished_at=job.finished_at
+        )
     
     def get_campaign_stats(self, campaign_id: str, employee: Employee) -> CampaignStats:
         """Get campaign statistics"""
@@ -393,16 +475,13 @@ class CampaignService:
         if not campaign:
             raise ValidationError("Campaign not found")
         
-        # Get recipient counts
-        recipients = self.db.query(CampaignRecipient).filter(
-            CampaignRecipient.campaign_id == campaign_id
-        ).all()
-        
-        total_recipients = len(recipients)
-        sent_count = len([r for r in recipients if r.status in ["sent", "opened", "clicked"]])
-        opened_count = len([r for r in recipients if r.opened_at is not None])
-        clicked_count = len([r for r in recipients if r.clicked_at is not None])
-        bounce_count = len([r for r in recipients if r.status == "bounced"])
+        # Get recipient counts from the maintained counters
+        counters = get_counters(self.db, [campaign_id])[campaign_id]
+        total_recipients = counters["total"]
+        sent_count = counters["sent"] - counters["bounced"]
+        opened_count = counters["opened"]
+        clicked_count = counters["clicked"]
+        bounce_count = counters["bounced"]
         
         open_rate = (opened_count / sent_count * 100) if sent_count > 0 else 0
         click_rate = (clicked_count / sent_count * 100) if sent_count > 0 else 0
@@ -455,30 +534,3 @@ class CampaignService:
             recipients_list.append(recipient_status)
         
         return recipients_list
-
-    def track_email_open(self, campaign_id: str, recipient_id: str) -> bool:
-        """Track email open by updating recipient status"""
-        try:
-            # Validate 8-character ID formats
-            if not campaign_id or len(campaign_id) != 8:
-                return False
-            if not recipient_id or len(recipient_id) != 8:
-                return False
-            
-            recipient = self.db.query(CampaignRecipient).filter(
-                CampaignRecipient.id == recipient_id,
-                CampaignRecipient.campaign_id == campaign_id
-            ).first()
-            
-            if recipient and recipient.opened_at is None:
-                # Update status to opened and set opened_at timestamp
-                recipient.status = "opened"
-                recipient.opened_at = datetime.utcnow()
-                self.db.commit()
-                return True
-                
-        except Exception as e:
-            # Silently fail for tracking - don't break email display
-            pass
-        
-        return False
\ No newline at end of file
@@ -0,0 +1,352 @@
+import os
+import uuid
+import socket
+import asyncio
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import select, update, exists
+from core.config import settings
+from core.exceptions import SMTPUnavailableError
+from core.logger import logger, log_action
+from database.connection import SessionLocal
+from database.models import Campaign, CampaignJob, CampaignRecipient, Customer
+from utils.email_service import email_service
+from .campaigns_counters import bump_counters
+
+# Recipient IDs per "UPDATE ... WHERE id IN (...)" statement
+STATUS_UPDATE_CHUNK_SIZE = 500
+
+class CampaignDispatchWorker:
+    """
+    Claims queued campaign jobs and sends their recipients in batches.
+
+    Any number of workers (tasks in the API process or separate
+    `scripts/run_worker.py` processes) can share a job: each batch of
+    recipients is claimed with a conditional UPDATE from "pending" to
+    "sending", so a recipient is only ever handed to one worker.
+
+    Results are checkpointed every CAMPAIGN_CHECKPOINT_SIZE sends. Claims
+    left behind by a worker that died are released back to "pending" after
+    CAMPAIGN_CLAIM_TIMEOUT_SECONDS (checked every CAMPAIGN_CLAIM_SWEEP_POLLS
+    polls) and the job carries on from there; only sends since that worker's
+    last checkpoint can go out twice.
+
+    When no SMTP server is reachable the worker hands its unsent claims
+    back to "pending" and leaves the job running for a later attempt.
+    """
+
+    def __init__(self, session_factory=SessionLocal, worker_id: str = None, batch_size: int = None):
+        self.session_factory = session_factory
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.batch_size = batch_size or settings.CAMPAIGN_SEND_BATCH_SIZE
+        self.task = None
+        self._stopping = False
+        self._polls = 0
+
+    def start(self) -> asyncio.Task:
+        """Run the worker as a task on the current event loop"""
+        self.task = asyncio.create_task(self.run())
+        return self.task
+
+    async def run(self):
+        """Poll for work until stop() is called"""
+        logger.info(f"Campaign worker {self.worker_id} started")
+        while not self._stopping:
+            try:
+                worked = await self.run_once()
+            except Exception as e:
+                logger.error(f"Campaign worker {self.worker_id} error: {str(e)}")
+                worked = False
+
+            if not worked:
+                await asyncio.sleep(settings.CAMPAIGN_WORKER_POLL_SECONDS)
+        logger.info(f"Campaign worker {self.worker_id} stopped")
+
+    def stop(self):
+        self._stopping = True
+
+    async def run_once(self) -> bool:
+        """Process one job until it has no unclaimed recipients; False if there was nothing to do"""
+        job_id = await asyncio.to_thread(self._next_job)
+        if job_id is None:
+            return False
+
+        try:
+            campaign = await asyncio.to_thread(self._load_campaign, job_id)
+            while not self._stopping:
+                batch = await asyncio.to_thread(self._claim_batch, job_id)
+                if not batch:
+                    break
+                await self._send_batch(job_id, campaign, batch)
+            await asyncio.to_thread(self._finish_job_if_done, job_id)
+        except SMTPUnavailableError:
+            released = await asyncio.to_thread(self._release_claims, campaign["id"])
+            logger.warning(f"Campaign worker {self.worker_id}: no SMTP server available, returned {released} recipients of job {job_id} to pending")
+            return False
+        except Exception as e:
+            await asyncio.to_thread(self._fail_job, job_id, str(e))
+            raise
+        return True
+
+    def _next_job(self) -> Optional[str]:
+        """Find the oldest queued/running job that still has pending recipients"""
+        db = self.session_factory()
+        try:
+            if self._polls % settings.CAMPAIGN_CLAIM_SWEEP_POLLS == 0:
+                self._release_stale_claims(db)
+            self._polls += 1
+
+            has_pending = exists().where(
+                CampaignRecipient.campaign_id == CampaignJob.campaign_id,
+                CampaignRecipient.status == "pending"
+            )
+            job = db.query(CampaignJob).filter(
+                CampaignJob.status.in_(["queued", "running"]),
+                has_pending
+            ).order_by(CampaignJob.created_at).first()
+
+            if not job:
+                return None
+
+            if job.status == "queued":
+                # Only one worker flips the job to running, but every worker may then join in
+                db.query(CampaignJob).filter(
+                    CampaignJob.id == job.id,
+                    CampaignJob.status == "queued"
+                ).update(
+                    {"status": "running", "started_at": datetime.utcnow()},
+                    synchronize_session=False
+                )
+                db.commit()
+            return job.id
+        finally:
+            db.close()
+
+    def _claim_batch(self, job_id: str) -> List[tuple]:
+        """Atomically move up to batch_size pending recipients to "sending" for this worker"""
+        db = self.session_factory()
+        try:
+            job = db.query(CampaignJob).filter(CampaignJob.id == job_id).first()
+            if not job or job.status != "running":
+                return []
+
+            candidates = select(CampaignRecipient.id).where(
+                CampaignRecipient.campaign_id == job.campaign_id,
+                CampaignRecipient.status == "pending"
+            ).order_by(CampaignRecipient.id).limit(self.batch_size)
+            if db.bind.dialect.name == "postgresql":
+                # Let concurrent workers skip rows another worker is claiming
+                candidates = candidates.with_for_update(skip_locked=True)
+
+            db.execute(
+                update(CampaignRecipient).where(
+                    CampaignRecipient.id.in_(candidates.scalar_subquery()),
+                    # Re-checked under the row lock: never steal another worker's claim
+                    CampaignRecipient.status == "pending"
+                ).values(
+                    status="sending",
+                    claimed_by=self.worker_id,
+                    claimed_at=datetime.utcnow()
+                ).execution_options(synchronize_session=False)
+            )
+            db.commit()
+
+            return db.query(CampaignRecipient.id, Customer.email).join(
+                Customer, CampaignRecipient.customer_id == Customer.id
+            ).filter(
+                CampaignRecipient.campaign_id == job.campaign_id,
+                CampaignRecipient.status == "sending",
+                # Batches are recorded before the next claim, so these are all ours from this batch
+                CampaignRecipient.claimed_by == self.worker_id
+            ).all()
+        finally:
+            db.close()
+
+    async def _send_batch(self, job_id: str, campaign: dict, batch: List[tuple]):
+        # Built lazily as the send workers pull from it
+        recipient_list = (
+            {"email": email, "recipient_id": recipient_id}
+            for recipient_id, email in batch
+        )
+
+        async def checkpoint(results: List[dict]):
+            await asyncio.to_thread(self._record_batch, job_id, campaign["id"], results)
+
+        await email_service.send_bulk_emails(
+            recipients=recipient_list,
+            subject=campaign["subject"],
+            body=campaign["body"],  # This should be HTML content
+            sender_email=campaign["sender_email"],
+            campaign_id=campaign["id"],
+            checkpoint=checkpoint,
+            checkpoint_size=settings.CAMPAIGN_CHECKPOINT_SIZE
+        )
+
+    def _load_campaign(self, job_id: str) -> dict:
+        db = self.session_factory()
+        try:
+            campaign = db.query(Campaign).join(
+                CampaignJob, CampaignJob.campaign_id == Campaign.id
+            ).filter(CampaignJob.id == job_id).first()
+            return {
+                "id": campaign.id,
+                "subject": campaign.subject,
+                "body": campaign.body,
+                "sender_email": campaign.sender_email
+            }
+        finally:
+            db.close()
+
+    def _record_batch(self, job_id: str, campaign_id: str, results: List[dict]):
+        """Checkpoint recipient results and job progress with bulk UPDATEs in one commit"""
+        by_status = {"sent": [], "failed": []}
+        for result in results:
+            by_status[result["status"]].append(result["recipient_id"])
+
+        db = self.session_factory()
+        try:
+            now = datetime.utcnow()
+            settled = {}
+            for status, recipient_ids in by_status.items():
+                values = {"status": status, "sent_at": now} if status == "sent" else {"status": status}
+                settled[status] = 0
+                for start in range(0, len(recipient_ids), STATUS_UPDATE_CHUNK_SIZE):
+                    settled[status] += db.execute(
+                        update(CampaignRecipient).where(
+                            CampaignRecipient.id.in_(recipient_ids[start:start + STATUS_UPDATE_CHUNK_SIZE]),
+                            # Only settle recipients this worker still holds
+                            CampaignRecipient.status == "sending",
+                            CampaignRecipient.claimed_by == self.worker_id
+                        ).values(**values).execution_options(synchronize_session=False)
+                    ).rowcount
+            bump_counters(db, campaign_id, **settled)
+
+            # Heartbeat: the rest of this worker's claims are still being worked on
+            db.execute(
+                update(CampaignRecipient).where(
+                    CampaignRecipient.campaign_id == campaign_id,
+                    CampaignRecipient.status == "sending",
+                    CampaignRecipient.claimed_by == self.worker_id
+                ).values(claimed_at=now).execution_options(synchronize_session=False)
+            )
+
+            # Increment in SQL so concurrent workers on the same job don't overwrite each other
+            db.query(CampaignJob).filter(CampaignJob.id == job_id).update(
+                {
+                    CampaignJob.sent_count: CampaignJob.sent_count + len(by_status["sent"]),
+                    CampaignJob.failed_count: CampaignJob.failed_count + len(by_status["failed"])
+                },
+                synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def _release_claims(self, campaign_id: str) -> int:
+        """Hand this worker's unsent claims on a campaign back to pending"""
+        db = self.session_factory()
+        try:
+            released = db.execute(
+                update(CampaignRecipient).where(
+                    CampaignRecipient.campaign_id == campaign_id,
+                    CampaignRecipient.status == "sending",
+                    CampaignRecipient.claimed_by == self.worker_id
+                ).values(
+                    status="pending",
+                    claimed_by=None,
+                    claimed_at=None
+                ).execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+            return released
+        finally:
+            db.close()
+
+    def _release_stale_claims(self, db):
+        """Hand recipients claimed by a worker that stopped checkpointing back to pending"""
+        cutoff = datetime.utcnow() - timedelta(seconds=settings.CAMPAIGN_CLAIM_TIMEOUT_SECONDS)
+        released = db.execute(
+            update(CampaignRecipient).where(
+                CampaignRecipient.status == "sending",
+                CampaignRecipient.claimed_at < cutoff
+            ).values(
+                status="pending",
+                claimed_by=None,
+                claimed_at=None
+            ).execution_options(synchronize_session=False)
+        ).rowcount
+        if released:
+            db.commit()
+            logger.warning(f"Campaign worker {self.worker_id} released {released} stale recipient claims")
+
+    def _finish_job_if_done(self, job_id: str):
+        """Complete the job and its campaign once no recipient is pending or in flight"""
+        db = self.session_factory()
+        try:
+            job = db.query(CampaignJob).filter(CampaignJob.id == job_id).first()
+            if not job or job.status != "running":
+                return
+
+            unfinished = db.query(CampaignRecipient.id).filter(
+                CampaignRecipient.campaign_id == job.campaign_id,
+                CampaignRecipient.status.in_(["pending", "sending"])
+            ).first()
+            if unfinished:
+                return
+
+            finished = db.query(CampaignJob).filter(
+                CampaignJob.id == job_id,
+                CampaignJob.status == "running"
+            ).update(
+                {"status": "completed", "finished_at": datetime.utcnow()},
+                synchronize_session=False
+            )
+            if not finished:
+                return
+
+            campaign = db.query(Campaign).filter(Campaign.id == job.campaign_id).first()
+            campaign.status = "sent" if job.failed_count == 0 else "partial"
+            campaign.sent_at = datetime.utcnow()
+            db.commit()
+
+            log_action(
+                job.created_by_employee_id,
+                "campaign_sent",
+                f"Campaign {campaign.title} sent to {job.sent_count} recipients, {job.failed_count} failed"
+            )
+        finally:
+            db.close()
+
+    def _fail_job(self, job_id: str, error: str):
+        db = self.session_factory()
+        try:
+            job = db.query(CampaignJob).filter(CampaignJob.id == job_id).first()
+            if not job:
+                return
+            job.status = "failed"
+            job.error = error
+            job.finished_at = datetime.utcnow()
+
+            campaign = db.query(Campaign).filter(Campaign.id == job.campaign_id).first()
+            if campaign:
+                campaign.status = "failed"
+            db.commit()
+
+            log_action(job.created_by_employee_id, "campaign_failed", f"Campaign {campaign.title if campaign else job.campaign_id} failed: {error}")
+        finally:
+            db.close()
+
+
+def start_campaign_workers(concurrency: int = None) -> List[CampaignDispatchWorker]:
+    """Start dispatch workers as tasks on the running event loop"""
+    workers = [CampaignDispatchWorker() for _ in range(concurrency or settings.CAMPAIGN_WORKER_CONCURRENCY)]
+    for worker in workers:
+        worker.start()
+    return workers
+
+
+async def stop_campaign_workers(workers: List[CampaignDispatchWorker]):
+    """Let workers finish their current batch, then wait for them to exit"""
+    for worker in workers:
+        worker.stop()
+    await asyncio.gather(*(worker.task for worker in workers), return_exceptions=True)
@@ -1,9 +1,10 @@
-from typing import List, Dict, Any
-from fastapi import APIRouter, Depends, Query
+from typing import List, Dict, Any, Optional
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.orm import Session
 from database.connection import get_db
 from database.models import Employee
 from utils.security import get_current_employee, require_role
+from utils.pagination import set_page_headers
 from .compaines_services import CompanyService
 from .compaines_schemas import (
     CompanyCreate,
@@ -16,7 +17,7 @@ from .compaines_schemas import (
 companies_router = APIRouter()
 
 @companies_router.post("/", response_model=Dict[str, Any])
-async def create_company(
+def create_company(
     company_data: CompanyCreate,
     db: Session = Depends(get_db)
 ):
@@ -25,18 +26,23 @@ async def create_company(
     return service.create_company(company_data)
 
 @companies_router.get("/", response_model=List[CompanyResponse])
-async def get_companies(
-    skip: int = Query(0, ge=0),
+def get_companies(
+    response: Response,
+    skip: int = Query(0, ge=0, description="Offset paging; prefer cursor"),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    include_total: bool = Query(False, description="Also return X-Total-Count (costs a COUNT)"),
     db: Session = Depends(get_db)
     # Note: In production, this should be protected by super admin role
 ):
     """Get all companies (super admin only)"""
     service = CompanyService(db)
-    return service.get_companies(skip, limit)
+    page = service.get_companies(skip, limit, cursor, include_total)
+    set_page_headers(response, page)
+    return page.items
 
 @companies_router.get("/me", response_model=CompanyResponse)
-async def get_my_company(
+def get_my_company(
     db: Session = Depends(get_db),
     current_employee: Employee = Depends(get_current_employee)
 ):
@@ -45,7 +51,7 @@ async def get_my_company(
     return service.get_company(current_employee.company_id, current_employee)
 
 @companies_router.get("/{company_id}", response_model=CompanyResponse)
-async def get_company(
+def get_company(
     company_id: str,  # Changed from int to str for UUID
     db: Session = Depends(get_db),
     current_employee: Employee = Depends(get_current_employee)
@@ -55,7 +61,7 @@ async def get_company(
     return service.get_company(company_id, current_employee)
 
 @companies_router.put("/{company_id}", response_model=CompanyResponse)
-async def update_company(
+def update_company(
     company_id: str,  # Changed from int to str for UUID
     company_data: CompanyUpdate,
     db: Session = Depends(get_db),
@@ -66,7 +72,7 @@ async def update_company(
     return service.update_company(company_id, company_data, current_employee)
 
 @companies_router.put("/{company_id}/settings")
-async def update_company_settings(
+def update_company_settings(
     company_id: str,  # Changed from int to str for UUID
     settings: CompanySettings,
     db: Session = Depends(get_db),
@@ -77,7 +83,7 @@ async def update_company_settings(
     return service.update_company_settings(company_id, settings, current_employee)
 
 @companies_router.get("/{company_id}/stats", response_model=CompanyStats)
-async def get_company_stats(
+def get_company_stats(
     company_id: str,  # Changed from int to str for UUID
     db: Session = Depends(get_db),
     current_employee: Employee = Depends(get_current_employee)
@@ -87,7 +93,7 @@ async def get_company_stats(
     return service.get_company_stats(company_id, current_employee)
 
 @companies_router.post("/{company_id}/deactivate")
-async def deactivate_company(
+def deactivate_company(
     company_id: str,  # Changed from int to str for UUID
     db: Session = Depends(get_db)
     # Note: In production, this should be protected by super admin role
@@ -5,7 +5,8 @@ import uuid
 from core.exceptions import ValidationError
 from core.logger import log_action
 from database.models import Company, Employee, Customer, Campaign
-from utils.security import get_password_hash
+from utils.security import get_password_hash, employee_cache
+from utils.pagination import Page, keyset_paginate
 from .compaines_schemas import (
     CompanyCreate, 
     CompanyUpdate, 
@@ -118,10 +119,16 @@ class CompanyService:
         
         return self._format_company_response(company)
     
-    def get_companies(self, skip: int = 0, limit: int = 100) -> List[CompanyResponse]:
+    def get_companies(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        include_total: bool = False
+    ) -> Page:
         """Get all companies (super admin only)"""
-        companies = self.db.query(Company).offset(skip).limit(limit).all()
-        return [self._format_company_response(company) for company in companies]
+        page = keyset_paginate(self.db.query(Company), Company.created_at, Company.id, cursor, limit, skip, include_total)
+        return page._replace(items=[self._format_company_response(company) for company in page.items])
     
     def update_company(
         self, 
@@ -270,6 +277,7 @@ class CompanyService:
         })
         
         self.db.commit()
+        employee_cache.clear()
         
         return True
     
@@ -2,7 +2,6 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.modules.auth.auth_controller import get_current_user
-from app.modules.auth.auth_service import get_user_company
 from app.modules.customer.customer_service import (
     create_customer,
     get_customer_by_id,
@@ -33,15 +32,12 @@ router = APIRouter(
     tags=["Customers"]
 )
 
-async def get_user_company_id(user=Depends(get_current_user), session: AsyncSession = Depends(get_session)) -> str:
-    """Dependency to get current user's company ID"""
-    uid = user["uid"]
-    company = await get_user_company(uid, session)
-    
-    if not company:
+async def get_user_company_id(user=Depends(get_current_user)) -> str:
+    """Dependency to get current user's company ID (resolved together with the token)"""
+    if not user["company_id"]:
         raise HTTPException(status_code=404, detail="Company not found. Please create a company profile first.")
     
-    return company.id
+    return user["company_id"]
 
 @router.post("/", response_model=CustomerResponse)
 async def create_new_customer(
@@ -59,22 +55,27 @@ async def list_customers(
     page_size: int = Query(50, ge=1, le=100, description="Items per page"),
     search: Optional[str] = Query(None, description="Search by name, email, or description"),
     category: Optional[str] = Query(None, description="Filter by category"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page; replaces page"),
+    include_total: bool = Query(True, description="Count all matches (an extra query per page)"),
     company_id: str = Depends(get_user_company_id),
     session: AsyncSession = Depends(get_session)
 ):
     """Get paginated list of customers with optional filtering"""
-    customers, total = await get_customers_by_company(
-        company_id, session, page, page_size, search, category
+    customers, total, next_cursor = await get_customers_by_company(
+        company_id, session, page, page_size, search, category, cursor, include_total
     )
     
-    total_pages = math.ceil(total / page_size) if total > 0 else 1
+    total_pages = None
+    if total is not None:
+        total_pages = math.ceil(total / page_size) if total > 0 else 1
     
     return CustomerListResponse(
         customers=[CustomerResponse.from_orm(customer) for customer in customers],
         total=total,
         page=page,
         page_size=page_size,
-        total_pages=total_pages
+        total_pages=total_pages,
+        next_cursor=next_cursor
     )
 
 @router.get("/stats")
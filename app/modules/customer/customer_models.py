@@ -1,5 +1,5 @@
 # customer_models.py
-from sqlalchemy import Column, String, DateTime, Text, ForeignKey
+from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.modules.auth.auth_models import Base
@@ -24,5 +24,10 @@ class Customer(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
     
+    # Keyset pagination: newest-first per company, id breaks created_at ties
+    __table_args__ = (
+        Index("ix_customers_company_id_created_at_id", "company_id", "created_at", "id"),
+    )
+    
     def __repr__(self):
         return f"<Customer(id='{self.id}', email='{self.email}', name='{self.name}', company_id='{self.company_id}')>"
\ No newline at end of file
@@ -56,10 +56,11 @@ class CustomerResponse(BaseModel):
 
 class CustomerListResponse(BaseModel):
     customers: List[CustomerResponse]
-    total: int
+    total: Optional[int] = None  # omitted when include_total=false
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None  # pass as `cursor` for the next page
 
 # Bulk operations
 class CustomerBulkCreateRequest(BaseModel):
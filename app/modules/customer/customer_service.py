@@ -4,6 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete, func, and_, or_
 from sqlalchemy.orm import selectinload
 from app.core.logger import get_logger
+from app.utils.pagination import cursor_filter, encode_cursor
 from app.modules.customer.customer_models import Customer
 from app.modules.customer.customer_schemas import (
     CustomerCreateRequest, 
@@ -67,9 +68,15 @@ async def get_customers_by_company(
     page: int = 1, 
     page_size: int = 50,
     search: Optional[str] = None,
-    category: Optional[str] = None
-) -> Tuple[List[Customer], int]:
-    """Get paginated customers for a company with optional filtering"""
+    category: Optional[str] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = True
+) -> Tuple[List[Customer], Optional[int], Optional[str]]:
+    """
+    Get paginated customers for a company with optional filtering.
+    Returns (customers, total or None, next cursor or None); with a cursor
+    `page` is ignored and each page is one index range scan.
+    """
     try:
         # Base query
         query = select(Customer).where(Customer.company_id == company_id)
@@ -89,21 +96,33 @@ async def get_customers_by_company(
         if category:
             query = query.where(Customer.category == category)
         
-        # Get total count
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await session.execute(count_query)
-        total = total_result.scalar()
+        # Get total count (a second pass over the filtered rows, so optional)
+        total = None
+        if include_total:
+            count_query = select(func.count()).select_from(query.subquery())
+            total_result = await session.execute(count_query)
+            total = total_result.scalar()
         
         # Add pagination and ordering
-        offset = (page - 1) * page_size
-        query = query.order_by(Customer.created_at.desc()).offset(offset).limit(page_size)
+        query = query.order_by(Customer.created_at.desc(), Customer.id.desc())
+        if cursor:
+            query = query.where(cursor_filter(Customer.created_at, Customer.id, cursor, session.bind.dialect.name))
+        else:
+            query = query.offset((page - 1) * page_size)
         
         # Execute query
-        result = await session.execute(query)
+        result = await session.execute(query.limit(page_size + 1))
         customers = result.scalars().all()
         
-        return customers, total
+        next_cursor = None
+        if len(customers) > page_size:
+            customers = customers[:page_size]
+            next_cursor = encode_cursor(customers[-1].created_at, customers[-1].id)
+        
+        return customers, total, next_cursor
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching customers: {e}")
         raise HTTPException(status_code=500, detail="Database error")
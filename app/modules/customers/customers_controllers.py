@@ -1,9 +1,10 @@
-from typing import List
-from fastapi import APIRouter, Depends, Query
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.orm import Session
 from database.connection import get_db
 from database.models import Employee
 from utils.security import get_current_employee, require_role
+from utils.pagination import set_page_headers
 from .customers_services import CustomerService
 from .customers_schemas import (
     CustomerCreate, 
@@ -15,7 +16,7 @@ from .customers_schemas import (
 customers_router = APIRouter()
 
 @customers_router.post("/", response_model=CustomerResponse)
-async def create_customer(
+def create_customer(
     customer_data: CustomerCreate,
     db: Session = Depends(get_db),
     current_employee: Employee = Depends(require_role(["admin", "marketing"]))
@@ -24,17 +25,22 @@ async def create_customer(
     return service.create_customer(customer_data, current_employee)
 
 @customers_router.get("/", response_model=List[CustomerResponse])
-async def get_customers(
-    skip: int = Query(0, ge=0),
+def get_customers(
+    response: Response,
+    skip: int = Query(0, ge=0, description="Offset paging; prefer cursor"),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    include_total: bool = Query(False, description="Also return X-Total-Count (costs a COUNT)"),
     db: Session = Depends(get_db),
     current_employee: Employee = Depends(get_current_employee)
 ):
     service = CustomerService(db)
-    return service.get_customers(current_employee, skip, limit)
+    page = service.get_customers(current_employee, skip, limit, cursor, include_total)
+    set_page_headers(response, page)
+    return page.items
 
 @customers_router.get("/search", response_model=List[CustomerResponse])
-async def search_customers(
+def search_customers(
     q: str = Query(..., min_length=2),
     db: Session = Depends(get_db),
     current_employee: Employee = Depends(get_current_employee)
@@ -43,7 +49,7 @@ async def search_customers(
     return service.search_customers(q, current_employee)
 
 @customers_router.get("/{customer_id}", response_model=CustomerResponse)
-async def get_customer(
+def get_customer(
     customer_id: str,  # Changed from int to str for UUID
     db: Session = Depends(get_db),
     current_employee: Employee = Depends(get_current_employee)
@@ -52,7 +58,7 @@ async def get_customer(
     return service.get_customer(customer_id, current_employee)
 
 @customers_router.put("/{customer_id}", response_model=CustomerResponse)
-async def update_customer(
+def update_customer(
     customer_id: str,  # Changed from int to str for UUID
     customer_data: CustomerUpdate,
     db: Session = Depends(get_db),
@@ -62,7 +68,7 @@ async def update_customer(
     return service.update_customer(customer_id, customer_data, current_employee)
 
 @customers_router.delete("/{customer_id}")
-async def delete_customer(
+def delete_customer(
     customer_id: str,  # Changed from int to str for UUID
     db: Session = Depends(get_db),
     current_employee: Employee = Depends(require_role(["admin"]))
@@ -72,7 +78,7 @@ async def delete_customer(
     return {"message": "Customer deleted successfully"}
 
 @customers_router.post("/import")
-async def import_customers(
+def import_customers(
     import_data: CustomerImport,
     db: Session = Depends(get_db),
     current_employee: Employee = Depends(require_role(["admin", "marketing"]))
@@ -1,10 +1,15 @@
 from typing import List, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import or_, text
 import uuid
 from core.exceptions import ValidationError
 from core.logger import log_action
 from database.models import Customer, Employee
+from utils.pagination import Page, keyset_paginate
+from database.search import (
+    CUSTOMER_SEARCH_TABLE, CUSTOMER_SEARCH_WEIGHTS, MIN_INDEXED_QUERY_LENGTH,
+    has_customer_search_index, fts_phrase
+)
 from .customers_schemas import CustomerCreate, CustomerUpdate, CustomerResponse, CustomerImport
 
 class CustomerService:
@@ -34,12 +39,20 @@ class CustomerService:
         log_action(employee.id, "customer_created", f"Created customer: {customer.email}")
         return CustomerResponse.from_orm(customer)
     
-    def get_customers(self, employee: Employee, skip: int = 0, limit: int = 100) -> List[CustomerResponse]:
-        customers = self.db.query(Customer).filter(
-            Customer.company_id == employee.company_id
-        ).offset(skip).limit(limit).all()
-        
-        return [CustomerResponse.from_orm(customer) for customer in customers]
+    def get_customers(
+        self,
+        employee: Employee,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        include_total: bool = False
+    ) -> Page:
+        """Newest customers first, keyset paginated on (created_at, id)"""
+        page = keyset_paginate(
+            self.db.query(Customer).filter(Customer.company_id == employee.company_id),
+            Customer.created_at, Customer.id, cursor, limit, skip, include_total
+        )
+        return page._replace(items=[CustomerResponse.from_orm(customer) for customer in page.items])
     
     def get_customer(self, customer_id: str, employee: Employee) -> CustomerResponse:
         # Validate UUID format
@@ -152,7 +165,19 @@ class CustomerService:
         
         return results
     
-    def search_customers(self, query: str, employee: Employee) -> List[CustomerResponse]:
+    def search_customers(self, query: str, employee: Employee, limit: int = 50) -> List[CustomerResponse]:
+        """Substring search over name, email and location; best matches first when indexed"""
+        if len(query) >= MIN_INDEXED_QUERY_LENGTH and has_customer_search_index(self.db):
+            weights = ", ".join(str(weight) for weight in CUSTOMER_SEARCH_WEIGHTS)
+            customers = self.db.query(Customer).from_statement(text(
+                f"SELECT customers.* FROM {CUSTOMER_SEARCH_TABLE} "
+                f"JOIN customers ON customers.id = {CUSTOMER_SEARCH_TABLE}.customer_id "
+                f"WHERE {CUSTOMER_SEARCH_TABLE} MATCH :match AND customers.company_id = :company_id "
+                f"ORDER BY bm25({CUSTOMER_SEARCH_TABLE}, {weights}) LIMIT :limit"
+            )).params(match=fts_phrase(query), company_id=employee.company_id, limit=limit).all()
+            return [CustomerResponse.from_orm(customer) for customer in customers]
+        
+        # Too short for the trigram index, or no FTS5 (PostgreSQL serves this from pg_trgm indexes)
         customers = self.db.query(Customer).filter(
             Customer.company_id == employee.company_id,
             or_(
@@ -160,6 +185,6 @@ class CustomerService:
                 Customer.email.contains(query),
                 Customer.location.contains(query)
             )
-        ).limit(50).all()
+        ).limit(limit).all()
         
         return [CustomerResponse.from_orm(customer) for customer in customers]
\ No newline at end of file
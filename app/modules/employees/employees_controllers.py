@@ -1,9 +1,10 @@
-from typing import List
-from fastapi import APIRouter, Depends, Query
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.orm import Session
 from database.connection import get_db
 from database.models import Employee
 from utils.security import get_current_employee, require_role
+from utils.pagination import set_page_headers
 from .employees_services import EmployeeService
 from .employees_schemas import (
     EmployeeCreate,
@@ -15,7 +16,7 @@ from .employees_schemas import (
 employees_router = APIRouter()
 
 @employees_router.post("/", response_model=EmployeeResponse)
-async def create_employee(
+def create_employee(
     employee_data: EmployeeCreate,
     db: Session = Depends(get_db),
     current_employee: Employee = Depends(require_role(["admin"]))
@@ -24,17 +25,22 @@ async def create_employee(
     return service.create_employee(employee_data, current_employee)
 
 @employees_router.get("/", response_model=List[EmployeeResponse])
-async def get_employees(
-    skip: int = Query(0, ge=0),
+def get_employees(
+    response: Response,
+    skip: int = Query(0, ge=0, description="Offset paging; prefer cursor"),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    include_total: bool = Query(False, description="Also return X-Total-Count (costs a COUNT)"),
     db: Session = Depends(get_db),
     current_employee: Employee = Depends(require_role(["admin"]))
 ):
     service = EmployeeService(db)
-    return service.get_employees(current_employee, skip, limit)
+    page = service.get_employees(current_employee, skip, limit, cursor, include_total)
+    set_page_headers(response, page)
+    return page.items
 
 @employees_router.get("/{employee_id}", response_model=EmployeeResponse)
-async def get_employee(
+def get_employee(
     employee_id: str,  # Changed from int to str for UUID
     db: Session = Depends(get_db),
     current_employee: Employee = Depends(require_role(["admin"]))
@@ -43,7 +49,7 @@ async def get_employee(
     return service.get_employee(employee_id, current_employee)
 
 @employees_router.put("/{employee_id}", response_model=EmployeeResponse)
-async def update_employee(
+def update_employee(
     employee_id: str,  # Changed from int to str for UUID
     employee_data: EmployeeUpdate,
     db: Session = Depends(get_db),
@@ -53,7 +59,7 @@ async def update_employee(
     return service.update_employee(employee_id, employee_data, current_employee)
 
 @employees_router.post("/change-password")
-async def change_password(
+def change_password(
     password_data: PasswordChange,
     db: Session = Depends(get_db),
     current_employee: Employee = Depends(get_current_employee)
@@ -63,7 +69,7 @@ async def change_password(
     return {"message": "Password changed successfully"}
 
 @employees_router.post("/{employee_id}/deactivate")
-async def deactivate_employee(
+def deactivate_employee(
     employee_id: str,  # Changed from int to str for UUID
     db: Session = Depends(get_db),
     current_employee: Employee = Depends(require_role(["admin"]))
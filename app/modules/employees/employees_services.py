@@ -1,10 +1,11 @@
-from typing import List
+from typing import List, Optional
 from sqlalchemy.orm import Session
 import uuid
 from core.exceptions import ValidationError, AuthError
 from core.logger import log_action
 from database.models import Employee
-from utils.security import get_password_hash, verify_password
+from utils.security import get_password_hash, verify_password, employee_cache
+from utils.pagination import Page, keyset_paginate
 from .employees_schemas import EmployeeCreate, EmployeeUpdate, EmployeeResponse, PasswordChange
 
 class EmployeeService:
@@ -44,12 +45,19 @@ class EmployeeService:
         
         return EmployeeResponse.from_orm(employee)
     
-    def get_employees(self, current_employee: Employee, skip: int = 0, limit: int = 100) -> List[EmployeeResponse]:
-        employees = self.db.query(Employee).filter(
-            Employee.company_id == current_employee.company_id
-        ).offset(skip).limit(limit).all()
-        
-        return [EmployeeResponse.from_orm(employee) for employee in employees]
+    def get_employees(
+        self,
+        current_employee: Employee,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        include_total: bool = False
+    ) -> Page:
+        page = keyset_paginate(
+            self.db.query(Employee).filter(Employee.company_id == current_employee.company_id),
+            Employee.created_at, Employee.id, cursor, limit, skip, include_total
+        )
+        return page._replace(items=[EmployeeResponse.from_orm(employee) for employee in page.items])
     
     def get_employee(self, employee_id: str, current_employee: Employee) -> EmployeeResponse:
         # Validate UUID format
@@ -100,6 +108,7 @@ class EmployeeService:
         
         self.db.commit()
         self.db.refresh(employee)
+        employee_cache.invalidate(employee.id)
         
         log_action(
             current_employee.id, 
@@ -121,6 +130,7 @@ class EmployeeService:
         # Update password
         current_employee.password_hash = get_password_hash(password_data.new_password)
         self.db.commit()
+        employee_cache.invalidate(current_employee.id)
         
         log_action(
             current_employee.id, 
@@ -149,6 +159,7 @@ class EmployeeService:
         
         employee.is_active = False
         self.db.commit()
+        employee_cache.invalidate(employee.id)
         
         log_action(
             current_employee.id, 
@@ -0,0 +1,94 @@
+import os
+import gzip
+import json
+import asyncio
+from datetime import datetime, timedelta
+from core.config import settings
+from core.logger import logger
+from database.connection import SessionLocal
+from database.models import Log
+
+class LogArchiver:
+    """
+    Enforces LOG_RETENTION_DAYS on the logs table.
+
+    Rows older than the retention window are appended to a gzip-compressed
+    JSON-lines file in LOG_ARCHIVE_DIR and then deleted, batch by batch, so
+    the table only holds recent entries. A batch is written to the archive
+    before it is deleted: an interrupted run can archive a batch twice, but
+    never loses one.
+    """
+
+    def __init__(self, session_factory=SessionLocal, archive_dir: str = None, retention_days: int = None, batch_size: int = 5000):
+        self.session_factory = session_factory
+        self.archive_dir = archive_dir or settings.LOG_ARCHIVE_DIR
+        self.retention_days = settings.LOG_RETENTION_DAYS if retention_days is None else retention_days
+        self.batch_size = batch_size
+        self.task = None
+        self._stopping = asyncio.Event()
+
+    def start(self) -> asyncio.Task:
+        """Run the archiver as a task on the current event loop"""
+        self.task = asyncio.create_task(self.run())
+        return self.task
+
+    async def run(self):
+        while not self._stopping.is_set():
+            try:
+                await asyncio.to_thread(self.archive_once)
+            except Exception as e:
+                logger.error(f"Log archival failed: {str(e)}")
+
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=settings.LOG_ARCHIVE_INTERVAL_HOURS * 3600)
+            except asyncio.TimeoutError:
+                pass
+
+    async def stop(self):
+        self._stopping.set()
+        if self.task:
+            await self.task
+
+    def archive_once(self) -> int:
+        """Move every log row past retention into an archive file; returns the number archived"""
+        if self.retention_days <= 0:
+            return 0
+
+        cutoff = datetime.utcnow() - timedelta(days=self.retention_days)
+        os.makedirs(self.archive_dir, exist_ok=True)
+        path = os.path.join(self.archive_dir, f"logs-until-{cutoff:%Y%m%d}-{datetime.utcnow():%H%M%S}.jsonl.gz")
+
+        archived = 0
+        db = self.session_factory()
+        try:
+            while True:
+                # Oldest first, through the timestamp index
+                rows = db.query(
+                    Log.id, Log.timestamp, Log.employee_id, Log.action, Log.details
+                ).filter(
+                    Log.timestamp < cutoff
+                ).order_by(Log.timestamp, Log.id).limit(self.batch_size).all()
+                if not rows:
+                    break
+
+                with gzip.open(path, "at", encoding="utf-8") as archive:
+                    for log_id, timestamp, employee_id, action, details in rows:
+                        archive.write(json.dumps({
+                            "id": log_id,
+                            "timestamp": timestamp.isoformat() if timestamp else None,
+                            "employee_id": employee_id,
+                            "action": action,
+                            "details": details
+                        }) + "\n")
+
+                db.query(Log).filter(
+                    Log.id.in_([row[0] for row in rows])
+                ).delete(synchronize_session=False)
+                db.commit()
+                archived += len(rows)
+        finally:
+            db.close()
+
+        if archived:
+            logger.info(f"Archived {archived} log entries older than {cutoff:%Y-%m-%d} to {path}")
+        return archived
@@ -0,0 +1,26 @@
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from database.connection import get_db
+from database.models import Employee
+from utils.security import require_role
+from .logs_services import LogService
+from .logs_schemas import LogPage
+
+logs_router = APIRouter()
+
+@logs_router.get("/", response_model=LogPage)
+def get_logs(
+    employee_id: Optional[str] = Query(None),
+    action: Optional[str] = Query(None),
+    start: Optional[datetime] = Query(None, description="Entries at or after this time"),
+    end: Optional[datetime] = Query(None, description="Entries before this time"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_employee: Employee = Depends(require_role(["admin"]))
+):
+    """Audit trail of the company's employees, newest first"""
+    service = LogService(db)
+    return service.query_logs(current_employee, employee_id, action, start, end, cursor, limit)
@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+class LogEntry(BaseModel):
+    id: str
+    timestamp: datetime
+    employee_id: Optional[str] = None
+    action: str
+    details: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class LogPage(BaseModel):
+    """One page of audit log entries, newest first"""
+    items: List[LogEntry]
+    next_cursor: Optional[str] = None  # pass as `cursor` to get the next page
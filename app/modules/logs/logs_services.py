@@ -0,0 +1,39 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy.orm import Session
+from database.models import Log, Employee
+from utils.pagination import keyset_paginate
+from .logs_schemas import LogEntry, LogPage
+
+class LogService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def query_logs(
+        self,
+        employee: Employee,
+        employee_id: Optional[str] = None,
+        action: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> LogPage:
+        """Audit log entries of the employee's company, newest first, keyset paginated"""
+        query = self.db.query(Log).join(
+            Employee, Log.employee_id == Employee.id
+        ).filter(
+            Employee.company_id == employee.company_id
+        )
+
+        if employee_id:
+            query = query.filter(Log.employee_id == employee_id)
+        if action:
+            query = query.filter(Log.action == action)
+        if start:
+            query = query.filter(Log.timestamp >= start)
+        if end:
+            query = query.filter(Log.timestamp < end)
+
+        page = keyset_paginate(query, Log.timestamp, Log.id, cursor=cursor, limit=limit)
+        return LogPage(items=[LogEntry.from_orm(log) for log in page.items], next_cursor=page.next_cursor)
@@ -0,0 +1,143 @@
+### modules/tracking/buffer.py
+import time
+import asyncio
+from datetime import datetime
+from typing import List
+from core.config import settings
+from core.logger import logger
+from database.connection import SessionLocal
+from database.models import EVENT_OPEN, EVENT_CLICK
+from .services import TrackingService
+
+class TrackingEventBuffer:
+    """
+    In-process buffer for open-tracking pixel hits and click redirects.
+
+    Request handlers only enqueue the event and respond; a background
+    task writes queued events to the database in batches of up to
+    TRACKING_FLUSH_BATCH_SIZE events, at least every
+    TRACKING_FLUSH_INTERVAL_MS. When the queue is full new events are
+    dropped and counted rather than slowing down the response.
+    """
+
+    def __init__(self, session_factory=SessionLocal, max_events: int = None, flush_interval_ms: int = None, batch_size: int = None):
+        self.session_factory = session_factory
+        self.flush_interval = (flush_interval_ms or settings.TRACKING_FLUSH_INTERVAL_MS) / 1000
+        self.batch_size = batch_size or settings.TRACKING_FLUSH_BATCH_SIZE
+        self._queue = asyncio.Queue(maxsize=max_events or settings.TRACKING_BUFFER_MAX_EVENTS)
+        self.task = None
+        self._stopping = False
+
+        # Metrics
+        self.enqueued = 0
+        self.dropped = 0
+        self.flushed = 0
+        self.discarded = 0  # unknown campaign/recipient pairs
+        self.flush_failures = 0
+        self.flushes = 0
+        self.last_flush_ms = 0.0
+        self._reported_drops = 0
+
+    def record_open(self, campaign_id: str, recipient_id: str, user_agent: str = None, ip_address: str = None) -> bool:
+        """Queue an open event without waiting; False if it was dropped"""
+        return self._put(EVENT_OPEN, campaign_id, recipient_id, user_agent, ip_address)
+
+    def record_click(self, campaign_id: str, recipient_id: str, url: str, user_agent: str = None, ip_address: str = None) -> bool:
+        """Queue a click event without waiting; False if it was dropped"""
+        return self._put(EVENT_CLICK, campaign_id, recipient_id, user_agent, ip_address, url)
+
+    def _put(self, event_type: int, campaign_id: str, recipient_id: str, user_agent: str, ip_address: str, url: str = None) -> bool:
+        try:
+            self._queue.put_nowait({
+                "event_type": event_type,
+                "campaign_id": campaign_id,
+                "recipient_id": recipient_id,
+                "occurred_at": datetime.utcnow(),
+                "user_agent": user_agent,
+                "ip_address": ip_address,
+                "url": url
+            })
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        self.enqueued += 1
+        return True
+
+    def start(self) -> asyncio.Task:
+        """Run the flusher as a task on the current event loop"""
+        self._stopping = False
+        if self._queue.empty():
+            # asyncio queues bind to the loop that first waits on them; start fresh on restarts
+            self._queue = asyncio.Queue(maxsize=self._queue.maxsize)
+        self.task = asyncio.create_task(self.run())
+        return self.task
+
+    async def run(self):
+        while True:
+            events = await self._collect()
+            if events:
+                await asyncio.to_thread(self.flush, events)
+            elif self._stopping:
+                break
+
+            if self.dropped != self._reported_drops:
+                logger.warning(f"Tracking buffer full, dropped {self.dropped - self._reported_drops} events")
+                self._reported_drops = self.dropped
+
+    async def stop(self):
+        """Flush whatever is still queued, then stop the flusher"""
+        self._stopping = True
+        if self.task:
+            await self.task
+
+    async def _collect(self) -> List[dict]:
+        """Wait up to one flush interval for events, returning early once a batch is full"""
+        events = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(events) < self.batch_size:
+            try:
+                events.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or (self._stopping and not events):
+                break
+            try:
+                events.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return events
+
+    def flush(self, events: List[dict]):
+        """Write one batch of events"""
+        started = time.perf_counter()
+        db = self.session_factory()
+        try:
+            written = TrackingService(db).record_events(events)
+            self.flushed += written
+            self.discarded += len(events) - written
+        except Exception as e:
+            db.rollback()
+            self.flush_failures += len(events)
+            logger.error(f"Failed to flush {len(events)} tracking events: {str(e)}")
+        finally:
+            db.close()
+        self.flushes += 1
+        self.last_flush_ms = (time.perf_counter() - started) * 1000
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "capacity": self._queue.maxsize,
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "flushed": self.flushed,
+            "discarded": self.discarded,
+            "flush_failures": self.flush_failures,
+            "flushes": self.flushes,
+            "last_flush_ms": round(self.last_flush_ms, 2)
+        }
+
+
+tracking_buffer = TrackingEventBuffer()
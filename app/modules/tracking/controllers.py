@@ -1,36 +1,40 @@
 
 ### modules/tracking/controllers.py
-from fastapi import APIRouter, Depends, Request, Query
-from fastapi.responses import Response
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, Request, Query, Path
+from fastapi.responses import Response, RedirectResponse
 from sqlalchemy.orm import Session
 from database.connection import get_db
 from database.models import Employee
 from utils.security import get_current_employee
 from .services import TrackingService
-from .schemas import TrackingResponse, ClickTrack
+from .buffer import tracking_buffer
 
 tracking_router = APIRouter()
 
+# Tracking URLs are public; bound what they can make us queue
+MAX_ID_LENGTH = 36
+MAX_URL_LENGTH = 2048
+
 @tracking_router.get("/open/{campaign_id}/{recipient_id}")
 async def track_open(
-    campaign_id: int,
-    recipient_id: int,
     request: Request,
-    db: Session = Depends(get_db)
+    campaign_id: str = Path(..., max_length=MAX_ID_LENGTH),  # Changed from int to str for UUID
+    recipient_id: str = Path(..., max_length=MAX_ID_LENGTH)  # Changed from int to str for UUID
 ):
     """Track email open with 1x1 pixel"""
-    service = TrackingService(db)
-    
-    # Get user agent and IP
-    user_agent = request.headers.get("user-agent", "")
-    ip_address = request.client.host
-    
-    # Track the open event
-    service.track_open(campaign_id, recipient_id, user_agent, ip_address)
-    
+    # Queued and written in batches; never blocks the pixel response
+    tracking_buffer.record_open(
+        campaign_id,
+        recipient_id,
+        user_agent=request.headers.get("user-agent", ""),
+        ip_address=request.client.host if request.client else None
+    )
+
     # Return 1x1 transparent pixel
     pixel_data = b'\x47\x49\x46\x38\x39\x61\x01\x00\x01\x00\x80\x00\x00\xff\xff\xff\x00\x00\x00\x21\xf9\x04\x01\x00\x00\x00\x00\x2c\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02\x04\x01\x00\x3b'
-    
+
     return Response(
         content=pixel_data,
         media_type="image/gif",
@@ -43,33 +47,51 @@ async def track_open(
 
 @tracking_router.get("/click/{campaign_id}/{recipient_id}")
 async def track_click(
-    campaign_id: int,
-    recipient_id: int,
-    url: str = Query(..., description="Original URL to redirect to"),
-    request: Request = None,
-    db: Session = Depends(get_db)
+    request: Request,
+    campaign_id: str = Path(..., max_length=MAX_ID_LENGTH),  # Changed from int to str for UUID
+    recipient_id: str = Path(..., max_length=MAX_ID_LENGTH),  # Changed from int to str for UUID
+    url: str = Query(..., max_length=MAX_URL_LENGTH, description="Original URL to redirect to")
 ):
     """Track email click and redirect to original URL"""
-    service = TrackingService(db)
-    
-    # Get user agent and IP
-    user_agent = request.headers.get("user-agent", "")
-    ip_address = request.client.host
-    
-    # Track the click event
-    service.track_click(campaign_id, recipient_id, url, user_agent, ip_address)
-    
+    # Queued and written in batches like opens
+    tracking_buffer.record_click(
+        campaign_id,
+        recipient_id,
+        url,
+        user_agent=request.headers.get("user-agent", ""),
+        ip_address=request.client.host if request.client else None
+    )
+
     # Redirect to original URL
-    from fastapi.responses import RedirectResponse
     return RedirectResponse(url=url, status_code=302)
 
+@tracking_router.get("/buffer/stats")
+def get_tracking_buffer_stats(
+    current_employee: Employee = Depends(get_current_employee)
+):
+    """Queue depth, drop and flush counters of the tracking event buffer"""
+    return tracking_buffer.stats()
+
 @tracking_router.get("/{campaign_id}/events")
-async def get_tracking_events(
-    campaign_id: int,
+def get_tracking_events(
+    campaign_id: str,
+    since: Optional[datetime] = Query(None, description="Only events after this time"),
+    limit: int = Query(1000, ge=1, le=10000),
     db: Session = Depends(get_db),
     current_employee: Employee = Depends(get_current_employee)
 ):
-    """Get all tracking events for a campaign"""
+    """Get tracking events for a campaign, oldest first"""
     service = TrackingService(db)
-    events = service.get_tracking_events(campaign_id)
+    events = service.get_tracking_events(campaign_id, current_employee.company_id, since, limit)
     return {"campaign_id": campaign_id, "events": events}
+
+@tracking_router.get("/{campaign_id}/timeline")
+def get_tracking_timeline(
+    campaign_id: str,
+    granularity: str = Query("hour", description="minute or hour"),
+    db: Session = Depends(get_db),
+    current_employee: Employee = Depends(get_current_employee)
+):
+    """Opens and clicks per minute or hour, served from the rollups"""
+    service = TrackingService(db)
+    return {"campaign_id": campaign_id, "granularity": granularity, "timeline": service.get_timeline(campaign_id, current_employee.company_id, granularity)}
@@ -1,88 +1,185 @@
 ### modules/tracking/services.py
 from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import update, case, bindparam, insert, select
 from sqlalchemy.orm import Session
-from core.logger import logger
-from database.models import CampaignRecipient
-from .schemas import TrackingEvent, TrackingResponse
+from core.exceptions import ValidationError, NotFoundError
+from database.bulk import upsert_increment
+from database.models import Campaign, CampaignRecipient, CampaignEvent, CampaignEventRollup, EVENT_OPEN, EVENT_CLICK
+from modules.campaigns.campaigns_counters import bump_counters, rebuild_counters
+
+EVENT_NAMES = {EVENT_OPEN: "open", EVENT_CLICK: "click"}
+
+# Rollup granularity -> bucket start for a timestamp
+ROLLUP_BUCKETS = {
+    "minute": lambda ts: ts.replace(second=0, microsecond=0),
+    "hour": lambda ts: ts.replace(minute=0, second=0, microsecond=0),
+}
 
 class TrackingService:
     def __init__(self, db: Session):
         self.db = db
-    
-    def track_open(self, campaign_id: int, recipient_id: int, user_agent: str = None, ip_address: str = None) -> TrackingResponse:
-        """Track email open event"""
-        try:
-            recipient = self.db.query(CampaignRecipient).filter(
-                CampaignRecipient.id == recipient_id,
-                CampaignRecipient.campaign_id == campaign_id
-            ).first()
-            
-            if not recipient:
-                return TrackingResponse(success=False, message="Recipient not found")
-            
-            # Update opened timestamp if not already opened
-            if recipient.opened_at is None:
-                recipient.opened_at = datetime.utcnow()
-                if recipient.status == "sent":
-                    recipient.status = "opened"
-                self.db.commit()
-            
-            logger.info(f"Email opened - Campaign: {campaign_id}, Recipient: {recipient_id}")
-            return TrackingResponse(success=True, message="Open tracked successfully")
-            
-        except Exception as e:
-            logger.error(f"Failed to track open event: {str(e)}")
-            return TrackingResponse(success=False, message="Failed to track open")
-    
-    def track_click(self, campaign_id: int, recipient_id: int, url: str, user_agent: str = None, ip_address: str = None) -> TrackingResponse:
-        """Track email click event"""
-        try:
-            recipient = self.db.query(CampaignRecipient).filter(
-                CampaignRecipient.id == recipient_id,
-                CampaignRecipient.campaign_id == campaign_id
-            ).first()
-            
-            if not recipient:
-                return TrackingResponse(success=False, message="Recipient not found")
-            
-            # Update clicked timestamp if not already clicked
-            if recipient.clicked_at is None:
-                recipient.clicked_at = datetime.utcnow()
-                recipient.status = "clicked"
-                
-                # Also mark as opened if not already
-                if recipient.opened_at is None:
-                    recipient.opened_at = datetime.utcnow()
-                
-                self.db.commit()
-            
-            logger.info(f"Email clicked - Campaign: {campaign_id}, Recipient: {recipient_id}, URL: {url}")
-            return TrackingResponse(success=True, message="Click tracked successfully")
-            
-        except Exception as e:
-            logger.error(f"Failed to track click event: {str(e)}")
-            return TrackingResponse(success=False, message="Failed to track click")
-    
-    def get_tracking_events(self, campaign_id: int) -> list:
-        """Get all tracking events for a campaign"""
-        recipients = self.db.query(CampaignRecipient).filter(
-            CampaignRecipient.campaign_id == campaign_id
-        ).all()
-        
-        events = []
-        for recipient in recipients:
-            if recipient.opened_at:
-                events.append({
-                    "recipient_id": recipient.id,
-                    "event_type": "open",
-                    "timestamp": recipient.opened_at
-                })
-            
-            if recipient.clicked_at:
-                events.append({
-                    "recipient_id": recipient.id,
-                    "event_type": "click",
-                    "timestamp": recipient.clicked_at
-                })
-        
-        return events
+
+    def record_events(self, events: List[dict]) -> int:
+        """
+        Write a batch of buffered open/click events in one transaction: append
+        them to campaign_events, add them to the minute and hour rollups, and
+        set the recipients' first opened_at/clicked_at.
+        Each event has event_type, campaign_id, recipient_id, occurred_at,
+        user_agent, ip_address and url. Events for a (campaign_id, recipient_id)
+        pair that is not in campaign_recipients are dropped, since the tracking
+        URLs are unauthenticated. Returns the number of events written.
+        """
+        events = self._known_events(events)
+        if not events:
+            return 0
+
+        self.db.execute(insert(CampaignEvent.__table__), [
+            {
+                "campaign_id": event["campaign_id"],
+                "recipient_id": event["recipient_id"],
+                "event_type": event["event_type"],
+                "occurred_at": event["occurred_at"],
+                "user_agent": (event.get("user_agent") or "")[:512] or None,
+                "ip_address": event.get("ip_address"),
+                "url": event.get("url")
+            }
+            for event in events
+        ])
+
+        counts = {}
+        for event in events:
+            for granularity, bucket in ROLLUP_BUCKETS.items():
+                key = (event["campaign_id"], granularity, bucket(event["occurred_at"]), event["event_type"])
+                counts[key] = counts.get(key, 0) + 1
+        upsert_increment(
+            self.db,
+            CampaignEventRollup,
+            [
+                {"campaign_id": campaign_id, "granularity": granularity, "bucket_start": bucket_start, "event_type": event_type, "count": count}
+                for (campaign_id, granularity, bucket_start, event_type), count in counts.items()
+            ],
+            key_columns=["campaign_id", "granularity", "bucket_start", "event_type"],
+            counter="count"
+        )
+
+        self._mark_first_events(events)
+        self.db.commit()
+        return len(events)
+
+    def _known_events(self, events: List[dict]) -> List[dict]:
+        """The events whose recipient exists and belongs to the event's campaign"""
+        recipient_ids = {event["recipient_id"] for event in events}
+        if not recipient_ids:
+            return []
+        recipients = CampaignRecipient.__table__
+        campaign_of = dict(self.db.execute(
+            select(recipients.c.id, recipients.c.campaign_id).where(recipients.c.id.in_(recipient_ids))
+        ).all())
+        return [event for event in events if campaign_of.get(event["recipient_id"]) == event["campaign_id"]]
+
+    def _mark_first_events(self, events: List[dict]):
+        """
+        Set opened_at/clicked_at on recipients that had none yet, first event wins,
+        and add the newly opened/clicked recipients to the campaign counters.
+        """
+        first_open = {}
+        first_click = {}
+        for event in events:
+            key = (event["campaign_id"], event["recipient_id"])
+            firsts = [first_open] if event["event_type"] == EVENT_OPEN else [first_open, first_click]  # a click implies an open
+            for first in firsts:
+                if key not in first or event["occurred_at"] < first[key]:
+                    first[key] = event["occurred_at"]
+
+        # Core table statements: a plain executemany rather than the ORM bulk-by-primary-key path
+        recipients = CampaignRecipient.__table__
+        mark_opened = update(recipients).where(
+            recipients.c.id == bindparam("rid"),
+            recipients.c.campaign_id == bindparam("cid"),
+            recipients.c.opened_at.is_(None)
+        ).values(
+            opened_at=bindparam("at"),
+            status=case((recipients.c.status == "sent", "opened"), else_=recipients.c.status)
+        )
+        mark_clicked = update(recipients).where(
+            recipients.c.id == bindparam("rid"),
+            recipients.c.campaign_id == bindparam("cid"),
+            recipients.c.clicked_at.is_(None)
+        ).values(
+            clicked_at=bindparam("at"),
+            status=case((recipients.c.status.in_(["sent", "opened"]), "clicked"), else_=recipients.c.status)
+        )
+
+        # One executemany per campaign and event type, so each rowcount belongs to one campaign
+        recount = set()
+        for counter, statement, firsts in (("opened", mark_opened, first_open), ("clicked", mark_clicked, first_click)):
+            by_campaign = {}
+            for (campaign_id, recipient_id), at in firsts.items():
+                by_campaign.setdefault(campaign_id, []).append({"cid": campaign_id, "rid": recipient_id, "at": at})
+            for campaign_id, params in by_campaign.items():
+                result = self.db.execute(statement, params)
+                if len(params) == 1 or result.supports_sane_multi_rowcount():
+                    bump_counters(self.db, campaign_id, **{counter: result.rowcount})
+                else:
+                    recount.add(campaign_id)
+
+        if recount:
+            # The driver can't say how many rows an executemany changed
+            rebuild_counters(self.db, sorted(recount))
+
+    def _check_campaign(self, campaign_id: str, company_id: str):
+        """404 unless the campaign belongs to the company"""
+        exists = self.db.query(Campaign.id).filter(
+            Campaign.id == campaign_id,
+            Campaign.company_id == company_id
+        ).first()
+        if not exists:
+            raise NotFoundError("Campaign not found")
+
+    def get_tracking_events(self, campaign_id: str, company_id: str, since: Optional[datetime] = None, limit: int = 1000) -> list:
+        """Get tracking events for one of the company's campaigns in time order"""
+        self._check_campaign(campaign_id, company_id)
+        query = self.db.query(
+            CampaignEvent.recipient_id,
+            CampaignEvent.event_type,
+            CampaignEvent.occurred_at,
+            CampaignEvent.user_agent,
+            CampaignEvent.ip_address,
+            CampaignEvent.url
+        ).filter(CampaignEvent.campaign_id == campaign_id)
+        if since:
+            query = query.filter(CampaignEvent.occurred_at > since)
+
+        return [
+            {
+                "recipient_id": recipient_id,
+                "event_type": EVENT_NAMES.get(event_type, str(event_type)),
+                "timestamp": occurred_at,
+                "user_agent": user_agent,
+                "ip_address": ip_address,
+                "url": url
+            }
+            for recipient_id, event_type, occurred_at, user_agent, ip_address, url in query.order_by(CampaignEvent.occurred_at).limit(limit)
+        ]
+
+    def get_timeline(self, campaign_id: str, company_id: str, granularity: str = "hour") -> list:
+        """Open and click counts per minute or hour bucket, from the rollups"""
+        if granularity not in ROLLUP_BUCKETS:
+            raise ValidationError(f"granularity must be one of: {', '.join(ROLLUP_BUCKETS)}")
+        self._check_campaign(campaign_id, company_id)
+
+        rows = self.db.query(
+            CampaignEventRollup.bucket_start,
+            CampaignEventRollup.event_type,
+            CampaignEventRollup.count
+        ).filter(
+            CampaignEventRollup.campaign_id == campaign_id,
+            CampaignEventRollup.granularity == granularity
+        ).order_by(CampaignEventRollup.bucket_start)
+
+        timeline = {}
+        for bucket_start, event_type, count in rows:
+            bucket = timeline.setdefault(bucket_start, {"bucket_start": bucket_start, "opens": 0, "clicks": 0})
+            bucket["opens" if event_type == EVENT_OPEN else "clicks"] += count
+        return list(timeline.values())
@@ -0,0 +1,125 @@
+"""
+Query plans and timings of the hot lookups with and without the lookup indexes.
+
+Builds a throwaway SQLite database with the full schema, fills it with
+synthetic companies, customers and recipients, then runs each query the
+services issue twice: once with every index from database/models.py and once
+after dropping the indexes added for these lookups.
+
+    python scripts/benchmark_indexes.py [customers_per_company]
+"""
+import os
+import sys
+import time
+import tempfile
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert, text
+from database.connection import Base, create_db_engine
+from database.models import Company, Employee, Customer, Campaign, CampaignRecipient
+
+COMPANIES = 20
+CAMPAIGNS_PER_COMPANY = 5
+LOOKUP_INDEXES = [
+    ("ix_customers_company_id_email", "customers"),
+    ("ix_employees_company_id_created_at_id", "employees"),
+    ("ix_campaigns_company_id_created_at_id", "campaigns"),
+    ("ix_campaign_recipients_customer_id", "campaign_recipients"),
+    ("ix_campaign_recipients_campaign_status_id", "campaign_recipients"),
+]
+QUERIES = {
+    "duplicate customer email": (
+        "SELECT id FROM customers WHERE company_id = :company_id AND email = :email",
+        {"company_id": "comp0007", "email": "c0007-00042@example.com"}
+    ),
+    "company customers": (
+        "SELECT id FROM customers WHERE company_id = :company_id LIMIT 100",
+        {"company_id": "comp0007"}
+    ),
+    "company employees": (
+        "SELECT id FROM employees WHERE company_id = :company_id",
+        {"company_id": "comp0007"}
+    ),
+    "company campaigns": (
+        "SELECT id FROM campaigns WHERE company_id = :company_id ORDER BY created_at DESC LIMIT 20",
+        {"company_id": "comp0007"}
+    ),
+    "pending recipients": (
+        "SELECT id FROM campaign_recipients WHERE campaign_id = :campaign_id AND status = 'pending' ORDER BY id LIMIT 500",
+        {"campaign_id": "cmp00035"}
+    ),
+    "customer's recipients": (
+        "SELECT id FROM campaign_recipients WHERE customer_id = :customer_id",
+        {"customer_id": "c0070042"}
+    ),
+}
+
+def seed(engine, customers_per_company: int):
+    with engine.begin() as connection:
+        connection.execute(insert(Company.__table__), [
+            {"id": f"comp{c:04d}", "company_name": f"Company {c}", "domain": f"c{c}.test"}
+            for c in range(COMPANIES)
+        ])
+        connection.execute(insert(Employee.__table__), [
+            {"id": f"empl{c:04d}", "company_id": f"comp{c:04d}", "name": "Admin",
+             "email": f"admin@c{c}.test", "password_hash": "x", "role": "admin"}
+            for c in range(COMPANIES)
+        ])
+        for c in range(COMPANIES):
+            customers = [
+                {"id": f"c{c:03d}{i:04d}", "company_id": f"comp{c:04d}", "name": f"C{i}",
+                 "email": f"c{c:04d}-{i:05d}@example.com"}
+                for i in range(customers_per_company)
+            ]
+            connection.execute(insert(Customer.__table__), customers)
+            for k in range(CAMPAIGNS_PER_COMPANY):
+                campaign_id = f"cmp{c * CAMPAIGNS_PER_COMPANY + k:05d}"
+                connection.execute(insert(Campaign.__table__), {
+                    "id": campaign_id, "company_id": f"comp{c:04d}", "title": "T", "subject": "S",
+                    "body": "B", "sender_email": f"admin@c{c}.test", "status": "sending",
+                    "created_by_employee_id": f"empl{c:04d}"
+                })
+                connection.execute(insert(CampaignRecipient.__table__), [
+                    {"id": f"r{k}{customer['id'][1:]}", "campaign_id": campaign_id,
+                     "customer_id": customer["id"], "status": "pending" if i % 3 else "sent"}
+                    for i, customer in enumerate(customers)
+                ])
+
+def measure(engine, repeat: int = 50):
+    results = {}
+    with engine.connect() as connection:
+        for name, (sql, params) in QUERIES.items():
+            plan = " | ".join(row[-1] for row in connection.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params))
+            started = time.perf_counter()
+            for _ in range(repeat):
+                connection.execute(text(sql), params).fetchall()
+            results[name] = (plan, (time.perf_counter() - started) / repeat * 1000)
+    return results
+
+def main():
+    customers_per_company = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_db_engine(f"sqlite:///{os.path.join(directory, 'benchmark.db')}")
+        Base.metadata.create_all(bind=engine)
+        seed(engine, customers_per_company)
+        with engine.begin() as connection:
+            connection.execute(text("ANALYZE"))
+
+        indexed = measure(engine)
+        with engine.begin() as connection:
+            for name, _ in LOOKUP_INDEXES:
+                connection.execute(text(f"DROP INDEX {name}"))
+            connection.execute(text("ANALYZE"))
+        unindexed = measure(engine)
+        engine.dispose()
+
+    print(f"{COMPANIES} companies x {customers_per_company} customers, {CAMPAIGNS_PER_COMPANY} campaigns each\n")
+    for name in QUERIES:
+        print(name)
+        print(f"  without indexes: {unindexed[name][1]:8.3f} ms  {unindexed[name][0]}")
+        print(f"  with indexes:    {indexed[name][1]:8.3f} ms  {indexed[name][0]}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Latency of an unrelated endpoint while a login storm is running.
+
+Starts the API on a throwaway SQLite database, measures GET /api/auth/me
+(the dashboard's most frequent call) on its own, then again while
+`concurrency` clients hammer POST /api/auth/login. With password hashing
+on its own bounded, lower-priority pool, the p99 of /me should stay close
+to the idle one.
+
+    python scripts/benchmark_login.py [concurrency] [logins]
+"""
+import os
+import sys
+import json
+import time
+import socket
+import tempfile
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'benchmark.db')}"
+os.environ.setdefault("CAMPAIGN_WORKER_ENABLED", "false")
+os.environ.setdefault("CAMPAIGN_SCHEDULER_ENABLED", "false")
+
+import uvicorn
+from database.connection import SessionLocal, create_tables
+from database.models import Company, Employee
+from utils.security import get_password_hash, password_hasher
+from main import app
+
+PASSWORD = "benchmark-password"
+
+def request(url: str, data: dict = None, token: str = None):
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    body = json.dumps(data).encode() if data is not None else None
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=body, headers=headers)) as response:
+            payload = json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        payload = {"status": e.code}
+    return payload, (time.perf_counter() - started) * 1000
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return samples[len(samples) // 2], samples[int(len(samples) * 0.99) - 1]
+
+def measure_me(base_url: str, token: str, stop: threading.Event, samples: list):
+    while not stop.is_set():
+        samples.append(request(f"{base_url}/api/auth/me", token=token)[1])
+
+def main():
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    logins = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    create_tables()
+    db = SessionLocal()
+    db.add(Company(id="comp0001", company_name="Bench", domain="bench.test"))
+    db.add(Employee(id="empl0001", company_id="comp0001", name="Bench", email="bench@example.com",
+                    password_hash=get_password_hash(PASSWORD), role="admin"))
+    db.commit()
+    db.close()
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    base_url = f"http://127.0.0.1:{port}"
+    credentials = {"email": "bench@example.com", "password": PASSWORD}
+    token = request(f"{base_url}/api/auth/login", credentials)[0]["access_token"]
+
+    idle = []
+    stop = threading.Event()
+    poller = threading.Thread(target=measure_me, args=(base_url, token, stop, idle))
+    poller.start()
+    time.sleep(2)
+    stop.set()
+    poller.join()
+
+    storm = []
+    stop = threading.Event()
+    poller = threading.Thread(target=measure_me, args=(base_url, token, stop, storm))
+    poller.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda _: request(f"{base_url}/api/auth/login", credentials), range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    poller.join()
+    server.should_exit = True
+
+    succeeded = sum(1 for payload, _ in results if "access_token" in payload)
+    print(f"{logins} logins from {concurrency} clients in {elapsed:.1f}s: {succeeded} ok, {logins - succeeded} rejected (503)")
+    print(f"password hashing pool: {password_hasher.stats()}")
+    print("GET /api/auth/me      p50 ms   p99 ms")
+    print("  idle             %8.2f %8.2f" % percentiles(idle))
+    print("  login storm      %8.2f %8.2f" % percentiles(storm))
+
+if __name__ == "__main__":
+    main()
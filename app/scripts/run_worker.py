@@ -0,0 +1,44 @@
+"""
+Standalone campaign dispatch worker.
+
+Run as many of these as needed (on one or more hosts) next to the API;
+recipients are claimed row by row, so workers never send the same email twice.
+Each process also runs the campaign scheduler unless CAMPAIGN_SCHEDULER_ENABLED
+is false; scheduler replicas never fire the same campaign twice either.
+"""
+import asyncio
+import os
+import signal
+import sys
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.config import settings
+from core.logger import flush_logs
+from database.connection import create_tables
+from modules.campaigns.campaigns_worker import start_campaign_workers, stop_campaign_workers
+from modules.campaigns.campaigns_scheduler import CampaignScheduler
+from utils.email_service import email_service
+
+async def main():
+    create_tables()
+    workers = start_campaign_workers(settings.CAMPAIGN_WORKER_CONCURRENCY)
+    scheduler = CampaignScheduler() if settings.CAMPAIGN_SCHEDULER_ENABLED else None
+    if scheduler:
+        scheduler.start()
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_event.set)
+
+    await stop_event.wait()
+    if scheduler:
+        await scheduler.stop()
+    await stop_campaign_workers(workers)
+    email_service.close()
+    flush_logs()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,76 @@
+### tests/conftest.py
+import sys
+import socket
+import asyncio
+from pathlib import Path
+import pytest
+from aiosmtpd.controller import Controller
+from sqlalchemy.orm import sessionmaker
+from database.connection import Base, create_db_engine
+from utils.email_service import EmailService
+from utils.rate_limiter import TokenBucket
+
+# The async auth/customer stack imports itself as the `app` package
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+class CollectingHandler:
+    def __init__(self):
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        return "250 Message accepted for delivery"
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+@pytest.fixture
+def smtp_server():
+    """Local aiosmtpd stand-in for the real SMTP provider"""
+    handler = CollectingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    yield controller, handler
+    controller.stop()
+
+@pytest.fixture
+def local_email_service(smtp_server):
+    """EmailService pointed at the local SMTP server"""
+    controller, _ = smtp_server
+    service = EmailService()
+    service.EMAIL_USER = "sender@example.com"
+    service.EMAIL_PASS = ""
+    service.smtp_configs = [{"host": controller.hostname, "port": controller.port}]
+    # No credentials or rate limit on the local stand-in server
+    service._get_pool(service.smtp_configs[0]).username = ""
+    service._rate_limiters[(service.EMAIL_USER, controller.hostname)] = TokenBucket(rate=0)
+    yield service
+    service.close()
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """Session factory bound to a fresh SQLite database"""
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+@pytest.fixture
+def async_session_factory(tmp_path, monkeypatch):
+    """Async session factory with the async stack's tables on a fresh SQLite database"""
+    from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+    # app.database.base builds its own engine from DATABASE_URL when first imported
+    monkeypatch.setenv("DATABASE_URL", f"sqlite+aiosqlite:///{tmp_path / 'unused.db'}")
+    from app.modules.auth.auth_models import Base as AsyncBase
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'async.db'}")
+
+    async def create_all():
+        async with engine.begin() as connection:
+            await connection.run_sync(AsyncBase.metadata.create_all)
+
+    asyncio.run(create_all())
+    yield sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    asyncio.run(engine.dispose())
@@ -0,0 +1,115 @@
+### tests/test_auth_tokens.py
+import time
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import text
+from app.modules.auth.auth_models import UserToken
+
+def add_tokens(session_factory, tokens):
+    async def add():
+        async with session_factory() as session:
+            session.add_all(tokens)
+            await session.commit()
+    asyncio.run(add())
+
+def test_sweeper_deletes_expired_and_revoked_tokens_on_indexes(async_session_factory):
+    from app.modules.auth.auth_token_sweeper import sweep_tokens
+
+    now = datetime.utcnow()
+    add_tokens(async_session_factory, [
+        UserToken(id="expired", user_id="u1", access_token="a1", expires_at=now - timedelta(hours=1)),
+        UserToken(id="revoked", user_id="u1", access_token="a2", expires_at=now + timedelta(days=1), is_active=False),
+        UserToken(id="live", user_id="u1", access_token="a3", expires_at=now + timedelta(days=1)),
+    ])
+
+    async def sweep():
+        deleted = await sweep_tokens(async_session_factory, batch_size=1)
+        async with async_session_factory() as session:
+            remaining = (await session.execute(text("SELECT id FROM user_tokens"))).scalars().all()
+            plans = [
+                " ".join(row[-1] for row in await session.execute(text(f"EXPLAIN QUERY PLAN SELECT id FROM user_tokens WHERE {condition}")))
+                for condition in ("expires_at < '2026-01-01'", "is_active = 0")
+            ]
+        return deleted, remaining, plans
+
+    deleted, remaining, plans = asyncio.run(sweep())
+
+    assert (deleted, remaining) == (2, ["live"])
+    for plan in plans:
+        assert "USING" in plan and "INDEX" in plan and not plan.startswith("SCAN"), plan
+
+def test_token_sweeper_runs_with_the_app_that_mounts_the_auth_router(async_session_factory):
+    from app.modules.auth import auth_controller
+
+    app = FastAPI()
+    app.include_router(auth_controller.router)
+
+    assert auth_controller.start_token_sweeper in app.router.on_startup
+    assert auth_controller.stop_token_sweeper in app.router.on_shutdown
+
+def token_session(expires_in: timedelta = timedelta(days=1), user_id: str = "u1"):
+    """Mocked AsyncSession whose token lookup finds one active token"""
+    result = MagicMock()
+    result.first.return_value = (datetime.utcnow() + expires_in, user_id, f"{user_id}@example.com", "comp0001")
+    session = AsyncMock()
+    session.execute.return_value = result
+    return session
+
+@pytest.fixture
+def token_cache():
+    from app.modules.auth import auth_service
+    auth_service._token_cache.clear()
+    yield auth_service._token_cache
+    auth_service._token_cache.clear()
+
+def test_resolve_token_is_served_from_cache(token_cache):
+    from app.modules.auth.auth_service import resolve_token
+    session = token_session()
+
+    first = asyncio.run(resolve_token("tok-1", session))
+    second = asyncio.run(resolve_token("tok-1", session))
+
+    assert first == second == {"id": "u1", "uid": "u1", "email": "u1@example.com", "company_id": "comp0001"}
+    assert session.execute.await_count == 1
+    # Keyed by hash, the raw token is not kept
+    assert "tok-1" not in token_cache
+
+def test_logout_and_rotation_invalidate_cached_tokens(token_cache):
+    from app.modules.auth.auth_service import resolve_token, logout_user, invalidate_user_tokens
+    session = token_session()
+
+    asyncio.run(resolve_token("tok-1", session))
+    asyncio.run(resolve_token("tok-2", session))
+    asyncio.run(logout_user("tok-1", session))
+    assert len(token_cache) == 1
+
+    # authenticate_user rotates tokens and drops every cached one of the user
+    invalidate_user_tokens("u1")
+    assert len(token_cache) == 0
+    asyncio.run(resolve_token("tok-2", session))
+    # Two lookups, the logout UPDATE, and a fresh lookup after the rotation
+    assert session.execute.await_count == 4
+
+def test_cached_token_never_outlives_its_expiry(token_cache, monkeypatch):
+    from app.core.config import settings
+    from app.modules.auth.auth_service import resolve_token
+    monkeypatch.setattr(settings, "TOKEN_CACHE_TTL_SECONDS", 60.0)
+
+    asyncio.run(resolve_token("tok-1", token_session(expires_in=timedelta(seconds=5))))
+
+    (_, cached_until), = token_cache.values()
+    assert cached_until - time.monotonic() <= 5
+
+def test_token_cache_can_be_disabled(token_cache, monkeypatch):
+    from app.core.config import settings
+    from app.modules.auth.auth_service import resolve_token
+    monkeypatch.setattr(settings, "TOKEN_CACHE_SIZE", 0)
+    session = token_session()
+
+    asyncio.run(resolve_token("tok-1", session))
+    asyncio.run(resolve_token("tok-1", session))
+
+    assert session.execute.await_count == 2 and not token_cache
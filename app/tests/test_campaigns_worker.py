@@ -0,0 +1,269 @@
+### tests/test_campaigns_worker.py
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from database.models import Company, Employee, Customer, Campaign, CampaignRecipient, CampaignJob, CampaignCounter
+from modules.campaigns import campaigns_worker
+from modules.campaigns.campaigns_worker import CampaignDispatchWorker
+from modules.campaigns.campaigns_scheduler import CampaignScheduler
+from modules.campaigns.campaigns_services import CampaignService
+from conftest import free_port
+
+def seed_campaign(db, recipient_count: int, status: str = "sending") -> CampaignJob:
+    db.add(Company(id="comp0001", company_name="Acme", domain="acme.test"))
+    db.add(Employee(
+        id="empl0001", company_id="comp0001", name="Admin", email="admin@acme.test",
+        password_hash="x", role="admin"
+    ))
+    db.add(Campaign(
+        id="camp0001", company_id="comp0001", title="Launch", subject="Hello",
+        body="<p>Hi</p>", sender_email="admin@acme.test",
+        status=status, created_by_employee_id="empl0001",
+        scheduled_at=datetime.utcnow() - timedelta(minutes=1) if status == "scheduled" else None
+    ))
+    for i in range(recipient_count):
+        db.add(Customer(id=f"cust{i:04d}", company_id="comp0001", name=f"C{i}", email=f"c{i}@example.com"))
+        db.add(CampaignRecipient(id=f"rcpt{i:04d}", campaign_id="camp0001", customer_id=f"cust{i:04d}", status="pending"))
+    if status == "scheduled":
+        db.commit()
+        return None
+    job = CampaignJob(
+        id="job00001", campaign_id="camp0001", created_by_employee_id="empl0001",
+        status="running", total_count=recipient_count
+    )
+    db.add(job)
+    db.commit()
+    return job
+
+def test_concurrent_workers_claim_disjoint_recipients(session_factory):
+    db = session_factory()
+    seed_campaign(db, recipient_count=10)
+    db.close()
+
+    workers = [CampaignDispatchWorker(session_factory, worker_id=f"worker-{i}", batch_size=3) for i in range(4)]
+    start = threading.Barrier(len(workers))
+
+    def claim_all(worker):
+        start.wait()
+        claimed = []
+        while batch := worker._claim_batch("job00001"):
+            claimed += [recipient_id for recipient_id, _ in batch]
+            # Record the batch so the worker's next claim only returns new rows
+            update_db = session_factory()
+            update_db.query(CampaignRecipient).filter(CampaignRecipient.id.in_(claimed)).update(
+                {"status": "sent"}, synchronize_session=False
+            )
+            update_db.commit()
+            update_db.close()
+        return claimed
+
+    with ThreadPoolExecutor(max_workers=len(workers)) as executor:
+        claims = list(executor.map(claim_all, workers))
+
+    claimed = [recipient_id for worker_claims in claims for recipient_id in worker_claims]
+    assert sorted(claimed) == [f"rcpt{i:04d}" for i in range(10)]
+
+def test_worker_sends_job_and_completes_campaign(session_factory, smtp_server, local_email_service, monkeypatch):
+    _, handler = smtp_server
+    monkeypatch.setattr(campaigns_worker, "email_service", local_email_service)
+
+    db = session_factory()
+    job = seed_campaign(db, recipient_count=7)
+    job.status = "queued"
+    db.commit()
+    db.close()
+
+    worker = CampaignDispatchWorker(session_factory, batch_size=3)
+    assert asyncio.run(worker.run_once()) is True
+
+    db = session_factory()
+    job = db.query(CampaignJob).filter(CampaignJob.id == "job00001").one()
+    assert (job.status, job.sent_count, job.failed_count) == ("completed", 7, 0)
+    assert db.query(Campaign).filter(Campaign.id == "camp0001").one().status == "sent"
+    assert {r.status for r in db.query(CampaignRecipient).all()} == {"sent"}
+    db.close()
+    assert len(handler.messages) == 7
+
+def test_scheduler_replicas_fire_due_campaign_once(session_factory):
+    db = session_factory()
+    seed_campaign(db, recipient_count=3, status="scheduled")
+    db.close()
+
+    for replica in (CampaignScheduler(session_factory), CampaignScheduler(session_factory)):
+        replica.fire_due_campaigns()
+
+    db = session_factory()
+    jobs = db.query(CampaignJob).all()
+    assert [(job.campaign_id, job.status, job.total_count) for job in jobs] == [("camp0001", "queued", 3)]
+    assert db.query(Campaign).filter(Campaign.id == "camp0001").one().status == "sending"
+    db.close()
+
+def test_materialize_recipients_skips_duplicates_and_foreign_customers(session_factory):
+    from modules.campaigns.campaigns_services import CampaignService
+
+    db = session_factory()
+    seed_campaign(db, recipient_count=2, status="draft")
+    for i in range(2, 5):
+        db.add(Customer(id=f"cust{i:04d}", company_id="comp0001", name=f"C{i}", email=f"c{i}@example.com"))
+    db.add(Company(id="comp0002", company_name="Other", domain="other.test"))
+    db.add(Customer(id="othr0001", company_id="comp0002", name="O", email="o@other.test"))
+    db.commit()
+
+    service = CampaignService(db)
+    added = service._materialize_recipients(
+        "camp0001", "comp0001", ["cust0001", "cust0002", "cust0002", "othr0001", "bad"]
+    )
+    assert added == 1
+    assert service._materialize_recipients("camp0001", "comp0001") == 2
+    db.commit()
+
+    customer_ids = {r.customer_id for r in db.query(CampaignRecipient).all()}
+    assert customer_ids == {f"cust{i:04d}" for i in range(5)}
+    db.close()
+
+def test_worker_resumes_claims_left_by_dead_worker(session_factory, smtp_server, local_email_service, monkeypatch):
+    _, handler = smtp_server
+    monkeypatch.setattr(campaigns_worker, "email_service", local_email_service)
+
+    db = session_factory()
+    seed_campaign(db, recipient_count=5)
+    # A crashed worker checkpointed one send and still held two claims
+    db.query(CampaignRecipient).filter(CampaignRecipient.id == "rcpt0000").update({"status": "sent"})
+    db.query(CampaignRecipient).filter(CampaignRecipient.id.in_(["rcpt0001", "rcpt0002"])).update({
+        "status": "sending", "claimed_by": "dead-worker", "claimed_at": datetime.utcnow() - timedelta(hours=1)
+    }, synchronize_session=False)
+    db.query(CampaignJob).update({"sent_count": 1})
+    db.commit()
+    db.close()
+
+    assert asyncio.run(CampaignDispatchWorker(session_factory).run_once()) is True
+
+    db = session_factory()
+    job = db.query(CampaignJob).one()
+    assert (job.status, job.sent_count) == ("completed", 5)
+    assert {r.status for r in db.query(CampaignRecipient).all()} == {"sent"}
+    db.close()
+    # The checkpointed recipient is not sent again
+    assert sorted(rcpt for envelope in handler.messages for rcpt in envelope.rcpt_tos) == [f"c{i}@example.com" for i in range(1, 5)]
+
+def test_campaign_stats_read_the_counters_row(session_factory):
+    from modules.campaigns.campaigns_services import CampaignService
+
+    db = session_factory()
+    seed_campaign(db, recipient_count=5, status="sent")
+    # Deliberately different from the recipients, to show where stats come from
+    db.add(CampaignCounter(campaign_id="camp0001", total=10, sent=8, failed=0, opened=3, clicked=2, bounced=2))
+    db.commit()
+
+    employee = db.query(Employee).filter(Employee.id == "empl0001").one()
+    stats = CampaignService(db).get_campaign_stats("camp0001", employee)
+    assert (stats.total_recipients, stats.sent_count, stats.opened_count, stats.clicked_count, stats.bounce_count) == (10, 6, 3, 2, 2)
+    assert (stats.open_rate, stats.click_rate) == (50.0, 33.33)
+    db.close()
+
+def test_campaign_stats_fall_back_to_recipients_without_counters_row(session_factory):
+    from modules.campaigns.campaigns_services import CampaignService
+
+    db = session_factory()
+    seed_campaign(db, recipient_count=5, status="sent")
+    now = datetime.utcnow()
+    for recipient_id, values in {
+        "rcpt0000": {"status": "sent"},
+        "rcpt0001": {"status": "opened", "opened_at": now},
+        "rcpt0002": {"status": "clicked", "opened_at": now, "clicked_at": now},
+        "rcpt0003": {"status": "bounced"},
+    }.items():
+        db.query(CampaignRecipient).filter(CampaignRecipient.id == recipient_id).update(values)
+    db.commit()
+
+    employee = db.query(Employee).filter(Employee.id == "empl0001").one()
+    stats = CampaignService(db).get_campaign_stats("camp0001", employee)
+    assert (stats.total_recipients, stats.sent_count, stats.opened_count, stats.clicked_count, stats.bounce_count) == (5, 3, 2, 1, 1)
+    assert (stats.open_rate, stats.click_rate) == (66.67, 33.33)
+    db.close()
+
+def test_counters_track_sends_and_opens_incrementally(session_factory, smtp_server, local_email_service, monkeypatch):
+    from modules.campaigns.campaigns_counters import get_counters, rebuild_counters
+    from modules.tracking.services import TrackingService
+    from database.models import EVENT_OPEN, EVENT_CLICK
+
+    monkeypatch.setattr(campaigns_worker, "email_service", local_email_service)
+    db = session_factory()
+    seed_campaign(db, recipient_count=4)
+    # Campaigns without a row are counted on read, but nothing is stored
+    assert get_counters(db, ["camp0001"])["camp0001"]["total"] == 4
+    assert db.query(CampaignCounter).count() == 0
+    # create_campaign (or migration 0006) gives every campaign its row
+    db.add(CampaignCounter(campaign_id="camp0001"))
+    db.commit()
+    rebuild_counters(db, ["camp0001"])
+    db.commit()
+    db.close()
+
+    asyncio.run(CampaignDispatchWorker(session_factory, batch_size=3).run_once())
+
+    db = session_factory()
+    now = datetime.utcnow()
+    TrackingService(db).record_events([
+        {"event_type": EVENT_OPEN, "campaign_id": "camp0001", "recipient_id": "rcpt0000", "occurred_at": now},
+        {"event_type": EVENT_OPEN, "campaign_id": "camp0001", "recipient_id": "rcpt0000", "occurred_at": now},
+        {"event_type": EVENT_CLICK, "campaign_id": "camp0001", "recipient_id": "rcpt0001", "occurred_at": now},
+    ])
+
+    maintained = get_counters(db, ["camp0001"])["camp0001"]
+    assert maintained == {"total": 4, "sent": 4, "failed": 0, "opened": 2, "clicked": 1, "bounced": 0}
+    assert rebuild_counters(db, ["camp0001"])["camp0001"] == maintained
+    db.close()
+
+def test_smtp_outage_leaves_recipients_pending(session_factory, local_email_service, monkeypatch):
+    # Nothing listens here, so every configuration's circuit opens
+    local_email_service.smtp_configs = [{"host": "127.0.0.1", "port": free_port()}]
+    monkeypatch.setattr(campaigns_worker, "email_service", local_email_service)
+
+    db = session_factory()
+    seed_campaign(db, recipient_count=5)
+    db.close()
+
+    worker = CampaignDispatchWorker(session_factory, batch_size=3)
+    assert asyncio.run(worker.run_once()) is False
+
+    db = session_factory()
+    job = db.query(CampaignJob).filter(CampaignJob.id == "job00001").one()
+    assert (job.status, job.sent_count, job.failed_count) == ("running", 0, 0)
+    assert {(r.status, r.claimed_by) for r in db.query(CampaignRecipient).all()} == {("pending", None)}
+    db.close()
+
+def test_insert_recipients_counts_only_rows_it_added(session_factory):
+    db = session_factory()
+    seed_campaign(db, recipient_count=2)
+    db.add(Customer(id="cust0009", company_id="comp0001", name="New", email="new@example.com"))
+    db.commit()
+
+    # cust0001 is already on the campaign, e.g. added by a concurrent request after the eligibility SELECT
+    assert CampaignService(db)._insert_recipients("camp0001", ["cust0001", "cust0009"]) == 1
+    assert db.query(CampaignRecipient).count() == 3
+    db.close()
+
+def test_claim_statements_use_indexes(session_factory):
+    from sqlalchemy import text
+    db = session_factory()
+
+    def plan(sql):
+        return " ".join(row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+
+    sweep = plan("UPDATE campaign_recipients SET status = 'pending' WHERE status = 'sending' AND claimed_at < '2026-01-01'")
+    assert "ix_campaign_recipients_status_claimed_at" in sweep
+    # Heartbeat and release are scoped to the claimed job's campaign
+    heartbeat = plan("UPDATE campaign_recipients SET claimed_at = '2026-01-01' WHERE campaign_id = 'camp0001' AND status = 'sending' AND claimed_by = 'w'")
+    assert heartbeat.startswith("SEARCH campaign_recipients USING INDEX") and "(campaign_id=? AND status=?)" in heartbeat
+    db.close()
+
+def test_stale_claims_are_swept_every_n_polls(session_factory, monkeypatch):
+    monkeypatch.setattr(campaigns_worker.settings, "CAMPAIGN_CLAIM_SWEEP_POLLS", 3)
+    worker = CampaignDispatchWorker(session_factory)
+    sweeps = []
+    monkeypatch.setattr(worker, "_release_stale_claims", sweeps.append)
+    for _ in range(7):
+        assert worker._next_job() is None
+    assert len(sweeps) == 3
@@ -0,0 +1,101 @@
+### tests/test_customers.py
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import text
+from database.models import Company, Employee, Customer
+from database.search import ensure_customer_search_index
+from modules.customers.customers_schemas import CustomerUpdate
+from modules.customers.customers_services import CustomerService
+
+def test_search_uses_fts_index_and_stays_in_sync(session_factory):
+    db = session_factory()
+    db.add(Company(id="comp0001", company_name="Acme", domain="acme.test"))
+    db.add(Company(id="comp0002", company_name="Other", domain="other.test"))
+    employee = Employee(id="empl0001", company_id="comp0001", name="Admin", email="admin@acme.test", password_hash="x", role="admin")
+    db.add(employee)
+    db.add(Customer(id="cust0001", company_id="comp0001", name="Ann Smith", email="ann@example.com", location="Paris"))
+    db.add(Customer(id="cust0002", company_id="comp0001", name="Bob", email="bob.smithers@example.com", location="Berlin"))
+    db.add(Customer(id="cust0003", company_id="comp0001", name="Carl", email="carl@example.com", location="Smithfield"))
+    db.add(Customer(id="cust0004", company_id="comp0002", name="Dan Smith", email="dan@example.com", location="Rome"))
+    db.commit()
+    service = CustomerService(db)
+
+    # Substring matches in any column, scoped to the company, name matches ranked first
+    assert [customer.id for customer in service.search_customers("smith", employee)][0] == "cust0001"
+    assert {customer.id for customer in service.search_customers("smith", employee)} == {"cust0001", "cust0002", "cust0003"}
+    assert [customer.id for customer in service.search_customers("Pa", employee)] == ["cust0001"]
+
+    service.update_customer("cust0002", CustomerUpdate(email="bob@example.com"), employee)
+    service.delete_customer("cust0003", employee)
+    assert [customer.id for customer in service.search_customers("smith", employee)] == ["cust0001"]
+
+    plan = " ".join(row[-1] for row in db.execute(text(
+        "EXPLAIN QUERY PLAN SELECT rowid FROM customers_fts WHERE customers_fts MATCH '\"smith\"'"
+    )))
+    assert "VIRTUAL TABLE INDEX" in plan
+    db.close()
+
+def test_search_survives_renumbered_customer_rowids(session_factory):
+    db = session_factory()
+    db.add(Company(id="comp0001", company_name="Acme", domain="acme.test"))
+    employee = Employee(id="empl0001", company_id="comp0001", name="Admin", email="admin@acme.test", password_hash="x", role="admin")
+    db.add(employee)
+    for i, name in enumerate(["Ann", "Bob", "Carl", "Dora"]):
+        db.add(Customer(id=f"cust{i:04d}", company_id="comp0001", name=name, email=f"{name.lower()}@example.com"))
+    db.commit()
+    service = CustomerService(db)
+    service.delete_customer("cust0000", employee)
+    service.delete_customer("cust0001", employee)
+    db.close()
+
+    # VACUUM may renumber the implicit rowids of customers without firing any
+    # trigger; do the same by hand, search must not depend on them
+    with session_factory().get_bind().begin() as connection:
+        connection.execute(text("DROP TRIGGER customers_fts_update"))
+        connection.execute(text("UPDATE customers SET rowid = rowid + 100"))
+        ensure_customer_search_index(connection)
+
+    db = session_factory()
+    service = CustomerService(db)
+    employee = db.get(Employee, "empl0001")
+    assert [customer.id for customer in service.search_customers("Dora", employee)] == ["cust0003"]
+    service.update_customer("cust0002", CustomerUpdate(name="Carla"), employee)
+    assert [customer.id for customer in service.search_customers("Carla", employee)] == ["cust0002"]
+    assert service.search_customers("Ann", employee) == []
+    db.close()
+
+def test_cursor_pages_cover_every_customer_once(session_factory):
+    db = session_factory()
+    db.add(Company(id="comp0001", company_name="Acme", domain="acme.test"))
+    employee = Employee(id="empl0001", company_id="comp0001", name="Admin", email="admin@acme.test", password_hash="x", role="admin")
+    db.add(employee)
+    # Same-second server default timestamps, so the id tiebreak does the work
+    for i in range(7):
+        db.add(Customer(id=f"cust{i:04d}", company_id="comp0001", name=f"Customer {i}", email=f"c{i}@example.com"))
+    db.commit()
+    service = CustomerService(db)
+
+    page = service.get_customers(employee, limit=3, include_total=True)
+    assert page.total == 7
+    seen = [customer.id for customer in page.items]
+    while page.next_cursor:
+        page = service.get_customers(employee, limit=3, cursor=page.next_cursor)
+        assert page.total is None
+        seen += [customer.id for customer in page.items]
+    assert seen == [f"cust{i:04d}" for i in reversed(range(7))]
+
+    # Offset paging still works for old clients
+    assert [customer.id for customer in service.get_customers(employee, skip=5, limit=3).items] == ["cust0001", "cust0000"]
+    db.close()
+
+def test_async_customer_listing_rejects_bad_cursor_with_400(async_session_factory):
+    import asyncio
+    from app.modules.customer.customer_service import get_customers_by_company
+
+    async def list_customers():
+        async with async_session_factory() as session:
+            await get_customers_by_company("comp0001", session, cursor="not-a-cursor", include_total=False)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(list_customers())
+    assert error.value.status_code == 400
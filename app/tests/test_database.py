@@ -0,0 +1,33 @@
+### tests/test_database.py
+from sqlalchemy import text
+from database.connection import create_db_engine
+
+def test_sqlite_engine_applies_wal_and_pragmas(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'pragmas.db'}")
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert connection.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert connection.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+    assert engine.pool.size() == 20
+    engine.dispose()
+
+def test_in_memory_sqlite_engine_skips_file_only_options():
+    engine = create_db_engine("sqlite://")
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "memory"
+    engine.dispose()
+
+def test_company_lookups_use_indexes(session_factory):
+    db = session_factory()
+    plans = {
+        sql: " ".join(row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+        for sql in (
+            "SELECT id FROM customers WHERE company_id = 'comp0001' AND email = 'a@example.com'",
+            "SELECT id FROM employees WHERE company_id = 'comp0001'",
+            "SELECT id FROM campaigns WHERE company_id = 'comp0001' ORDER BY created_at DESC",
+            "SELECT id FROM campaign_recipients WHERE customer_id = 'cust0001'",
+        )
+    }
+    for sql, plan in plans.items():
+        assert "USING" in plan and "INDEX" in plan and not plan.startswith("SCAN"), (sql, plan)
+    db.close()
@@ -0,0 +1,176 @@
+### tests/test_email_service.py
+import time
+import asyncio
+import pytest
+from core.config import settings
+from core.exceptions import SMTPUnavailableError
+from utils.rate_limiter import TokenBucket
+from conftest import free_port
+
+def test_send_bulk_emails_delivers_every_recipient_once(smtp_server, local_email_service):
+    _, handler = smtp_server
+    recipients = [
+        {"email": f"user{i}@example.com", "recipient_id": f"r{i:07d}"}
+        for i in range(25)
+    ]
+
+    results = asyncio.run(local_email_service.send_bulk_emails(
+        recipients=recipients,
+        subject="Hello",
+        body="<p>Hi there</p>",
+        sender_email="sender@example.com",
+        campaign_id="c0000001"
+    ))
+
+    assert (results["sent"], results["failed"], results["errors"]) == (25, 0, [])
+    assert sorted(r["recipient_id"] for r in results["recipient_results"]) == sorted(r["recipient_id"] for r in recipients)
+    assert {r["status"] for r in results["recipient_results"]} == {"sent"}
+    delivered = sorted(rcpt for envelope in handler.messages for rcpt in envelope.rcpt_tos)
+    assert delivered == sorted(r["email"] for r in recipients)
+
+def test_token_bucket_limits_rate():
+    async def take(bucket, n):
+        for _ in range(n):
+            await bucket.acquire()
+
+    bucket = TokenBucket(rate=50, capacity=5)
+    started = time.monotonic()
+    asyncio.run(take(bucket, 15))
+
+    # 5 burst tokens are free, the remaining 10 arrive at 50/s
+    assert time.monotonic() - started >= 0.18
+
+def test_working_config_is_cached_and_fails_over(smtp_server, local_email_service):
+    controller, _ = smtp_server
+    good = local_email_service.smtp_configs[0]
+    dead = {"host": "127.0.0.1", "port": free_port()}
+    local_email_service.smtp_configs = [dead, good]
+
+    probes = []
+    original_probe = local_email_service._test_smtp_connection
+
+    async def counting_probe(config):
+        probes.append(config)
+        return await original_probe(config)
+
+    local_email_service._test_smtp_connection = counting_probe
+
+    async def resolve_twice():
+        first = await local_email_service._get_working_smtp_config()
+        second = await local_email_service._get_working_smtp_config()
+        return first, second
+
+    first, second = asyncio.run(resolve_twice())
+
+    assert first is good and second is good
+    # The dead config is probed once and then skipped while its circuit is open
+    assert probes == [dead, good]
+    assert (dead["host"], dead["port"]) in local_email_service._config_failures
+
+def test_message_template_matches_full_build(local_email_service):
+    from email import message_from_bytes, policy
+
+    body = "<p>Café news</p>" + "x" * 120
+    rendered = local_email_service._render_message("user@example.com", "Weekly", body, "camp0001", "rcpt0001")
+    built = local_email_service._build_message("user@example.com", "Weekly", body, "camp0001", "rcpt0001")
+
+    assert isinstance(rendered, bytes)
+    parsed = message_from_bytes(rendered, policy=policy.default)
+    assert (parsed["From"], parsed["To"], parsed["Subject"]) == (built["From"], built["To"], built["Subject"])
+    for subtype in ("plain", "html"):
+        assert parsed.get_body((subtype,)).get_content().replace("\r\n", "\n").rstrip() == \
+            built.get_body((subtype,)).get_content().rstrip()
+
+def test_send_bulk_emails_raises_when_no_smtp_server_is_reachable(local_email_service):
+    local_email_service.smtp_configs = [{"host": "127.0.0.1", "port": free_port()}]
+    checkpoints = []
+
+    async def checkpoint(results):
+        checkpoints.append(results)
+
+    with pytest.raises(SMTPUnavailableError):
+        asyncio.run(local_email_service.send_bulk_emails(
+            recipients=[{"email": "user@example.com", "recipient_id": "r0000001"}],
+            subject="Hello",
+            body="<p>Hi there</p>",
+            sender_email="sender@example.com",
+            campaign_id="c0000001",
+            checkpoint=checkpoint
+        ))
+
+    # Nobody is recorded as failed
+    assert checkpoints == []
+
+def test_failed_checkpoint_stops_every_send_worker(smtp_server, local_email_service, monkeypatch):
+    _, handler = smtp_server
+    monkeypatch.setattr(settings, "EMAIL_SEND_WORKERS", 4)
+    recipients = [
+        {"email": f"user{i}@example.com", "recipient_id": f"r{i:07d}"}
+        for i in range(50)
+    ]
+
+    failures = []
+
+    async def checkpoint(results):
+        # Only the first save fails; the other workers' saves would go through
+        if not failures:
+            failures.append(results)
+            raise RuntimeError("database is locked")
+
+    async def send():
+        with pytest.raises(RuntimeError):
+            await local_email_service.send_bulk_emails(
+                recipients=recipients,
+                subject="Hello",
+                body="<p>Hi there</p>",
+                sender_email="sender@example.com",
+                campaign_id="c0000001",
+                checkpoint=checkpoint,
+                checkpoint_size=1
+            )
+        # Let sends already handed to the SMTP threads finish
+        await asyncio.sleep(0.2)
+
+    asyncio.run(send())
+
+    # Only the messages in flight when the checkpoint failed, at most one per worker
+    assert len(handler.messages) <= 4
+
+class HangUpOnMailHandler:
+    """Passes the connection probe, then drops every session at MAIL FROM"""
+
+    async def handle_MAIL(self, server, session, envelope, address, mail_options):
+        server.transport.close()
+
+def test_send_bulk_emails_treats_failover_transport_errors_as_an_outage(local_email_service):
+    from aiosmtpd.controller import Controller
+
+    controllers = [Controller(HangUpOnMailHandler(), hostname="127.0.0.1", port=free_port()) for _ in range(2)]
+    for controller in controllers:
+        controller.start()
+    local_email_service.smtp_configs = [{"host": c.hostname, "port": c.port} for c in controllers]
+    for config in local_email_service.smtp_configs:
+        local_email_service._get_pool(config).username = ""
+        local_email_service._rate_limiters[(local_email_service.EMAIL_USER, config["host"])] = TokenBucket(rate=0)
+    checkpoints = []
+
+    async def checkpoint(results):
+        checkpoints.append(results)
+
+    try:
+        with pytest.raises(SMTPUnavailableError):
+            asyncio.run(local_email_service.send_bulk_emails(
+                recipients=[{"email": "user@example.com", "recipient_id": "r0000001"}],
+                subject="Hello",
+                body="<p>Hi there</p>",
+                sender_email="sender@example.com",
+                campaign_id="c0000001",
+                checkpoint=checkpoint
+            ))
+    finally:
+        for controller in controllers:
+            controller.stop()
+
+    # Both configs are marked failed and the recipient is not recorded as failed
+    assert {(c["host"], c["port"]) for c in local_email_service.smtp_configs} <= set(local_email_service._config_failures)
+    assert checkpoints == []
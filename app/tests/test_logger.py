@@ -0,0 +1,44 @@
+### tests/test_logger.py
+import queue
+import logging
+from core.logger import DatabaseHandler, DatabaseLogWriter
+from database.models import Log
+
+def test_log_records_are_written_in_batches_and_dropped_when_full(session_factory):
+    log_queue = queue.Queue(maxsize=5)
+    handler = DatabaseHandler(log_queue)
+    test_logger = logging.getLogger("test_db_log_sink")
+    test_logger.propagate = False
+    test_logger.addHandler(handler)
+
+    for i in range(7):
+        test_logger.warning(f"line {i}", extra={"employee_id": "empl0001", "action": "test"})
+    assert handler.dropped == 2
+
+    writer = DatabaseLogWriter(log_queue, batch_size=2, flush_interval=0.05, session_factory=session_factory)
+    writer.start()
+    writer.stop()
+    test_logger.removeHandler(handler)
+
+    db = session_factory()
+    assert sorted(log.details for log in db.query(Log).all()) == [f"line {i}" for i in range(5)]
+    assert writer.written == 5
+    db.close()
+
+def test_flush_writes_queued_entries_and_keeps_the_writer_running(session_factory):
+    log_queue = queue.Queue(maxsize=10)
+    writer = DatabaseLogWriter(log_queue, batch_size=2, flush_interval=0.05, session_factory=session_factory)
+    assert not writer.flush(timeout=0.1)
+    writer.start()
+    for i in range(3):
+        log_queue.put({"employee_id": None, "action": "test", "details": f"line {i}", "timestamp": None})
+    # Returns only once the entries queued ahead of it are in the table
+    assert writer.flush(timeout=5)
+    assert writer.written == 3
+
+    log_queue.put({"employee_id": None, "action": "test", "details": "line 3", "timestamp": None})
+    assert writer.flush(timeout=5)
+    assert writer.written == 4
+    writer.stop()
+    # stop() is final: nothing restarts the thread
+    assert not writer.flush(timeout=0.1)
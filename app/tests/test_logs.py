@@ -0,0 +1,58 @@
+### tests/test_logs.py
+import gzip
+import json
+from datetime import datetime, timedelta
+import pytest
+from core.exceptions import ValidationError
+from database.models import Company, Employee, Log
+from modules.logs.logs_services import LogService
+from modules.logs.logs_archiver import LogArchiver
+
+def seed_logs(db):
+    now = datetime.utcnow()
+    db.add(Company(id="comp0001", company_name="Acme", domain="acme.test"))
+    db.add(Company(id="comp0002", company_name="Other", domain="other.test"))
+    db.add(Employee(id="empl0001", company_id="comp0001", name="A", email="a@acme.test", password_hash="x", role="admin"))
+    db.add(Employee(id="empl0002", company_id="comp0002", name="B", email="b@other.test", password_hash="x", role="admin"))
+    for i in range(5):
+        db.add(Log(id=f"log{i:05d}", timestamp=now - timedelta(minutes=i), employee_id="empl0001", action="login", details=f"a{i}"))
+    db.add(Log(id="logother", timestamp=now, employee_id="empl0002", action="login", details="other"))
+    for i in range(3):
+        db.add(Log(id=f"old{i:05d}", timestamp=now - timedelta(days=100 + i), employee_id="empl0001", action="login", details=f"old{i}"))
+    db.commit()
+
+def test_query_logs_is_company_scoped_and_keyset_paginated(session_factory):
+    db = session_factory()
+    seed_logs(db)
+    admin = db.query(Employee).filter(Employee.id == "empl0001").first()
+    service = LogService(db)
+
+    first = service.query_logs(admin, start=datetime.utcnow() - timedelta(days=1), limit=3)
+    second = service.query_logs(admin, start=datetime.utcnow() - timedelta(days=1), cursor=first.next_cursor, limit=3)
+
+    assert [entry.details for entry in first.items] == ["a0", "a1", "a2"]
+    assert [entry.details for entry in second.items] == ["a3", "a4"]
+    assert second.next_cursor is None
+
+    with pytest.raises(ValidationError):
+        service.query_logs(admin, cursor="not-a-cursor")
+    db.close()
+
+def test_archive_once_moves_expired_logs_to_gzip(session_factory, tmp_path):
+    db = session_factory()
+    seed_logs(db)
+    db.close()
+
+    archiver = LogArchiver(session_factory, archive_dir=str(tmp_path / "archive"), retention_days=90, batch_size=2)
+    assert archiver.archive_once() == 3
+
+    files = list((tmp_path / "archive").glob("*.jsonl.gz"))
+    assert len(files) == 1
+    with gzip.open(files[0], "rt", encoding="utf-8") as archive:
+        archived = [json.loads(line) for line in archive]
+    assert [entry["details"] for entry in archived] == ["old2", "old1", "old0"]
+
+    db = session_factory()
+    assert db.query(Log).count() == 6
+    assert db.query(Log).filter(Log.id.like("old%")).count() == 0
+    db.close()
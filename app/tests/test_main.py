@@ -4,12 +4,13 @@ import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from database.connection import Base, get_db
 from main import app
 
-# Test database
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+# Test database, in memory so no file is left behind; one shared connection across threads
+SQLALCHEMY_DATABASE_URL = "sqlite://"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}, poolclass=StaticPool)
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base.metadata.create_all(bind=engine)
@@ -33,3 +34,53 @@ def test_root():
     response = client.get("/")
     assert response.status_code == 200
     assert "Email Campaign Management System" in response.json()["message"]
+
+def _dependencies(dependant):
+    for dependency in dependant.dependencies:
+        yield dependency
+        yield from _dependencies(dependency)
+
+def _api_routes(routes):
+    # Newer FastAPI keeps included routers as one entry wrapping the router's own routes
+    from fastapi.routing import APIRoute
+    for route in routes:
+        if isinstance(route, APIRoute):
+            yield route
+        elif hasattr(route, "original_router"):
+            yield from _api_routes(route.original_router.routes)
+
+def _database_routes_on_event_loop(application):
+    import inspect
+    blocking = []
+    for route in _api_routes(application.routes):
+        dependencies = list(_dependencies(route.dependant))
+        if any(dependency.call is get_db for dependency in dependencies):
+            if inspect.iscoroutinefunction(route.endpoint) or any(inspect.iscoroutinefunction(dependency.call) for dependency in dependencies):
+                blocking.append(route.path)
+    return blocking
+
+def test_database_bound_endpoints_run_off_the_event_loop():
+    # Sync SQLAlchemy sessions block; FastAPI only moves plain `def` endpoints and dependencies to its thread pool
+    assert _database_routes_on_event_loop(app) == []
+
+    from fastapi import APIRouter, Depends, FastAPI
+    from utils.security import get_current_employee
+    probe_router = APIRouter()
+
+    @probe_router.get("/blocking")
+    async def blocking(current_employee=Depends(get_current_employee)):
+        return {}
+
+    probe = FastAPI()
+    probe.include_router(probe_router, prefix="/api/probe")
+    assert _database_routes_on_event_loop(probe) == ["/blocking"]
+
+def test_password_hashing_stats_are_admin_only():
+    from database.models import Employee
+    from utils.security import get_current_employee
+    for role, expected in (("user", 403), ("admin", 200)):
+        app.dependency_overrides[get_current_employee] = lambda: Employee(id="empl0001", role=role)
+        try:
+            assert client.get("/api/auth/password-hashing/stats").status_code == expected
+        finally:
+            del app.dependency_overrides[get_current_employee]
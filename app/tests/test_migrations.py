@@ -0,0 +1,101 @@
+### tests/test_migrations.py
+import shutil
+import sqlite3
+from pathlib import Path
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+from sqlalchemy.orm import sessionmaker
+from database.bulk import insert_ignore
+from database.connection import create_db_engine
+from database.models import Campaign, CampaignCounter, CampaignRecipient
+
+APP_DIR = Path(__file__).resolve().parent.parent
+
+def upgraded_baseline(tmp_path, path=None) -> str:
+    """Copy of the shipped (pre-migration) database brought to head"""
+    if path is None:
+        path = tmp_path / "baseline.db"
+        shutil.copy(APP_DIR / "email_campaign.db", path)
+    url = f"sqlite:///{path}"
+    config = Config()
+    config.set_main_option("script_location", str(APP_DIR / "migrations"))
+    config.set_main_option("sqlalchemy.url", url)
+    command.upgrade(config, "head")
+    return url
+
+def test_upgrade_adds_recipient_claim_columns(tmp_path):
+    engine = create_db_engine(upgraded_baseline(tmp_path))
+    columns = {column["name"] for column in inspect(engine).get_columns("campaign_recipients")}
+    assert {"claimed_by", "claimed_at"} <= columns
+
+    # Selects every mapped column; failed with "no such column" before 0004
+    db = sessionmaker(bind=engine)()
+    db.query(CampaignRecipient).count()
+    db.close()
+    engine.dispose()
+
+def test_upgrade_dedupes_recipients_and_adds_unique_constraint(tmp_path):
+    path = tmp_path / "baseline.db"
+    shutil.copy(APP_DIR / "email_campaign.db", path)
+    with sqlite3.connect(path) as connection:
+        connection.executescript("""
+            INSERT INTO companies (id, company_name, domain) VALUES ('comp0001', 'Acme', 'acme.test');
+            INSERT INTO employees (id, company_id, name, email, password_hash, role) VALUES ('empl0001', 'comp0001', 'Admin', 'admin@acme.test', 'x', 'admin');
+            INSERT INTO customers (id, company_id, name, email) VALUES ('cust0001', 'comp0001', 'Ann', 'ann@example.com');
+            INSERT INTO campaigns (id, company_id, title, subject, body, sender_email, status, created_by_employee_id)
+                VALUES ('camp0001', 'comp0001', 'Launch', 'Hello', 'Hi', 'admin@acme.test', 'sending', 'empl0001');
+            INSERT INTO campaign_recipients (id, campaign_id, customer_id, status) VALUES
+                ('rcpt0001', 'camp0001', 'cust0001', 'pending'),
+                ('rcpt0002', 'camp0001', 'cust0001', 'sent');
+        """)
+
+    engine = create_db_engine(upgraded_baseline(tmp_path, path))
+    constraints = {constraint["name"] for constraint in inspect(engine).get_unique_constraints("campaign_recipients")}
+    assert "uq_campaign_recipients_campaign_customer" in constraints
+
+    db = sessionmaker(bind=engine)()
+    # The duplicate that was already sent survives
+    recipients = db.query(CampaignRecipient).filter(CampaignRecipient.campaign_id == "camp0001")
+    assert [(r.id, r.status) for r in recipients.all()] == [("rcpt0002", "sent")]
+    # insert_ignore now has a constraint to conflict on
+    db.execute(insert_ignore(db, CampaignRecipient), [
+        {"id": "rcpt0003", "campaign_id": "camp0001", "customer_id": "cust0001", "status": "pending"}
+    ])
+    db.commit()
+    assert recipients.count() == 1
+    db.close()
+    engine.dispose()
+
+def test_upgrade_backfills_campaign_counters(tmp_path):
+    path = tmp_path / "baseline.db"
+    shutil.copy(APP_DIR / "email_campaign.db", path)
+    with sqlite3.connect(path) as connection:
+        connection.executescript("""
+            INSERT INTO companies (id, company_name, domain) VALUES ('comp0001', 'Acme', 'acme.test');
+            INSERT INTO employees (id, company_id, name, email, password_hash, role) VALUES ('empl0001', 'comp0001', 'Admin', 'admin@acme.test', 'x', 'admin');
+            INSERT INTO customers (id, company_id, name, email) VALUES
+                ('cust0001', 'comp0001', 'Ann', 'ann@example.com'),
+                ('cust0002', 'comp0001', 'Bob', 'bob@example.com');
+            INSERT INTO campaigns (id, company_id, title, subject, body, sender_email, status, created_by_employee_id)
+                VALUES ('camp0001', 'comp0001', 'Launch', 'Hello', 'Hi', 'admin@acme.test', 'sending', 'empl0001');
+            INSERT INTO campaign_recipients (id, campaign_id, customer_id, status, opened_at) VALUES
+                ('rcpt0001', 'camp0001', 'cust0001', 'opened', '2026-10-16 12:00:00'),
+                ('rcpt0002', 'camp0001', 'cust0002', 'failed', NULL);
+        """)
+
+    engine = create_db_engine(upgraded_baseline(tmp_path, path))
+    db = sessionmaker(bind=engine)()
+    counters = db.get(CampaignCounter, "camp0001")
+    assert (counters.total, counters.sent, counters.failed, counters.opened) == (2, 1, 1, 1)
+    # Every campaign has a row, so get_counters never has to count on read
+    assert db.query(CampaignCounter).count() == db.query(Campaign).count()
+    db.close()
+    engine.dispose()
+
+def test_upgrade_drops_recipient_stats_index(tmp_path):
+    engine = create_db_engine(upgraded_baseline(tmp_path))
+    indexes = {index["name"] for index in inspect(engine).get_indexes("campaign_recipients")}
+    assert "ix_campaign_recipients_stats" not in indexes
+    assert {"ix_campaign_recipients_campaign_status_id", "ix_campaign_recipients_status_claimed_at"} <= indexes
+    engine.dispose()
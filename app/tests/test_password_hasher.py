@@ -0,0 +1,42 @@
+### tests/test_password_hasher.py
+import os
+import sys
+import time
+import threading
+import pytest
+from core.exceptions import ServiceBusyError
+from utils.password_hasher import PasswordHasher
+
+def test_hash_verify_and_cost_upgrade():
+    hasher = PasswordHasher(workers=2, rounds=4, max_queued=4)
+    hashed = hasher.hash("s3cret")
+
+    assert hasher.verify("s3cret", hashed)
+    assert not hasher.verify("wrong", hashed)
+    assert not hasher.verify("s3cret", "not-a-bcrypt-hash")
+    assert not hasher.needs_rehash(hashed)
+    assert PasswordHasher(workers=1, rounds=5, max_queued=1).needs_rehash(hashed)
+    assert hasher.stats()["completed"] == 4
+
+def test_calls_beyond_max_queued_are_rejected():
+    hasher = PasswordHasher(workers=1, rounds=4, max_queued=1)
+    # One call running on the only worker and one waiting for it
+    busy = [threading.Thread(target=hasher._run, args=(time.sleep, 0.3)) for _ in range(2)]
+    for thread in busy:
+        thread.start()
+        time.sleep(0.05)
+    assert hasher.stats()["running"] == 1
+
+    with pytest.raises(ServiceBusyError):
+        hasher.hash("s3cret")
+    for thread in busy:
+        thread.join()
+
+    assert hasher.stats()["rejected"] == 1
+    assert hasher.verify("s3cret", hasher.hash("s3cret"))
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="per-thread nice values are Linux-only")
+def test_hashing_threads_run_at_lower_priority():
+    hasher = PasswordHasher(workers=1, rounds=4, max_queued=1, niceness=5)
+    own = os.getpriority(os.PRIO_PROCESS, 0)
+    assert hasher._run(lambda: os.getpriority(os.PRIO_PROCESS, threading.get_native_id())) == max(own, 5)
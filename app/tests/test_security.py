@@ -0,0 +1,58 @@
+### tests/test_security.py
+import pytest
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import event
+from core.exceptions import AuthError
+from database.models import Company, Employee
+from modules.employees.employees_services import EmployeeService
+from utils.security import create_access_token, employee_cache, get_current_employee
+
+def bearer(employee_id: str) -> HTTPAuthorizationCredentials:
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=create_access_token({"sub": employee_id}))
+
+def test_authenticated_employee_is_cached_until_invalidated(session_factory):
+    employee_cache.clear()
+    db = session_factory()
+    db.add(Company(id="comp0001", company_name="Acme", domain="acme.test"))
+    db.add(Employee(id="empl0001", company_id="comp0001", name="Admin", email="admin@acme.test", password_hash="x", role="admin"))
+    db.add(Employee(id="empl0002", company_id="comp0001", name="Analyst", email="analyst@acme.test", password_hash="x", role="analyst"))
+    db.commit()
+    db.close()
+
+    statements = []
+    db = session_factory()
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    get_current_employee(bearer("empl0002"), db)
+    assert get_current_employee(bearer("empl0002"), db).role == "analyst"
+    assert len([sql for sql in statements if sql.startswith("SELECT")]) == 1
+
+    # Cached copies are attached to the request session, so services can use them like loaded rows
+    admin = get_current_employee(bearer("empl0001"), db)
+    admin = get_current_employee(bearer("empl0001"), db)
+    EmployeeService(db).deactivate_employee("empl0002", admin)
+    db.close()
+
+    db = session_factory()
+    with pytest.raises(AuthError):
+        get_current_employee(bearer("empl0002"), db)
+    db.close()
+
+def test_read_that_raced_an_invalidation_is_not_cached():
+    employee_cache.clear()
+    stale = Employee(id="empl0001", company_id="comp0001", name="Admin", email="admin@acme.test", password_hash="x", role="admin", is_active=True)
+
+    # A request read the row, then deactivate_employee committed and invalidated before the request cached it
+    generation = employee_cache.generation("empl0001")
+    employee_cache.invalidate("empl0001")
+    employee_cache.put(stale, generation)
+    assert employee_cache.get("empl0001") is None
+
+    # Same after a company-wide clear()
+    generation = employee_cache.generation("empl0001")
+    employee_cache.clear()
+    employee_cache.put(stale, generation)
+    assert employee_cache.get("empl0001") is None
+
+    employee_cache.put(stale, employee_cache.generation("empl0001"))
+    assert employee_cache.get("empl0001").is_active
+    employee_cache.clear()
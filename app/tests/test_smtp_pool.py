@@ -0,0 +1,67 @@
+### tests/test_smtp_pool.py
+import pytest
+from email.message import EmailMessage
+from aiosmtpd.controller import Controller
+from utils.smtp_pool import SMTPConnectionPool, DeliveryUncertainError
+from conftest import free_port
+
+def make_message(to_email: str) -> EmailMessage:
+    msg = EmailMessage()
+    msg["From"] = "sender@example.com"
+    msg["To"] = to_email
+    msg["Subject"] = "Pool test"
+    msg.set_content("hello")
+    return msg
+
+def test_pool_reuses_sessions(smtp_server):
+    controller, handler = smtp_server
+    pool = SMTPConnectionPool(controller.hostname, controller.port, size=2)
+
+    for i in range(10):
+        pool.send_message(make_message(f"user{i}@example.com"))
+
+    assert len(handler.messages) == 10
+    assert pool.connections_opened == 1
+    pool.close()
+
+def test_pool_reconnects_after_server_disconnect(smtp_server):
+    controller, handler = smtp_server
+    pool = SMTPConnectionPool(controller.hostname, controller.port, size=1)
+    pool.send_message(make_message("first@example.com"))
+
+    # Simulate the server dropping the idle session
+    idle = pool._idle.get_nowait()
+    idle.server.close()
+    pool._idle.put(idle)
+    pool.health_check_after = 0
+
+    pool.send_message(make_message("second@example.com"))
+
+    assert len(handler.messages) == 2
+    assert pool.connections_opened == 2
+    pool.close()
+
+class HangUpAfterDataHandler:
+    """Takes the message, then drops the connection before replying"""
+
+    def __init__(self):
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        server.transport.close()
+        return "250 Message accepted for delivery"
+
+def test_pool_does_not_resend_after_data_was_sent():
+    handler = HangUpAfterDataHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    pool = SMTPConnectionPool(controller.hostname, controller.port, size=1)
+
+    with pytest.raises(DeliveryUncertainError):
+        pool.send_message(make_message("once@example.com"))
+
+    assert len(handler.messages) == 1
+    assert pool.reconnects == 0
+    pool.close()
+    controller.stop()
@@ -0,0 +1,87 @@
+### tests/test_tracking.py
+import asyncio
+import pytest
+from datetime import datetime
+from database.models import Company, CampaignRecipient, CampaignEvent, CampaignEventRollup, EVENT_OPEN
+from modules.tracking.buffer import TrackingEventBuffer
+from core.exceptions import NotFoundError
+from modules.tracking.services import TrackingService
+from test_campaigns_worker import seed_campaign
+
+def test_buffer_flushes_events_in_batches_and_counts_drops(session_factory):
+    db = session_factory()
+    seed_campaign(db, recipient_count=3)
+    db.query(CampaignRecipient).update({"status": "sent"})
+    db.commit()
+    db.close()
+
+    buffer = TrackingEventBuffer(session_factory, max_events=4, flush_interval_ms=20, batch_size=10)
+
+    async def hit_pixels():
+        buffer.start()
+        buffer.record_open("camp0001", "rcpt0000", user_agent="Mail/1.0", ip_address="10.0.0.1")
+        buffer.record_open("camp0001", "rcpt0000")
+        buffer.record_click("camp0001", "rcpt0001", "https://example.com")
+        buffer.record_open("camp0001", "unknown1")
+        buffer.record_open("camp0001", "rcpt0002")
+        await buffer.stop()
+
+    asyncio.run(hit_pixels())
+
+    # The fifth hit did not fit in the queue, the unknown recipient was not written
+    assert (buffer.enqueued, buffer.dropped, buffer.flushed, buffer.discarded) == (4, 1, 3, 1)
+    db = session_factory()
+    statuses = {r.id: (r.status, r.opened_at is not None) for r in db.query(CampaignRecipient).all()}
+    assert statuses == {"rcpt0000": ("opened", True), "rcpt0001": ("clicked", True), "rcpt0002": ("sent", False)}
+    # Repeat opens are kept in the event log, with their client details
+    events = db.query(CampaignEvent).filter(CampaignEvent.recipient_id == "rcpt0000").all()
+    assert [(e.user_agent, e.ip_address) for e in events] == [("Mail/1.0", "10.0.0.1"), (None, None)]
+    db.close()
+
+def test_rollups_accumulate_across_flushes(session_factory):
+    def opens(*minutes):
+        return [
+            {"event_type": EVENT_OPEN, "campaign_id": "camp0001", "recipient_id": "rcpt0000", "occurred_at": datetime(2025, 1, 1, 9, minute, 30)}
+            for minute in minutes
+        ]
+
+    db = session_factory()
+    seed_campaign(db, recipient_count=1)
+    service = TrackingService(db)
+    service.record_events(opens(5, 5, 40))
+    service.record_events(opens(5))
+
+    assert [(b["bucket_start"].minute, b["opens"]) for b in service.get_timeline("camp0001", "comp0001", "minute")] == [(5, 3), (40, 1)]
+    assert [(b["bucket_start"].hour, b["opens"], b["clicks"]) for b in service.get_timeline("camp0001", "comp0001", "hour")] == [(9, 4, 0)]
+    db.close()
+
+def test_events_for_unknown_recipients_are_dropped(session_factory):
+    db = session_factory()
+    seed_campaign(db, recipient_count=1)
+    service = TrackingService(db)
+    now = datetime.utcnow()
+    written = service.record_events([
+        {"event_type": EVENT_OPEN, "campaign_id": "camp0001", "recipient_id": "rcpt0000", "occurred_at": now},
+        # Real recipient, wrong campaign, and a made-up recipient
+        {"event_type": EVENT_OPEN, "campaign_id": "camp9999", "recipient_id": "rcpt0000", "occurred_at": now},
+        {"event_type": EVENT_OPEN, "campaign_id": "camp0001", "recipient_id": "forged01", "occurred_at": now},
+    ])
+
+    assert written == 1
+    assert [(e.campaign_id, e.recipient_id) for e in db.query(CampaignEvent).all()] == [("camp0001", "rcpt0000")]
+    assert {r.campaign_id for r in db.query(CampaignEventRollup).all()} == {"camp0001"}
+    db.close()
+
+def test_other_companies_cannot_read_campaign_events(session_factory):
+    db = session_factory()
+    seed_campaign(db, recipient_count=1)
+    db.add(Company(id="comp0002", company_name="Other", domain="other.test"))
+    db.commit()
+    service = TrackingService(db)
+
+    assert service.get_tracking_events("camp0001", "comp0001") == []
+    with pytest.raises(NotFoundError):
+        service.get_tracking_events("camp0001", "comp0002")
+    with pytest.raises(NotFoundError):
+        service.get_timeline("camp0001", "comp0002")
+    db.close()
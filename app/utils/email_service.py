@@ -82,14 +82,23 @@
 
 ### utils/email_service.py
 import os
-import ssl
+import time
 import smtplib
 import asyncio
 import socket
+from concurrent.futures import ThreadPoolExecutor
 from email.message import EmailMessage
-from typing import List
-from core.exceptions import EmailSendError
+from collections import OrderedDict
+from typing import Awaitable, Callable, Iterable, List, Optional, Union
+from core.config import settings
+from core.exceptions import EmailSendError, SMTPUnavailableError
 from core.logger import logger
+from utils.rate_limiter import TokenBucket
+from utils.smtp_pool import SMTPConnectionPool
+from utils.message_template import MessageTemplate, HTML_TAG_RE, render_html, tracking_pixel
+
+# Compiled campaign messages kept per EmailService
+TEMPLATE_CACHE_SIZE = 32
 
 class EmailService:
     def __init__(self):
@@ -103,31 +112,208 @@ class EmailService:
             {"host": "smtp.gmail.com", "port": 465, "use_ssl": True},  # SSL
             {"host": "smtp.gmail.com", "port": 25, "use_tls": True},   # Alternative
         ]
+        
+        # One pool of authenticated sessions per SMTP server
+        self._pools = {}
+        
+        # Blocking smtplib calls run here instead of on the event loop
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(settings.EMAIL_SEND_WORKERS, 1),
+            thread_name_prefix="smtp-send"
+        )
+        
+        # One token bucket per (sender account, SMTP provider)
+        self._rate_limiters = {}
+        
+        # Known-good transport cache and per-config circuit breaker state
+        self._active_config = None
+        self._active_config_verified_at = 0.0
+        self._config_failures = {}  # (host, port) -> (consecutive failures, retry not before)
+        
+        # (campaign_id, subject, body) -> MessageTemplate, least recently used first
+        self._templates = OrderedDict()
+    
+    def _get_pool(self, config) -> SMTPConnectionPool:
+        """Get (or lazily create) the connection pool for an SMTP configuration"""
+        key = (config["host"], config["port"])
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = SMTPConnectionPool(
+                host=config["host"],
+                port=config["port"],
+                username=self.EMAIL_USER,
+                password=self.EMAIL_PASS,
+                use_tls=config.get("use_tls", False),
+                use_ssl=config.get("use_ssl", False),
+                size=settings.SMTP_POOL_SIZE,
+                health_check_after=settings.SMTP_POOL_HEALTH_CHECK_SECONDS,
+                max_messages_per_connection=settings.SMTP_MAX_MESSAGES_PER_CONNECTION
+            )
+            self._pools[key] = pool
+        return pool
+    
+    def _get_rate_limiter(self, config) -> TokenBucket:
+        """Get the rate limiter shared by every send from this account to this provider"""
+        key = (self.EMAIL_USER, config["host"])
+        limiter = self._rate_limiters.get(key)
+        if limiter is None:
+            limiter = TokenBucket(
+                rate=settings.EMAIL_RATE_LIMIT_PER_SECOND,
+                capacity=settings.EMAIL_RATE_LIMIT_BURST
+            )
+            self._rate_limiters[key] = limiter
+        return limiter
+    
+    def close(self):
+        """Log out of all pooled SMTP sessions and stop the send threads"""
+        for pool in self._pools.values():
+            pool.close()
+        self._pools = {}
+        self._executor.shutdown(wait=True)
     
     async def _test_smtp_connection(self, config):
         """Test SMTP connection with given configuration"""
         try:
-            if config.get("use_ssl"):
-                server = smtplib.SMTP_SSL(config["host"], config["port"], timeout=10)
-            else:
-                server = smtplib.SMTP(config["host"], config["port"], timeout=10)
-                if config.get("use_tls"):
-                    server.starttls()
-            
-            server.login(self.EMAIL_USER, self.EMAIL_PASS)
-            server.quit()
-            return True
+            # The probe session stays in the pool and is reused for sending
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._get_pool(config).check)
         except Exception as e:
             logger.warning(f"SMTP config {config} failed: {str(e)}")
             return False
     
     async def _get_working_smtp_config(self):
-        """Find a working SMTP configuration"""
+        """Return the cached working SMTP configuration, probing the list only when needed"""
+        now = time.monotonic()
+        if (
+            self._active_config is not None
+            and now - self._active_config_verified_at < settings.SMTP_CONFIG_CACHE_TTL_SECONDS
+        ):
+            return self._active_config
+        
+        # Probe in list order, skipping configs whose circuit is still open
         for config in self.smtp_configs:
+            _, retry_at = self._config_failures.get((config["host"], config["port"]), (0, 0.0))
+            if retry_at > now:
+                continue
+            
             if await self._test_smtp_connection(config):
+                self._active_config = config
+                self._active_config_verified_at = time.monotonic()
+                self._config_failures.pop((config["host"], config["port"]), None)
                 return config
+            
+            self._mark_config_failed(config)
         return None
     
+    def _mark_config_failed(self, config):
+        """Open the circuit for a config with exponential backoff and drop it from the cache"""
+        key = (config["host"], config["port"])
+        failures = self._config_failures.get(key, (0, 0.0))[0] + 1
+        backoff = min(
+            settings.SMTP_FAILOVER_BACKOFF_SECONDS * 2 ** (failures - 1),
+            settings.SMTP_FAILOVER_MAX_BACKOFF_SECONDS
+        )
+        self._config_failures[key] = (failures, time.monotonic() + backoff)
+        
+        if self._active_config is config:
+            self._active_config = None
+        
+        logger.warning(f"SMTP config {config} unavailable after {failures} consecutive failure(s), retrying in {backoff}s")
+    
+    @staticmethod
+    def _is_transport_error(error: Exception) -> bool:
+        """
+        True for connection/session failures before the message went out, False
+        when only this message was rejected. DeliveryUncertainError (the session
+        broke after DATA) is not one either: failing over could send it twice.
+        """
+        if isinstance(error, (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError)):
+            return False
+        # smtplib.SMTPException is a subclass of OSError
+        return isinstance(error, OSError)
+    
+    async def _deliver(self, msg: Union[EmailMessage, bytes], to_email: str = None) -> dict:
+        """
+        Send a message on the known-good transport, failing over once if it breaks
+        before the message data was sent; SMTPUnavailableError if no transport
+        is left or the failover breaks as well. Pre-rendered bytes from a MessageTemplate also need the to_email envelope address.
+        """
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            smtp_config = await self._get_working_smtp_config()
+            if not smtp_config:
+                raise SMTPUnavailableError()
+            
+            # Respect the provider rate limit, then send off the event loop
+            await self._get_rate_limiter(smtp_config).acquire()
+            try:
+                pool = self._get_pool(smtp_config)
+                if isinstance(msg, bytes):
+                    await loop.run_in_executor(self._executor, pool.sendmail, self.EMAIL_USER, [to_email], msg)
+                else:
+                    await loop.run_in_executor(self._executor, pool.send_message, msg)
+                return smtp_config
+            except Exception as e:
+                if not self._is_transport_error(e):
+                    raise
+                self._mark_config_failed(smtp_config)
+                if attempt:
+                    # The failover transport broke too: an outage, not a problem with this recipient
+                    raise SMTPUnavailableError() from e
+    
+    def _build_message(
+        self,
+        to_email: str,
+        subject: str,
+        body: str,
+        campaign_id: str = None,
+        recipient_id: str = None
+    ) -> EmailMessage:
+        """Build the multipart (plain text + HTML with tracking pixel) message"""
+        msg = EmailMessage()
+        msg["From"] = self.EMAIL_USER  # Use the Gmail account as sender
+        msg["To"] = to_email
+        msg["Subject"] = subject
+        
+        # Add tracking pixel to HTML body if campaign tracking is needed
+        pixel = ""
+        if campaign_id and recipient_id:
+            pixel = tracking_pixel(campaign_id, recipient_id)
+        
+        # Set plain text content (fallback)
+        # Strip HTML tags for plain text version
+        msg.set_content(HTML_TAG_RE.sub('', body))
+        
+        # Add HTML version with tracking
+        msg.add_alternative(render_html(body, pixel), subtype="html")
+        return msg
+    
+    def _get_template(self, subject: str, body: str, campaign_id: str = None) -> MessageTemplate:
+        """Get (or compile) the message template for a campaign's content"""
+        key = (campaign_id, subject, body)
+        template = self._templates.get(key)
+        if template is None:
+            template = MessageTemplate(self.EMAIL_USER, subject, body, campaign_id)
+            self._templates[key] = template
+            if len(self._templates) > TEMPLATE_CACHE_SIZE:
+                self._templates.popitem(last=False)
+        else:
+            self._templates.move_to_end(key)
+        return template
+    
+    def _render_message(
+        self,
+        to_email: str,
+        subject: str,
+        body: str,
+        campaign_id: str = None,
+        recipient_id: str = None
+    ) -> Union[EmailMessage, bytes]:
+        """Serialized message from the campaign template, or a full build for unusual addresses"""
+        if MessageTemplate.can_render(to_email):
+            return self._get_template(subject, body, campaign_id).render(to_email, recipient_id)
+        return self._build_message(to_email, subject, body, campaign_id, recipient_id)
+    
     async def send_email(
         self,
         to_email: str,
@@ -139,69 +325,17 @@ class EmailService:
     ) -> bool:
         """Send email with tracking pixels using Gmail SMTP"""
         try:
-            # Test DNS resolution first
-            try:
-                socket.gethostbyname('smtp.gmail.com')
-            except socket.gaierror as e:
-                logger.error(f"DNS resolution failed for smtp.gmail.com: {str(e)}")
-                raise EmailSendError(f"DNS resolution failed: {str(e)}")
-            
-            # Get working SMTP configuration
-            smtp_config = await self._get_working_smtp_config()
-            if not smtp_config:
-                raise EmailSendError("No working SMTP configuration found")
-            
-            # Create email message
-            msg = EmailMessage()
-            msg["From"] = self.EMAIL_USER  # Use the Gmail account as sender
-            msg["To"] = to_email
-            msg["Subject"] = subject
+            msg = self._render_message(to_email, subject, body, campaign_id, recipient_id)
             
-            # Add tracking pixel to HTML body if campaign tracking is needed
-            tracking_pixel = ""
-            if campaign_id and recipient_id:
-                tracking_pixel = f'<img src="https://5c7nhw22-8000.inc1.devtunnels.ms/api/campaigns/tracking/open/{campaign_id}/{recipient_id}" width="1" height="1" style="display:none;">'
-            
-            # Create HTML version with tracking
-            html_body = f"""
-            <!doctype html>
-            <html>
-                <body style="font-family: system-ui, -apple-system, sans-serif;">
-                    {body}
-                    {tracking_pixel}
-                </body>
-            </html>
-            """
-            
-            # Set plain text content (fallback)
-            # Strip HTML tags for plain text version
-            import re
-            plain_text = re.sub('<[^<]+?>', '', body)
-            msg.set_content(plain_text)
-            
-            # Add HTML version
-            msg.add_alternative(html_body, subtype="html")
-            
-            # Send email using the working SMTP configuration
-            if smtp_config.get("use_ssl"):
-                with smtplib.SMTP_SSL(
-                    smtp_config["host"], 
-                    smtp_config["port"], 
-                    context=ssl.create_default_context(),
-                    timeout=30
-                ) as server:
-                    server.login(self.EMAIL_USER, self.EMAIL_PASS)
-                    server.send_message(msg)
-            else:
-                with smtplib.SMTP(smtp_config["host"], smtp_config["port"], timeout=30) as server:
-                    if smtp_config.get("use_tls"):
-                        server.starttls(context=ssl.create_default_context())
-                    server.login(self.EMAIL_USER, self.EMAIL_PASS)
-                    server.send_message(msg)
+            # Send email on a pooled session of the cached working SMTP configuration
+            smtp_config = await self._deliver(msg, to_email)
             
             logger.info(f"Email sent successfully to {to_email} using {smtp_config['host']}:{smtp_config['port']}")
             return True
             
+        except SMTPUnavailableError:
+            logger.error(f"Failed to send email to {to_email}: no working SMTP configuration")
+            raise
         except socket.gaierror as e:
             error_msg = f"DNS resolution failed: {str(e)}"
             logger.error(f"Failed to send email to {to_email}: {error_msg}")
@@ -225,56 +359,99 @@ class EmailService:
     
     async def send_bulk_emails(
         self,
-        recipients: List[dict],
+        recipients: Iterable[dict],
         subject: str,
         body: str,
         sender_email: str,
-        campaign_id: int
+        campaign_id: int,
+        checkpoint: Optional[Callable[[List[dict]], Awaitable[None]]] = None,
+        checkpoint_size: int = 20
     ) -> dict:
-        """Send emails to multiple recipients"""
-        results = {"sent": 0, "failed": 0, "errors": []}
+        """
+        Send emails to multiple recipients using EMAIL_SEND_WORKERS concurrent workers.
+        recipients may be any iterable (e.g. a generator) and is consumed once.
+        Each recipient gets one {"recipient_id", "email", "status", "error"} result,
+        with status "sent" or "failed". Without a checkpoint they are collected in
+        results["recipient_results"]; with one, checkpoint is awaited with each run of
+        checkpoint_size new results (and the remainder at the end) and they are not kept.
         
-        # Test connectivity first
-        try:
-            working_config = await self._get_working_smtp_config()
-            if not working_config:
-                logger.error("No working SMTP configuration available")
-                results["errors"].append("SMTP service unavailable")
-                results["failed"] = len(recipients)
-                return results
-        except Exception as e:
-            logger.error(f"SMTP connectivity test failed: {str(e)}")
-            results["errors"].append(f"SMTP connectivity failed: {str(e)}")
-            results["failed"] = len(recipients)
-            return results
+        If no SMTP configuration is reachable (every circuit open), the results so
+        far are checkpointed and SMTPUnavailableError is raised. Recipients without
+        a result were not sent and should be retried later, not marked failed.
+        """
+        results = {"sent": 0, "failed": 0, "errors": [], "recipient_results": []}
+        unsaved = results["recipient_results"] if checkpoint is None else []
         
-        # Add small delay between emails to avoid rate limiting
-        for i, recipient in enumerate(recipients):
-            try:
-                success = await self.send_email(
-                    to_email=recipient["email"],
-                    subject=subject,
-                    body=body,
-                    sender_email=sender_email,
-                    campaign_id=campaign_id,
-                    recipient_id=recipient["recipient_id"]
-                )
-                if success:
+        def record(recipient: dict, error: str = None):
+            unsaved.append({
+                "recipient_id": recipient["recipient_id"],
+                "email": recipient["email"],
+                "status": "failed" if error else "sent",
+                "error": error
+            })
+        
+        async def flush(force: bool = False):
+            if checkpoint and unsaved and (force or len(unsaved) >= checkpoint_size):
+                chunk = unsaved[:]
+                del unsaved[:]
+                await checkpoint(chunk)
+        
+        # Test connectivity first; an outage is not the recipients' fault
+        if not await self._get_working_smtp_config():
+            logger.error("No working SMTP configuration available")
+            raise SMTPUnavailableError()
+        
+        pending = iter(recipients)
+        unavailable = []
+        
+        async def worker():
+            # Workers share one iterator, so each recipient is sent exactly once
+            for recipient in pending:
+                if unavailable:
+                    break
+                try:
+                    msg = self._render_message(
+                        to_email=recipient["email"],
+                        subject=subject,
+                        body=body,
+                        campaign_id=campaign_id,
+                        recipient_id=recipient["recipient_id"]
+                    )
+                    # Reuses the pooled sessions opened by the connectivity test above
+                    smtp_config = await self._deliver(msg, recipient["email"])
                     results["sent"] += 1
-                
-                # Add delay between emails (Gmail has rate limits)
-                if i < len(recipients) - 1:  # Don't delay after the last email
-                    await asyncio.sleep(2)  # Increased to 2 seconds delay
+                    record(recipient)
+                    logger.info(f"Email sent successfully to {recipient['email']} using {smtp_config['host']}:{smtp_config['port']}")
                     
-            except Exception as e:
-                results["failed"] += 1
-                error_msg = f"{recipient['email']}: {str(e)}"
-                results["errors"].append(error_msg)
-                logger.error(f"Failed to send to {recipient['email']}: {str(e)}")
+                except SMTPUnavailableError as e:
+                    # Every transport went down mid-send: stop, leaving this recipient unsent
+                    unavailable.append(e)
+                    break
+                except Exception as e:
+                    results["failed"] += 1
+                    error_msg = f"{recipient['email']}: {str(e)}"
+                    results["errors"].append(error_msg)
+                    record(recipient, str(e))
+                    logger.error(f"Failed to send to {recipient['email']}: {str(e)}")
+                    
+                    # Continue with next email even if one fails
                 
-                # Continue with next email even if one fails
-                continue
+                await flush()
         
+        tasks = [asyncio.create_task(worker()) for _ in range(max(settings.EMAIL_SEND_WORKERS, 1))]
+        done, running = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        if running:
+            # A worker failed (e.g. its checkpoint could not be saved): stop the others
+            # sending, since nothing would record their results
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+        for task in done:
+            if task.exception():
+                raise task.exception()
+        await flush(force=True)
+        if unavailable:
+            raise unavailable[0]
         return results
     
     async def send_test_email(self, to_email: str) -> bool:
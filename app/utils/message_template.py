@@ -0,0 +1,93 @@
+### utils/message_template.py
+import re
+import uuid
+from email import policy, quoprimime
+from email.message import EmailMessage
+
+TRACKING_OPEN_URL = "https://5c7nhw22-8000.inc1.devtunnels.ms/api/campaigns/tracking/open/{campaign_id}/{recipient_id}"
+
+# Strips HTML tags for the plain text alternative
+HTML_TAG_RE = re.compile('<[^<]+?>')
+
+
+def render_html(body: str, tracking_pixel: str = "") -> str:
+    """Wrap the campaign body in the HTML document that carries the tracking pixel"""
+    return f"""
+        <!doctype html>
+        <html>
+            <body style="font-family: system-ui, -apple-system, sans-serif;">
+                {body}
+                {tracking_pixel}
+            </body>
+        </html>
+        """
+
+
+def tracking_pixel(campaign_id: str, recipient_id: str) -> str:
+    url = TRACKING_OPEN_URL.format(campaign_id=campaign_id, recipient_id=recipient_id)
+    return f'<img src="{url}" width="1" height="1" style="display:none;">'
+
+
+def _qp(text: str) -> bytes:
+    """Quoted-printable encode UTF-8 text with CRLF line endings"""
+    return quoprimime.body_encode(text.encode("utf-8").decode("latin-1"), eol="\r\n").encode("ascii")
+
+
+class MessageTemplate:
+    """
+    A campaign message serialized once, split around its per-recipient fields.
+
+    render() only joins pre-encoded byte segments with the recipient's
+    address and quoted-printable tracking pixel line, so a bulk send does
+    not rebuild, re-encode or re-serialize the message for every recipient.
+    """
+
+    def __init__(self, sender: str, subject: str, body: str, campaign_id: str = None):
+        self.sender = sender
+        self.campaign_id = campaign_id
+
+        # Unique markers, replaced by the real To address and HTML body after serializing
+        to_marker = f"to-{uuid.uuid4().hex}@template.invalid"
+        html_marker = f"html{uuid.uuid4().hex}"
+
+        msg = EmailMessage(policy=policy.SMTP)
+        msg["From"] = sender
+        msg["To"] = to_marker
+        msg["Subject"] = subject
+        msg.set_content(HTML_TAG_RE.sub('', body))
+        msg.add_alternative(html_marker, subtype="html", charset="utf-8", cte="quoted-printable")
+        raw = msg.as_bytes()
+
+        head, rest = raw.split(to_marker.encode("ascii"))
+        middle, tail = rest.split(html_marker.encode("ascii"))
+        self._head = head
+        self._middle = middle
+
+        # The pixel sits on its own line, so the HTML splits cleanly at line boundaries
+        pixel_marker = "\x00pixel\x00"
+        before, after = render_html(body, pixel_marker).split(pixel_marker)
+        self._pixel_indent = before[before.rfind("\n") + 1:]
+        self._html_before = _qp(before[:len(before) - len(self._pixel_indent)])
+        self._html_after_line = after[:after.find("\n") + 1]
+        self._html_after = _qp(after[len(self._html_after_line):])
+        self._end = tail
+
+    def render(self, to_email: str, recipient_id: str = None) -> bytes:
+        """Serialized message for one recipient"""
+        pixel = ""
+        if self.campaign_id and recipient_id:
+            pixel = tracking_pixel(self.campaign_id, recipient_id)
+        return b"".join((
+            self._head,
+            to_email.encode("ascii"),
+            self._middle,
+            self._html_before,
+            _qp(self._pixel_indent + pixel + self._html_after_line),
+            self._html_after,
+            self._end
+        ))
+
+    @staticmethod
+    def can_render(to_email: str) -> bool:
+        """Addresses that can be spliced into the To header as-is"""
+        return to_email.isascii() and not any(c in to_email for c in "\r\n,;\"")
@@ -0,0 +1,69 @@
+### utils/pagination.py
+import json
+import base64
+from datetime import datetime
+from typing import Any, List, NamedTuple, Optional
+from sqlalchemy import and_, or_, literal
+from core.exceptions import ValidationError
+
+class Page(NamedTuple):
+    items: List[Any]
+    next_cursor: Optional[str] = None  # None on the last page
+    total: Optional[int] = None  # only when requested; costs a COUNT
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    """Opaque cursor pointing just past a row in (created_at, id) descending order"""
+    raw = json.dumps([created_at.isoformat(), row_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), str(row_id)
+    except (ValueError, TypeError):
+        raise ValidationError("Invalid cursor")
+
+def cursor_filter(created_column, id_column, cursor: str, dialect_name: str):
+    """WHERE clause selecting the rows after `cursor` in (created_at, id) descending order"""
+    created_at, row_id = decode_cursor(cursor)
+    if dialect_name == "sqlite":
+        # SQLite keeps timestamps as text and server_default=now() writes them
+        # without fractional seconds; a bound datetime always has them, so it
+        # would never compare equal to those rows
+        created_at = literal(created_at.isoformat(sep=" ", timespec="microseconds" if created_at.microsecond else "seconds"))
+    return or_(
+        created_column < created_at,
+        and_(created_column == created_at, id_column < row_id)
+    )
+
+def keyset_paginate(query, created_column, id_column, cursor: Optional[str] = None, limit: int = 100, skip: int = 0, include_total: bool = False) -> Page:
+    """
+    Newest-first page of `query` ordered by (created_column, id_column).
+
+    With a cursor each page is one index range scan, however deep. `skip` is
+    only honoured without a cursor, for clients still paging by offset.
+    """
+    total = query.order_by(None).count() if include_total else None
+
+    if cursor:
+        query = query.filter(cursor_filter(created_column, id_column, cursor, query.session.get_bind().dialect.name))
+
+    query = query.order_by(created_column.desc(), id_column.desc())
+    if skip and not cursor:
+        query = query.offset(skip)
+    rows = query.limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, created_column.key), getattr(last, id_column.key))
+    return Page(rows, next_cursor, total)
+
+def set_page_headers(response, page: Page):
+    """Expose cursor and total of a list endpoint without changing its body"""
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    if page.total is not None:
+        response.headers["X-Total-Count"] = str(page.total)
@@ -0,0 +1,116 @@
+### utils/password_hasher.py
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+from core.exceptions import ServiceBusyError
+
+# bcrypt only looks at the first 72 bytes of a password
+BCRYPT_MAX_PASSWORD_BYTES = 72
+
+
+def _lower_thread_priority(niceness: int):
+    """
+    Let request threads preempt bcrypt. On Linux each thread has its own nice
+    value; elsewhere the hashing threads keep the process priority.
+    """
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), niceness)
+    except (AttributeError, OSError):
+        pass
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a small dedicated thread pool (bcrypt releases the GIL).
+
+    Callers block until their hash is done, but at most `workers` hashes run
+    at once, so a login burst can't take every CPU core or every request
+    thread. Once `max_queued` calls are waiting for a free worker (calls
+    being hashed don't count), new ones fail fast with ServiceBusyError
+    instead of piling up. With `niceness` > 0 the hashing threads run at a
+    lower scheduling priority than the request threads.
+    """
+
+    def __init__(self, workers: int, rounds: int, max_queued: int, niceness: int = 0):
+        self.rounds = rounds
+        self.max_queued = max_queued
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="password-hasher",
+            initializer=_lower_thread_priority if niceness else None,
+            initargs=(niceness,) if niceness else ()
+        )
+        self._workers = workers
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def hash(self, password: str) -> str:
+        return self._run(self._hash, password)
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        return self._run(self._verify, password, hashed_password)
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """True if the hash was made with a different cost factor than `rounds`"""
+        try:
+            return int(hashed_password.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self._workers,
+                "rounds": self.rounds,
+                "queued": self._pending - self._running,
+                "running": self._running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_wait_ms": round(self.total_wait_seconds / self.completed * 1000, 2) if self.completed else 0.0,
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 2)
+            }
+
+    def _run(self, function, *args):
+        with self._lock:
+            # Calls beyond the workers are the ones waiting in the queue
+            if self._pending - self._workers >= self.max_queued:
+                self.rejected += 1
+                raise ServiceBusyError("Too many concurrent sign-ins, retry shortly")
+            self._pending += 1
+        try:
+            return self._executor.submit(self._timed, time.monotonic(), function, *args).result()
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _timed(self, queued_at: float, function, *args):
+        waited = time.monotonic() - queued_at
+        with self._lock:
+            self._running += 1
+            self.total_wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        try:
+            return function(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self.completed += 1
+
+    def _hash(self, password: str) -> str:
+        secret = password.encode("utf-8")[:BCRYPT_MAX_PASSWORD_BYTES]
+        return bcrypt.hashpw(secret, bcrypt.gensalt(rounds=self.rounds)).decode("ascii")
+
+    def _verify(self, password: str, hashed_password: str) -> bool:
+        secret = password.encode("utf-8")[:BCRYPT_MAX_PASSWORD_BYTES]
+        try:
+            return bcrypt.checkpw(secret, hashed_password.encode("ascii"))
+        except ValueError:
+            # Not a bcrypt hash
+            return False
@@ -1,25 +1,33 @@
 
 ### utils/security.py
+import time
+import threading
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, make_transient_to_detached
 from core.config import settings
 from core.exceptions import AuthError
 from database.connection import get_db
 from database.models import Employee
+from utils.password_hasher import PasswordHasher
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+password_hasher = PasswordHasher(
+    settings.PASSWORD_HASH_WORKERS,
+    settings.BCRYPT_ROUNDS,
+    settings.PASSWORD_HASH_MAX_QUEUED,
+    settings.PASSWORD_HASH_THREAD_NICENESS
+)
 security = HTTPBearer()
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_hasher.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return password_hasher.hash(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -41,17 +49,88 @@ def verify_token(token: str) -> dict:
     except JWTError:
         raise AuthError("Invalid token")
 
-async def get_current_employee(
+class EmployeeCache:
+    """
+    Bounded LRU of authenticated employees with a short TTL, so polling
+    clients don't cost a SELECT per request. Entries are detached column
+    snapshots; services that change an employee invalidate them, and the TTL
+    bounds staleness across processes.
+
+    Invalidation bumps a per-employee generation. Callers take generation()
+    before reading the row and pass it to put(), so a read that raced with a
+    committed change is not cached after that change's invalidate().
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # employee_id -> (snapshot, expires at), least recently used first
+        self._generations = {}  # employee_id -> invalidations so far
+        self._epoch = 0  # clear() calls so far
+        self._lock = threading.Lock()
+
+    def get(self, employee_id: str) -> Optional[Employee]:
+        with self._lock:
+            entry = self._entries.get(employee_id)
+            if entry is None or entry[1] <= time.monotonic():
+                self._entries.pop(employee_id, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(employee_id)
+            self.hits += 1
+            return entry[0]
+
+    def generation(self, employee_id: str) -> tuple:
+        with self._lock:
+            return (self._epoch, self._generations.get(employee_id, 0))
+
+    def put(self, employee: Employee, generation: tuple):
+        """Cache employee unless it was invalidated since `generation` was taken"""
+        if self.max_size <= 0:
+            return
+        snapshot = Employee(**{column.key: getattr(employee, column.key) for column in Employee.__table__.columns})
+        make_transient_to_detached(snapshot)
+        with self._lock:
+            if (self._epoch, self._generations.get(employee.id, 0)) != generation:
+                return
+            self._entries[employee.id] = (snapshot, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(employee.id)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, employee_id: str):
+        with self._lock:
+            self._entries.pop(employee_id, None)
+            self._generations[employee_id] = self._generations.get(employee_id, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+            self._epoch += 1
+
+employee_cache = EmployeeCache(settings.EMPLOYEE_CACHE_SIZE, settings.EMPLOYEE_CACHE_TTL_SECONDS)
+
+def get_current_employee(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
 ) -> Employee:
     token = credentials.credentials
     token_data = verify_token(token)
+    cached = employee_cache.get(token_data["employee_id"])
+    if cached is not None:
+        # Attach a copy to this request's session without querying
+        return db.merge(cached, load=False)
+    # Taken before the read: an invalidation while we read means the row may be stale
+    generation = employee_cache.generation(token_data["employee_id"])
     employee = db.query(Employee).filter(Employee.id == token_data["employee_id"]).first()
     if employee is None:
         raise AuthError("Employee not found")
     if not employee.is_active:
         raise AuthError("Inactive employee")
+    employee_cache.put(employee, generation)
     return employee
 
 def require_role(allowed_roles: list):
@@ -0,0 +1,229 @@
+### utils/smtp_pool.py
+import ssl
+import time
+import smtplib
+import threading
+from contextlib import contextmanager
+from queue import LifoQueue, Empty
+from core.logger import logger
+
+
+class DeliveryUncertainError(Exception):
+    """The session broke after the message data went out; the server may have accepted it"""
+
+
+class _DataTrackingMixin:
+    """Remembers whether the current transaction got as far as DATA"""
+
+    data_started = False
+
+    def mail(self, *args, **kwargs):
+        self.data_started = False
+        return super().mail(*args, **kwargs)
+
+    def data(self, msg):
+        self.data_started = True
+        return super().data(msg)
+
+
+class _SMTP(_DataTrackingMixin, smtplib.SMTP):
+    pass
+
+
+class _SMTP_SSL(_DataTrackingMixin, smtplib.SMTP_SSL):
+    pass
+
+
+class PooledConnection:
+    """An authenticated SMTP session plus the bookkeeping the pool needs"""
+
+    def __init__(self, server: smtplib.SMTP):
+        self.server = server
+        self.messages_sent = 0
+        self.last_used = time.monotonic()
+
+
+class SMTPConnectionPool:
+    """
+    Keeps up to `size` authenticated SMTP sessions open for one server
+    and reuses them across messages instead of doing connect + STARTTLS +
+    LOGIN for every email.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str = "",
+        password: str = "",
+        use_tls: bool = False,
+        use_ssl: bool = False,
+        size: int = 4,
+        timeout: int = 30,
+        health_check_after: float = 30,
+        max_messages_per_connection: int = 100,
+        acquire_timeout: float = 60
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.use_ssl = use_ssl
+        self.size = size
+        self.timeout = timeout
+        self.health_check_after = health_check_after
+        self.max_messages_per_connection = max_messages_per_connection
+        self.acquire_timeout = acquire_timeout
+
+        self._idle = LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._closed = False
+
+        # Counters exposed for diagnostics and tests
+        self.connections_opened = 0
+        self.reconnects = 0
+
+    def _connect(self) -> PooledConnection:
+        """Open, secure and authenticate a new SMTP session"""
+        if self.use_ssl:
+            server = _SMTP_SSL(
+                self.host,
+                self.port,
+                context=ssl.create_default_context(),
+                timeout=self.timeout
+            )
+        else:
+            server = _SMTP(self.host, self.port, timeout=self.timeout)
+
+        try:
+            if self.use_tls and not self.use_ssl:
+                server.starttls(context=ssl.create_default_context())
+            if self.username:
+                server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+
+        self.connections_opened += 1
+        logger.info(f"Opened pooled SMTP connection to {self.host}:{self.port}")
+        return PooledConnection(server)
+
+    def _discard(self, conn: PooledConnection):
+        """Close a session we no longer trust, ignoring errors from dead sockets"""
+        try:
+            conn.server.quit()
+        except Exception:
+            try:
+                conn.server.close()
+            except Exception:
+                pass
+
+    def _is_healthy(self, conn: PooledConnection) -> bool:
+        """NOOP sessions that sat idle long enough for the server to drop them"""
+        if conn.messages_sent >= self.max_messages_per_connection:
+            return False
+        if time.monotonic() - conn.last_used < self.health_check_after:
+            return True
+        try:
+            return conn.server.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def _checkout(self) -> PooledConnection:
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except Empty:
+                return self._connect()
+
+            if self._is_healthy(conn):
+                return conn
+
+            self._discard(conn)
+
+    def _checkin(self, conn: PooledConnection):
+        """RSET the session so the next message starts from a clean transaction"""
+        if self._closed:
+            self._discard(conn)
+            return
+        try:
+            conn.server.rset()
+        except (smtplib.SMTPException, OSError):
+            self._discard(conn)
+            return
+        conn.last_used = time.monotonic()
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """Borrow an authenticated session; it goes back to the pool afterwards"""
+        if self._closed:
+            raise RuntimeError("SMTP connection pool is closed")
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            raise TimeoutError(f"Timed out waiting for an SMTP connection to {self.host}:{self.port}")
+
+        conn = None
+        try:
+            conn = self._checkout()
+            yield conn.server
+            conn.messages_sent += 1
+            self._checkin(conn)
+        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError):
+            # The session itself is fine, only this transaction was rejected
+            if conn is not None:
+                self._checkin(conn)
+            raise
+        except BaseException:
+            if conn is not None:
+                self._discard(conn)
+            raise
+        finally:
+            self._slots.release()
+
+    def send_message(self, msg, from_addr: str = None, to_addrs=None) -> dict:
+        """Send a message on a pooled session, reconnecting once if the server hung up"""
+        return self._send(lambda server: server.send_message(msg, from_addr, to_addrs))
+
+    def sendmail(self, from_addr: str, to_addrs, msg: bytes) -> dict:
+        """Send an already serialized message on a pooled session"""
+        return self._send(lambda server: server.sendmail(from_addr, to_addrs, msg))
+
+    def _send(self, send) -> dict:
+        """
+        Retry once on a fresh session if the server had dropped this one, but
+        only while no message data was sent: once DATA started, a failure
+        raises DeliveryUncertainError rather than risk sending the message twice.
+        """
+        for attempt in range(2):
+            server = None
+            try:
+                with self.connection() as server:
+                    return send(server)
+            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError):
+                # The server answered; nothing to retry
+                raise
+            except OSError as e:
+                # smtplib.SMTPException is a subclass of OSError
+                if server is not None and server.data_started:
+                    raise DeliveryUncertainError(f"Connection to {self.host}:{self.port} failed after the message was sent: {str(e)}") from e
+                if attempt or not isinstance(e, smtplib.SMTPServerDisconnected):
+                    raise
+                logger.warning(f"Pooled SMTP connection to {self.host}:{self.port} dropped ({str(e)}), reconnecting")
+                self.reconnects += 1
+
+    def check(self) -> bool:
+        """Make sure at least one authenticated session can be opened, and keep it"""
+        with self.connection():
+            pass
+        return True
+
+    def close(self):
+        """Log out of every idle session; sessions in use are closed when returned"""
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except Empty:
+                break
+            self._discard(conn)